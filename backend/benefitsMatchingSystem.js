@@ -10,20 +10,63 @@
  * - Scoring: Phase 2 weight=3.0, Phase 3 weight=1.0, Phase 1 context=0.7
  */
 
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
 
+const sha256 = text => crypto.createHash('sha256').update(text, 'utf8').digest('hex');
+
 class BenefitsMatchingSystem {
   constructor() {
     // Load product catalog
-    this.productsData = JSON.parse(
-      fs.readFileSync(path.join(__dirname, '../config/products.json'), 'utf8')
-    );
+    const productsText = fs.readFileSync(path.join(__dirname, '../config/products.json'), 'utf8');
+    this.productsData = JSON.parse(productsText);
 
     // Load qualification questions
-    this.questionsData = JSON.parse(
-      fs.readFileSync(path.join(__dirname, '../config/qualification-questions.json'), 'utf8')
-    );
+    const questionsText = fs.readFileSync(path.join(__dirname, '../config/qualification-questions.json'), 'utf8');
+    this.questionsData = JSON.parse(questionsText);
+
+    // Precomputed rankings (scripts/build_recommendation_table.py), null if missing or stale
+    this.recommendationTable = this.loadRecommendationTable(productsText, questionsText);
+  }
+
+  /**
+   * Load the recommendation table, only if built from exactly these catalog and questions files
+   */
+  loadRecommendationTable(productsText, questionsText) {
+    try {
+      const table = JSON.parse(
+        fs.readFileSync(path.join(__dirname, '../config/recommendations.table.json'), 'utf8')
+      );
+      if (table.catalog.sha256 !== sha256(productsText) || table.questions.sha256 !== sha256(questionsText)) {
+        console.warn('⚠️  Recommendation table is stale, scoring products live');
+        return null;
+      }
+      return table;
+    } catch (error) {
+      return null;
+    }
+  }
+
+  /**
+   * Table key of an answer path: "hair:curly/fine/dryness/deep-nourishment+shine"
+   * (same as answer_path() in scripts/build_recommendation_table.py)
+   */
+  getAnswerPath(userAnswers, category) {
+    const parts = this.questionsData[category].steps.map(step => {
+      const answer = userAnswers[`step${step.id}`];
+      return Array.isArray(answer) ? [...answer].sort().join('+') : (answer || '');
+    });
+    return `${category}:${parts.join('/')}`;
+  }
+
+  /**
+   * Precomputed top products (best first) for these answers, null if not in the table
+   */
+  getRankedProducts(userAnswers, category, limit) {
+    if (!this.recommendationTable) return null;
+    const ranked = this.recommendationTable.paths[this.getAnswerPath(userAnswers, category)];
+    return ranked ? ranked.slice(0, limit).map(position => this.productsData.products[position]) : null;
   }
 
   /**
@@ -310,9 +353,6 @@ class BenefitsMatchingSystem {
    * @param {number} limit - Number of top products to return
    */
   matchProducts(userAnswers, category, language = 'ar', limit = 3) {
-    // Get products for this category
-    const products = this.productsData.products.filter(p => p.category === category);
-
     // Extract user requirements from answers
     const userContraindications = this.extractContraindications(userAnswers, category);
     const requiredTags = this.extractRequiredTags(userAnswers, category);
@@ -324,6 +364,26 @@ class BenefitsMatchingSystem {
       desiredTags: desiredTags
     });
 
+    // Precomputed answer path: only the returned products are scored (for the details)
+    const ranked = this.getRankedProducts(userAnswers, category, limit);
+    if (ranked) {
+      const topProducts = ranked.map(product => {
+        const score = this.scoreProduct(product, requiredTags, desiredTags, userContraindications);
+        return {
+          ...this.formatProduct(product, language),
+          scoring: score,
+          matchScore: score.totalScore
+        };
+      });
+
+      console.log(`Top ${topProducts.length} products from recommendation table (limit: ${limit})`);
+
+      return topProducts;
+    }
+
+    // Get products for this category
+    const products = this.productsData.products.filter(p => p.category === category);
+
     // Step A: Apply hard filters
     const eligibleProducts = this.applyHardFilters(products, userContraindications, requiredTags);
 
@@ -361,7 +421,7 @@ class BenefitsMatchingSystem {
       description: product.description[language] || product.description.en,
       price: product.price,
       size: product.size,
-      image: product.image,
+      image: product.imageSizes?.medium || product.image,
       type: product.type,
       collection: product.collection,
       usage: product.usage ? (product.usage[language] || product.usage.en) : null,
@@ -3,11 +3,46 @@ const ProductKnowledge = require('./productKnowledge');
 const synonymsHelper = require('./synonyms');
 const fs = require('fs');
 const path = require('path');
+const crypto = require('crypto');
+const { NeedleIndex, SubstringIndex } = require('./utils/substringIndex');
+const { lightStem, words } = require('./utils/textUtils');
+
+function sha256(text) {
+  return crypto.createHash('sha256').update(text, 'utf8').digest('hex');
+}
+
+/**
+ * Knowledge base compiled by scripts/compile_knowledge_base.py (runtime fields only),
+ * or the full authoring file when the compiled one is missing or stale: compiled from another
+ * knowledge base, or from another products.json (product references resolved against it)
+ */
+function loadKnowledgeBase(kbText) {
+  try {
+    const compiled = JSON.parse(
+      fs.readFileSync(path.join(__dirname, '../config/knowledge_base.compiled.json'), 'utf8')
+    );
+    const catalogText = fs.readFileSync(path.join(__dirname, '../config/products.json'), 'utf8');
+    if (compiled.compiled.source.sha256 === sha256(kbText) &&
+        compiled.compiled.catalog.sha256 === sha256(catalogText)) {
+      return compiled;
+    }
+    console.warn('⚠️  Compiled knowledge base is stale, loading the full knowledge base');
+  } catch (error) {
+    // No compiled knowledge base
+  }
+  return JSON.parse(kbText);
+}
 
 // Load comprehensive knowledge base v2.0
-const comprehensiveKB = JSON.parse(
-  fs.readFileSync(path.join(__dirname, '../config/INnatural_Chatbot_Knowledge_Base_v2.json'), 'utf8')
-);
+const comprehensiveKBText = fs.readFileSync(path.join(__dirname, '../config/INnatural_Chatbot_Knowledge_Base_v2.json'), 'utf8');
+const comprehensiveKB = loadKnowledgeBase(comprehensiveKBText);
+
+/**
+ * Stemmed words of a text joined by spaces, like synonyms.queryContainsTerm() compares them
+ */
+function stemmedText(text) {
+  return words(text).map(word => lightStem(word)).join(' ');
+}
 
 class ClaudeService {
   constructor(apiKey) {
@@ -17,6 +52,11 @@ class ClaudeService {
     this.conversationHistory = new Map(); // Store conversation history by session ID
     this.knowledgeBase = comprehensiveKB; // Store comprehensive knowledge base v2.0
     this.config = comprehensiveKB.config || {}; // Configuration settings
+    // Scenarios in knowledge base order, for the candidate pre-filter positions
+    this.scenarioList = comprehensiveKB.categories.flatMap(category =>
+      category.scenarios.map(scenario => ({ category, scenario }))
+    );
+    this.scenarioFilter = this.buildScenarioFilter();
     console.log(`✅ Knowledge Base v${comprehensiveKB.metadata.version} loaded`);
     console.log(`   Primary language: ${comprehensiveKB.metadata.primary_language}`);
     console.log(`   Total scenarios: ${comprehensiveKB.metadata.total_scenarios}`);
@@ -52,87 +92,84 @@ class ClaudeService {
 
     const relevantScenarios = [];
 
-    // Search through all categories and scenarios
+    // Only score the scenarios the checks below can match (see getScenarioCandidates)
     // Filter categories by product_type if specified
-    const categoriesToSearch = productType
-      ? this.knowledgeBase.categories.filter(cat => !cat.product_type || cat.product_type === productType)
-      : this.knowledgeBase.categories;
-
-    for (const category of categoriesToSearch) {
-      for (const scenario of category.scenarios) {
-        let score = 0;
-        let matchReasons = [];
-
-        // 1. Check user_queries (both languages)
-        const userQueries = [
-          ...(scenario.user_queries.ar || []),
-          ...(scenario.user_queries.en || [])
-        ];
-
-        for (const query of userQueries) {
-          const queryLower = query.toLowerCase();
-          if (messageLower.includes(queryLower) || queryLower.includes(messageLower)) {
-            score += 50; // High score for direct query match
-            matchReasons.push('direct_query');
-            break;
-          }
-        }
+    const candidates = this.getScenarioCandidates(userMessage, normalizedQuery, termsFound)
+      .filter(({ category }) => !productType || !category.product_type || category.product_type === productType);
 
-        // 2. Check keywords with synonym normalization
-        const keywords = scenario.keywords[language] || [];
-        for (const keyword of keywords) {
-          const keywordLower = keyword.toLowerCase();
-          if (normalizedLower.includes(keywordLower) ||
-              messageLower.includes(keywordLower) ||
-              synonymsHelper.queryContainsTerm(userMessage, keyword, language)) {
-            score += 30; // Medium score for keyword match
-            matchReasons.push('keyword_match');
-          }
+    for (const { category, scenario } of candidates) {
+      let score = 0;
+      let matchReasons = [];
+
+      // 1. Check user_queries (both languages)
+      const userQueries = [
+        ...(scenario.user_queries.ar || []),
+        ...(scenario.user_queries.en || [])
+      ];
+
+      for (const query of userQueries) {
+        const queryLower = query.toLowerCase();
+        if (messageLower.includes(queryLower) || queryLower.includes(messageLower)) {
+          score += 50; // High score for direct query match
+          matchReasons.push('direct_query');
+          break;
         }
+      }
 
-        // 3. Check tags
-        const tags = scenario.tags[language] || [];
-        for (const tag of tags) {
-          const tagLower = tag.toLowerCase();
-          if (normalizedLower.includes(tagLower) ||
-              messageLower.includes(tagLower) ||
-              synonymsHelper.queryContainsTerm(userMessage, tag, language)) {
-            score += 20; // Lower score for tag match
-            matchReasons.push('tag_match');
-          }
+      // 2. Check keywords with synonym normalization
+      const keywords = scenario.keywords[language] || [];
+      for (const keyword of keywords) {
+        const keywordLower = keyword.toLowerCase();
+        if (normalizedLower.includes(keywordLower) ||
+            messageLower.includes(keywordLower) ||
+            synonymsHelper.queryContainsTerm(userMessage, keyword, language)) {
+          score += 30; // Medium score for keyword match
+          matchReasons.push('keyword_match');
         }
+      }
 
-        // 4. Check for main terms found by synonym system
-        for (const term of termsFound) {
-          const termLower = term.toLowerCase();
-          const scenarioText = JSON.stringify(scenario).toLowerCase();
-          if (scenarioText.includes(termLower)) {
-            score += 15;
-            matchReasons.push('synonym_match');
-          }
+      // 3. Check tags
+      const tags = scenario.tags[language] || [];
+      for (const tag of tags) {
+        const tagLower = tag.toLowerCase();
+        if (normalizedLower.includes(tagLower) ||
+            messageLower.includes(tagLower) ||
+            synonymsHelper.queryContainsTerm(userMessage, tag, language)) {
+          score += 20; // Lower score for tag match
+          matchReasons.push('tag_match');
         }
+      }
 
-        // If we have any matches, add to results
-        if (score > 0) {
-          // Get appropriate response for the language
-          const response = scenario.responses.find(r =>
-            r.language === language && r.response_type === 'detailed'
-          ) || scenario.responses.find(r => r.language === language) ||
-             scenario.responses[0];
-
-          relevantScenarios.push({
-            category: category.category_name[language] || category.category_name,
-            scenario: scenario.scenario_id,
-            response: response ? response.text : '',
-            follow_ups: scenario.follow_up_questions ?
-              (scenario.follow_up_questions[language] || []) : [],
-            score: score,
-            priority: scenario.priority || 5,
-            matchReasons: [...new Set(matchReasons)], // Remove duplicates
-            confidence: Math.min(score / 100, 1.0) // Normalize to 0-1
-          });
+      // 4. Check for main terms found by synonym system
+      for (const term of termsFound) {
+        const termLower = term.toLowerCase();
+        const scenarioText = JSON.stringify(scenario).toLowerCase();
+        if (scenarioText.includes(termLower)) {
+          score += 15;
+          matchReasons.push('synonym_match');
         }
       }
+
+      // If we have any matches, add to results
+      if (score > 0) {
+        // Get appropriate response for the language
+        const response = scenario.responses.find(r =>
+          r.language === language && r.response_type === 'detailed'
+        ) || scenario.responses.find(r => r.language === language) ||
+           scenario.responses[0];
+
+        relevantScenarios.push({
+          category: category.category_name[language] || category.category_name,
+          scenario: scenario.scenario_id,
+          response: response ? response.text : '',
+          follow_ups: scenario.follow_up_questions ?
+            (scenario.follow_up_questions[language] || []) : [],
+          score: score,
+          priority: scenario.priority || 5,
+          matchReasons: [...new Set(matchReasons)], // Remove duplicates
+          confidence: Math.min(score / 100, 1.0) // Normalize to 0-1
+        });
+      }
     }
 
     // Sort by score (descending), then by priority (descending)
@@ -150,6 +187,59 @@ class ClaudeService {
     return topScenarios.filter(s => s.confidence >= minConfidence);
   }
 
+  /**
+   * Trigram pre-filter over the texts searchKnowledgeBase() checks, one entry per scenario position
+   */
+  buildScenarioFilter() {
+    const filter = {
+      needles: new NeedleIndex(), // user queries, keywords and tags that can occur in the message
+      queries: new SubstringIndex(), // user queries the message can occur in
+      texts: new SubstringIndex(), // full scenario JSON, for the synonym main terms
+      synonyms: new Map(), // main term -> scenarios with a keyword or tag having that main term
+    };
+    this.scenarioList.forEach(({ scenario }, position) => {
+      for (const query of [...(scenario.user_queries.ar || []), ...(scenario.user_queries.en || [])]) {
+        filter.needles.add(position, query.toLowerCase());
+        filter.queries.add(position, query.toLowerCase());
+      }
+      for (const texts of [scenario.keywords, scenario.tags]) {
+        for (const [language, values] of Object.entries(texts || {})) {
+          for (const value of values) {
+            filter.needles.add(position, value.toLowerCase());
+            filter.needles.add(position, ` ${stemmedText(value)} `);
+            const mainTerm = synonymsHelper.getMainTerm(value, language);
+            if (mainTerm === undefined) continue;
+            if (!filter.synonyms.has(mainTerm)) filter.synonyms.set(mainTerm, new Set());
+            filter.synonyms.get(mainTerm).add(position);
+          }
+        }
+      }
+      filter.texts.add(position, JSON.stringify(scenario).toLowerCase());
+    });
+    return filter;
+  }
+
+  /**
+   * Scenarios to score for a message, in knowledge base order
+   * A superset of the scenarios searchKnowledgeBase() can score: every check it makes is a
+   * substring or synonym match, and the filter keeps each scenario where one of them can succeed
+   */
+  getScenarioCandidates(userMessage, normalizedQuery, termsFound) {
+    const { needles, queries, texts, synonyms } = this.scenarioFilter;
+    const messageLower = userMessage.toLowerCase();
+    const positions = new Set([
+      ...needles.candidates(messageLower),
+      ...needles.candidates(normalizedQuery.toLowerCase()),
+      ...needles.candidates(` ${stemmedText(userMessage)} `),
+      ...queries.candidates(messageLower),
+    ]);
+    for (const term of termsFound) {
+      for (const position of synonyms.get(term) || []) positions.add(position);
+      for (const position of texts.candidates(term.toLowerCase())) positions.add(position);
+    }
+    return [...positions].sort((a, b) => a - b).map(position => this.scenarioList[position]);
+  }
+
   /**
    * Get or create conversation history for a session
    */
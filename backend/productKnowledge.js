@@ -1,11 +1,47 @@
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
+const { SubstringIndex } = require('./utils/substringIndex');
 
 // Load product data and FAQs
-const productsData = JSON.parse(fs.readFileSync(path.join(__dirname, '../config/products.json'), 'utf8'));
+const productsText = fs.readFileSync(path.join(__dirname, '../config/products.json'), 'utf8');
+const productsData = JSON.parse(productsText);
+const productIndexes = loadProductIndexes(productsText);
+const productNames = buildProductNameIndex(productsData.products);
 const faqsData = JSON.parse(fs.readFileSync(path.join(__dirname, '../config/faqs.json'), 'utf8'));
 const botPersonality = JSON.parse(fs.readFileSync(path.join(__dirname, '../config/bot-personality.json'), 'utf8'));
 
+/**
+ * Load the precomputed indexes written by scripts/build_catalog_indexes.py
+ * Returns null (linear scans) if missing or built from another version of products.json
+ */
+function loadProductIndexes(catalogText) {
+  const indexPath = path.join(__dirname, '../config/products.indexes.json');
+  try {
+    const indexes = JSON.parse(fs.readFileSync(indexPath, 'utf8'));
+    const digest = crypto.createHash('sha256').update(catalogText, 'utf8').digest('hex');
+    return indexes.catalog && indexes.catalog.sha256 === digest ? indexes : null;
+  } catch (error) {
+    return null;
+  }
+}
+
+/**
+ * Trigram pre-filter for findProduct: ids and names (as written and lowercased) by product position
+ */
+function buildProductNameIndex(products) {
+  const index = new SubstringIndex();
+  products.forEach((product, position) => {
+    index.add(position, product.id);
+    for (const name of Object.values(product.name || {})) {
+      if (typeof name !== 'string') continue;
+      index.add(position, name);
+      index.add(position, name.toLowerCase());
+    }
+  });
+  return index;
+}
+
 class ProductKnowledge {
   /**
    * Get product recommendations based on hair type and concerns
@@ -33,9 +69,7 @@ class ProductKnowledge {
     }
 
     // Get full product details
-    return Array.from(recommendations).map(productId => {
-      return productsData.products.find(p => p.id === productId);
-    }).filter(Boolean);
+    return Array.from(recommendations).map(productId => this.getProductById(productId)).filter(Boolean);
   }
 
   /**
@@ -68,23 +102,50 @@ class ProductKnowledge {
     return productsData.products;
   }
 
+  /**
+   * Get a product by ID (O(1) with the precomputed indexes)
+   */
+  static getProductById(productId) {
+    if (productIndexes) {
+      if (!Object.prototype.hasOwnProperty.call(productIndexes.byId, productId)) return undefined;
+      return productsData.products[productIndexes.byId[productId]];
+    }
+    return productsData.products.find(p => p.id === productId);
+  }
+
+  /**
+   * Get products from a precomputed index ("byType", "byConcern", "byTag"...)
+   * Returns null when the indexes are not available
+   */
+  static getIndexedProducts(indexName, value) {
+    if (!productIndexes || !productIndexes[indexName]) return null;
+    const index = productIndexes[indexName];
+    const positions = Object.prototype.hasOwnProperty.call(index, value) ? index[value] : [];
+    return positions.map(position => productsData.products[position]);
+  }
+
   /**
    * Get products by type (e.g., "body-cream", "shampoo", "body-butter")
    */
   static getProductsByType(productType) {
     if (!productType) return [];
 
+    const indexed = this.getIndexedProducts('byType', productType.toLowerCase());
+    if (indexed) return indexed;
+
     return productsData.products.filter(product =>
       product.type === productType.toLowerCase()
     );
   }
 
   /**
-   * Search for a product by name or ID
+   * Search for a product by name or ID (first product, in catalog order, containing the query)
+   * Only the products the trigram index keeps can contain it
    */
   static findProduct(query, language = 'en') {
     query = query.toLowerCase();
-    return productsData.products.find(p =>
+    const candidates = [...productNames.candidates(query)].sort((a, b) => a - b);
+    return candidates.map(position => productsData.products[position]).find(p =>
       p.id.includes(query) ||
       p.name[language].toLowerCase().includes(query) ||
       p.name.en.toLowerCase().includes(query) ||
@@ -151,7 +151,7 @@ class QualificationSystem {
       description: product.description,
       price: product.price,
       size: product.size,
-      image: product.image,
+      image: product.imageSizes?.medium || product.image,
       type: product.type,
       collection: product.collection,
       matchScore: product.scoring.normalizedScore, // 0-1 scale
@@ -125,7 +125,16 @@ app.use(bodyParser.json({ limit: '10mb' }));
 app.use(bodyParser.urlencoded({ extended: true, limit: '10mb' }));
 
 // Static files
-app.use(express.static(path.join(__dirname, '../widget')));
+// Content-addressed images (scripts/build_images.py): a changed image gets a new URL,
+// so browsers may keep these forever
+const BUILT_IMAGES_DIR = path.join(__dirname, '../widget/images/built') + path.sep;
+app.use(express.static(path.join(__dirname, '../widget'), {
+  setHeaders: (res, filePath) => {
+    if (filePath.startsWith(BUILT_IMAGES_DIR)) {
+      res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+    }
+  },
+}));
 
 // Request logging with Winston
 app.use((req, res, next) => {
@@ -603,7 +612,7 @@ app.post('/api/chat/stream', chatLimiter, validateBody(chatMessageSchema), async
               size: p.size,
               description: p.description[language] || p.description.en,
               benefits: p.benefits?.[language] || p.benefits?.en || [],
-              image: p.image || null,
+              image: p.imageSizes?.medium || p.image || null,
               category: p.category,
               type: p.type
             })),
@@ -1,34 +1,100 @@
 /**
  * Synonyms Helper Module
  * Manages bilingual synonym mappings for improved query matching
- * Loads synonyms from Knowledge Base v2.0 and provides normalization functions
+ * Loads the synonyms compiled by scripts/compile_synonyms.py (config/synonyms.compiled.json),
+ * or compiles them from Knowledge Base v2.0 when that file is missing or stale
+ *
+ * Each language is a trie of normalized, stemmed words: one pass over a message finds
+ * every synonym occurrence, multi-word phrases included.
  */
 
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
+const { lightStem, words, wordSpans } = require('./utils/textUtils');
+
+const KB_PATH = path.join(__dirname, '../config/INnatural_Chatbot_Knowledge_Base_v2.json');
+const COMPILED_PATH = path.join(__dirname, '../config/synonyms.compiled.json');
+const TERMINAL = '$';
+
+/**
+ * Own property test: trie nodes and synonym maps are keyed by user words ('constructor', '__proto__'...)
+ */
+function hasOwn(object, key) {
+  return Object.prototype.hasOwnProperty.call(object, key);
+}
+
+/**
+ * Child node of a trie node, undefined if the word has no edge
+ */
+function child(node, word) {
+  return hasOwn(node, word) ? node[word] : undefined;
+}
+
+/**
+ * Stemmed word sequence of a phrase (trie path)
+ */
+function phraseKey(text) {
+  return words(text).map(word => lightStem(word));
+}
+
+/**
+ * Same trie as compile_language() in scripts/compile_synonyms.py (conflicts: first owner wins)
+ */
+function compileLanguage(synonyms) {
+  const terms = Object.keys(synonyms);
+  const trie = Object.create(null);
+  let maxPhraseLength = 0;
+  const entries = [
+    ...terms.map((term, i) => [i, term]),
+    ...terms.flatMap((term, i) => synonyms[term].map(variant => [i, variant])),
+  ];
+  for (const [position, variant] of entries) {
+    const key = phraseKey(variant);
+    if (!key.length) continue;
+    let node = trie;
+    for (const word of key) {
+      node = child(node, word) || (node[word] = Object.create(null));
+    }
+    if (!hasOwn(node, TERMINAL)) node[TERMINAL] = position;
+    maxPhraseLength = Math.max(maxPhraseLength, key.length);
+  }
+  return { terms, maxPhraseLength, trie };
+}
 
 class SynonymsHelper {
   constructor() {
     this.synonyms = { ar: {}, en: {} };
-    this.reverseMap = { ar: {}, en: {} }; // For quick synonym → main term lookup
+    this.compiled = { ar: compileLanguage({}), en: compileLanguage({}) };
+    this.lastMatches = null; // { query, language, matches } of the last message
     this.loadSynonyms();
   }
 
   /**
-   * Load synonyms from Knowledge Base v2.0
+   * Load the compiled synonyms (or compile the Knowledge Base v2.0 section)
    */
   loadSynonyms() {
     try {
-      const kbPath = path.join(__dirname, '../config/INnatural_Chatbot_Knowledge_Base_v2.json');
-      const kb = JSON.parse(fs.readFileSync(kbPath, 'utf8'));
-
-      if (kb.synonyms) {
-        this.synonyms = kb.synonyms;
-        this.buildReverseMap();
-        console.log('✅ Synonyms loaded successfully');
-        console.log(`   - AR synonyms: ${Object.keys(this.synonyms.ar).length} main terms`);
-        console.log(`   - EN synonyms: ${Object.keys(this.synonyms.en).length} main terms`);
+      const kbText = fs.readFileSync(KB_PATH, 'utf8');
+      const compiled = this.loadCompiled(kbText);
+
+      if (compiled) {
+        this.synonyms = compiled.synonyms;
+        this.compiled = compiled.languages;
+        console.log('✅ Synonyms loaded successfully (precompiled)');
+      } else {
+        const kb = JSON.parse(kbText);
+        if (kb.synonyms) {
+          this.synonyms = kb.synonyms;
+          this.compiled = {
+            ar: compileLanguage(this.synonyms.ar || {}),
+            en: compileLanguage(this.synonyms.en || {}),
+          };
+          console.log('✅ Synonyms loaded successfully');
+        }
       }
+      console.log(`   - AR synonyms: ${Object.keys(this.synonyms.ar).length} main terms`);
+      console.log(`   - EN synonyms: ${Object.keys(this.synonyms.en).length} main terms`);
     } catch (error) {
       console.error('❌ Error loading synonyms:', error.message);
       console.warn('⚠️  Using empty synonym maps');
@@ -36,29 +102,67 @@ class SynonymsHelper {
   }
 
   /**
-   * Build reverse mapping: synonym → main term
-   * This allows quick lookup from any synonym variation to its canonical form
+   * Compiled synonyms, only if built from exactly this knowledge base (sha256)
+   */
+  loadCompiled(kbText) {
+    try {
+      const compiled = JSON.parse(fs.readFileSync(COMPILED_PATH, 'utf8'));
+      const digest = crypto.createHash('sha256').update(kbText, 'utf8').digest('hex');
+      return compiled.source && compiled.source.sha256 === digest ? compiled : null;
+    } catch (error) {
+      return null;
+    }
+  }
+
+  /**
+   * Every synonym occurrence in a message (overlapping ones included), in one pass
+   * @param {string} query - User query
+   * @param {string} language - Language code ('ar' or 'en')
+   * @returns {Array<{start: number, end: number, mainTerm: string}>} - Character ranges in the query
    */
-  buildReverseMap() {
-    // Arabic reverse map
-    for (const [mainTerm, synonymList] of Object.entries(this.synonyms.ar)) {
-      // The main term maps to itself
-      this.reverseMap.ar[mainTerm.toLowerCase()] = mainTerm;
-
-      // Each synonym maps to the main term
-      synonymList.forEach(synonym => {
-        this.reverseMap.ar[synonym.toLowerCase()] = mainTerm;
-      });
+  findMatches(query, language = 'ar') {
+    if (!query || typeof query !== 'string') return [];
+    const last = this.lastMatches;
+    if (last && last.query === query && last.language === language) return last.matches;
+
+    const { terms, maxPhraseLength, trie } = this.getCompiled(language);
+    const spans = wordSpans(query);
+    const keys = spans.map(span => lightStem(span.word));
+    const matches = [];
+
+    for (let start = 0; start < keys.length; start++) {
+      let node = trie;
+      for (let end = start; end < Math.min(keys.length, start + maxPhraseLength); end++) {
+        node = child(node, keys[end]);
+        if (!node) break;
+        if (hasOwn(node, TERMINAL)) {
+          matches.push({ start: spans[start].start, end: spans[end].end, mainTerm: terms[node[TERMINAL]] });
+        }
+      }
     }
 
-    // English reverse map
-    for (const [mainTerm, synonymList] of Object.entries(this.synonyms.en)) {
-      this.reverseMap.en[mainTerm.toLowerCase()] = mainTerm;
+    this.lastMatches = { query, language, matches };
+    return matches;
+  }
 
-      synonymList.forEach(synonym => {
-        this.reverseMap.en[synonym.toLowerCase()] = mainTerm;
-      });
+  /**
+   * Main term of a term or synonym (exact phrase), undefined if unknown
+   */
+  getMainTerm(term, language = 'ar') {
+    const { terms, trie } = this.getCompiled(language);
+    let node = trie;
+    for (const word of phraseKey(term)) {
+      node = child(node, word);
+      if (!node) return undefined;
     }
+    return hasOwn(node, TERMINAL) ? terms[node[TERMINAL]] : undefined;
+  }
+
+  /**
+   * Compiled trie of a language (an empty one for unknown languages)
+   */
+  getCompiled(language) {
+    return hasOwn(this.compiled, language) ? this.compiled[language] : compileLanguage({});
   }
 
   /**
@@ -70,23 +174,19 @@ class SynonymsHelper {
   normalizeQuery(query, language = 'ar') {
     if (!query || typeof query !== 'string') return '';
 
-    const lowerQuery = query.toLowerCase();
-    const reverseMap = this.reverseMap[language] || {};
+    // Leftmost, then longest occurrence first; overlapping occurrences are skipped
+    const matches = [...this.findMatches(query, language)]
+      .sort((a, b) => a.start - b.start || b.end - a.end);
 
-    let normalizedQuery = query;
-
-    // Sort by length (longest first) to match longer phrases first
-    const sortedTerms = Object.keys(reverseMap).sort((a, b) => b.length - a.length);
-
-    for (const term of sortedTerms) {
-      const regex = new RegExp(`\\b${this.escapeRegex(term)}\\b`, 'gi');
-      if (regex.test(lowerQuery)) {
-        const mainTerm = reverseMap[term];
-        normalizedQuery = normalizedQuery.replace(regex, mainTerm);
-      }
+    let normalizedQuery = '';
+    let position = 0;
+    for (const match of matches) {
+      if (match.start < position) continue;
+      normalizedQuery += query.slice(position, match.start) + match.mainTerm;
+      position = match.end;
     }
 
-    return normalizedQuery;
+    return normalizedQuery + query.slice(position);
   }
 
   /**
@@ -96,14 +196,12 @@ class SynonymsHelper {
    * @returns {string[]} - Array of all variations
    */
   getVariations(term, language = 'ar') {
-    const lowerTerm = term.toLowerCase();
-    const reverseMap = this.reverseMap[language] || {};
-
     // Find the main term
-    const mainTerm = reverseMap[lowerTerm] || term;
+    const mainTerm = this.getMainTerm(term, language) || term;
 
     // Get synonyms for the main term
-    const synonyms = this.synonyms[language][mainTerm] || [];
+    const languageSynonyms = hasOwn(this.synonyms, language) ? this.synonyms[language] : {};
+    const synonyms = hasOwn(languageSynonyms, mainTerm) ? languageSynonyms[mainTerm] : [];
 
     // Return main term + all synonyms
     return [mainTerm, ...synonyms];
@@ -119,13 +217,14 @@ class SynonymsHelper {
   queryContainsTerm(query, term, language = 'ar') {
     if (!query || !term) return false;
 
-    const lowerQuery = query.toLowerCase();
-    const variations = this.getVariations(term, language);
+    const mainTerm = this.getMainTerm(term, language);
+    if (mainTerm) {
+      return this.findMatches(query, language).some(match => match.mainTerm === mainTerm);
+    }
 
-    return variations.some(variation => {
-      const regex = new RegExp(`\\b${this.escapeRegex(variation)}\\b`, 'i');
-      return regex.test(lowerQuery);
-    });
+    // Term without synonyms: look for its words, in sequence
+    const termKey = phraseKey(term).join(' ');
+    return termKey !== '' && ` ${phraseKey(query).join(' ')} `.includes(` ${termKey} `);
   }
 
   /**
@@ -137,19 +236,7 @@ class SynonymsHelper {
   findTermsInQuery(query, language = 'ar') {
     if (!query) return [];
 
-    const lowerQuery = query.toLowerCase();
-    const reverseMap = this.reverseMap[language] || {};
-    const foundTerms = new Set();
-
-    // Check each synonym/term
-    for (const [synonym, mainTerm] of Object.entries(reverseMap)) {
-      const regex = new RegExp(`\\b${this.escapeRegex(synonym)}\\b`, 'i');
-      if (regex.test(lowerQuery)) {
-        foundTerms.add(mainTerm);
-      }
-    }
-
-    return Array.from(foundTerms);
+    return [...new Set(this.findMatches(query, language).map(match => match.mainTerm))];
   }
 
   /**
@@ -183,21 +270,13 @@ class SynonymsHelper {
     };
   }
 
-  /**
-   * Escape special regex characters
-   * @param {string} str - String to escape
-   * @returns {string} - Escaped string
-   */
-  escapeRegex(str) {
-    return str.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-  }
-
   /**
    * Reload synonyms from file (useful after KB updates)
    */
   reload() {
     this.synonyms = { ar: {}, en: {} };
-    this.reverseMap = { ar: {}, en: {} };
+    this.compiled = { ar: compileLanguage({}), en: compileLanguage({}) };
+    this.lastMatches = null;
     this.loadSynonyms();
   }
 }
@@ -0,0 +1,81 @@
+/**
+ * Character trigram indexes used as candidate pre-filters for substring matching
+ *
+ * A string of 3+ characters only occurs in a text containing all of its trigrams, so both
+ * indexes return a superset of the positions a substring check can accept: callers keep
+ * their own `includes` checks (and scoring), they just run them on fewer texts.
+ * Strings shorter than a trigram cannot be pre-filtered and are always candidates.
+ */
+
+const GRAM_LENGTH = 3;
+
+function trigrams(text) {
+  const grams = new Set();
+  for (let i = 0; i + GRAM_LENGTH <= text.length; i++) {
+    grams.add(text.slice(i, i + GRAM_LENGTH));
+  }
+  return grams;
+}
+
+/**
+ * Texts by position; `candidates(needle)` = positions whose texts can contain `needle`
+ */
+class SubstringIndex {
+  constructor() {
+    this.postings = new Map();
+    this.positions = new Set();
+  }
+
+  add(position, text) {
+    this.positions.add(position);
+    for (const gram of trigrams(text)) {
+      if (!this.postings.has(gram)) this.postings.set(gram, new Set());
+      this.postings.get(gram).add(position);
+    }
+  }
+
+  candidates(needle) {
+    if (needle.length < GRAM_LENGTH) return new Set(this.positions);
+    let result = null;
+    for (const gram of trigrams(needle)) {
+      const positions = this.postings.get(gram);
+      if (!positions) return new Set();
+      result = result ? new Set([...result].filter(position => positions.has(position))) : new Set(positions);
+    }
+    return result;
+  }
+}
+
+/**
+ * Needles by position; `candidates(text)` = positions with a needle that can occur in `text`
+ * (a needle is filed under its first trigram, which any text containing it also contains)
+ */
+class NeedleIndex {
+  constructor() {
+    this.postings = new Map();
+    this.short = [];
+  }
+
+  add(position, needle) {
+    if (needle.length < GRAM_LENGTH) {
+      this.short.push([position, needle]);
+      return;
+    }
+    const gram = needle.slice(0, GRAM_LENGTH);
+    if (!this.postings.has(gram)) this.postings.set(gram, new Set());
+    this.postings.get(gram).add(position);
+  }
+
+  candidates(text) {
+    const result = new Set();
+    for (const gram of trigrams(text)) {
+      for (const position of this.postings.get(gram) || []) result.add(position);
+    }
+    for (const [position, needle] of this.short) {
+      if (text.includes(needle)) result.add(position);
+    }
+    return result;
+  }
+}
+
+module.exports = { SubstringIndex, NeedleIndex, trigrams };
@@ -0,0 +1,56 @@
+/**
+ * Bilingual (Arabic / English) text normalization shared by the synonyms and the scenario matcher
+ * Mirrors scripts/text_utils.py, which builds the precomputed artifacts:
+ * any change there must be reported here (and the artifacts rebuilt).
+ */
+
+// Alef variants (أ إ آ), ta marbuta (ة), alef maqsura (ى) and tatweel (ـ)
+const ARABIC_FOLD = { 'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ة': 'ه', 'ى': 'ي', 'ـ': '' };
+
+// Light stemming: attached Arabic article / prepositions, then one ending
+const PREFIXES = ['وال', 'بال', 'فال', 'كال', 'لل', 'ال'];
+const SUFFIXES = ['ing', 'ed', 'es', 's', 'y', 'ها', 'ات', 'ه', 'ي'];
+const MIN_STEM_LENGTH = 3;
+
+/**
+ * Lowercase, without accents or Arabic diacritics, alef / ta marbuta variants unified
+ */
+function normalizeText(text) {
+  return (text || '')
+    .normalize('NFKD')
+    .replace(/\p{Mn}/gu, '')
+    .toLowerCase()
+    .replace(/[أإآةىـ]/g, c => ARABIC_FOLD[c]);
+}
+
+/**
+ * Normalized words ('_' separates words, like '-' and spaces)
+ */
+function words(text) {
+  return normalizeText(text).replace(/_/g, ' ').match(/[\p{L}\p{N}_]+/gu) || [];
+}
+
+/**
+ * Normalized words with their position in the original text, e.g. for replacements
+ * @returns {Array<{word: string, start: number, end: number}>}
+ */
+function wordSpans(text) {
+  const spans = [];
+  for (const match of (text || '').matchAll(/[\p{L}\p{N}\p{M}]+/gu)) {
+    const word = normalizeText(match[0]);
+    if (word) spans.push({ word, start: match.index, end: match.index + match[0].length });
+  }
+  return spans;
+}
+
+/**
+ * 'بالشعر' -> 'شعر', 'ناشفة' -> 'ناشف', 'falling' -> 'fall' (at most one prefix and one ending)
+ */
+function lightStem(word) {
+  const prefix = PREFIXES.find(p => word.startsWith(p) && word.length - p.length >= MIN_STEM_LENGTH);
+  if (prefix) word = word.slice(prefix.length);
+  const suffix = SUFFIXES.find(s => word.endsWith(s) && word.length - s.length >= MIN_STEM_LENGTH);
+  return suffix ? word.slice(0, -suffix.length) : word;
+}
+
+module.exports = { normalizeText, words, wordSpans, lightStem };
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Écritures atomiques des fichiers de configuration (catalogues, empreintes, sources CSV)
+
+Le contenu est écrit dans un fichier temporaire du même dossier, synchronisé sur disque
+(fsync) puis renommé sur le fichier final: un lecteur concurrent (backend Node, autre
+script) voit toujours soit l'ancienne version complète, soit la nouvelle, jamais un
+fichier tronqué, même si le script est interrompu.
+
+Numéros de génération (optionnels): chaque écriture avec generation=True incrémente le
+compteur du fichier <chemin>.generation, mis à jour après le fichier lui-même. Un lecteur
+compare ce numéro à celui de sa dernière lecture pour éviter de relire un fichier inchangé
+(voir GenerationReader).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+GENERATION_SUFFIX = ".generation"
+
+# Sous Windows, os.replace échoue tant qu'un lecteur garde le fichier ouvert: on réessaie
+REPLACE_ATTEMPTS = 20
+REPLACE_RETRY_DELAY = 0.05
+
+def _fsync_directory(directory: str):
+    """Rend le renommage durable (POSIX uniquement)"""
+    if sys.platform == "win32":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _replace(source: str, target: str):
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if sys.platform != "win32" or attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+@contextmanager
+def atomic_open(filepath: str, mode: str = "w", encoding: Optional[str] = "utf-8",
+                generation: bool = False, newline: Optional[str] = None) -> Iterator:
+    """
+    Comme open(filepath, mode), mais le fichier n'est remplacé qu'à la sortie du bloc,
+    d'un coup. En cas d'exception, le fichier d'origine reste intact.
+    """
+    if "b" in mode:
+        encoding = None
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filepath)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filepath):
+            # mkstemp crée le fichier en 0600: garder les droits du fichier remplacé
+            os.chmod(tmp_path, os.stat(filepath).st_mode & 0o777)
+        else:
+            os.chmod(tmp_path, 0o644)
+        _replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+    if generation:
+        bump_generation(filepath)
+
+def atomic_write(filepath: str, data, generation: bool = False):
+    """Écrit `data` (str ou bytes) de façon atomique"""
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with atomic_open(filepath, mode, generation=generation) as f:
+        f.write(data)
+
+def write_json(filepath: str, data: Any, generation: bool = False, **dump_options):
+    """json.dump atomique (par défaut ensure_ascii=False, indent=2, comme les scripts)"""
+    dump_options.setdefault("ensure_ascii", False)
+    dump_options.setdefault("indent", 2)
+    with atomic_open(filepath, generation=generation) as f:
+        json.dump(data, f, **dump_options)
+
+def read_generation(filepath: str) -> int:
+    """Génération courante d'un fichier (0 s'il n'a jamais été écrit avec generation=True)"""
+    try:
+        with open(filepath + GENERATION_SUFFIX, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def bump_generation(filepath: str) -> int:
+    """Incrémente la génération d'un fichier (un seul écrivain à la fois) et la retourne"""
+    generation = read_generation(filepath) + 1
+    atomic_write(filepath + GENERATION_SUFFIX, f"{generation}\n")
+    return generation
+
+class GenerationReader:
+    """
+    Lecture avec cache: `load()` ne relit le fichier que si sa génération a changé
+    `loader` transforme le chemin en valeur (défaut: json.load)
+    """
+
+    def __init__(self, filepath: str, loader: Callable[[str], Any] = None):
+        self.filepath = filepath
+        self.loader = loader or _load_json
+        self.generation: Optional[int] = None
+        self.value: Any = None
+
+    def changed(self) -> bool:
+        return read_generation(self.filepath) != self.generation
+
+    def load(self) -> Any:
+        # Génération lue avant le fichier: une écriture concurrente provoque au pire une relecture de plus
+        generation = read_generation(self.filepath)
+        if generation != self.generation or self.value is None:
+            self.value = self.loader(self.filepath)
+            self.generation = generation
+        return self.value
+
+def _load_json(filepath: str) -> Dict:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Scoring vectorisé (NumPy) de profils de qualification contre tout le catalogue
+
+Le backend score les produits un par un à chaque demande de recommandations. Ici, le
+catalogue et les profils sont encodés en matrices booléennes, et des milliers de profils
+sont scorés en une seule passe (produits matriciels): analyses "et si" hors ligne et
+tables de top-N précalculées.
+
+Deux modes:
+- "questions": algorithme servi par /api/qualification/recommendations
+  (BenefitsMatchingSystem.matchProducts, qualification-questions.json), à l'identique:
+  filtres (contre-indications de la phase 1, tags requis de la phase 2), puis
+  3.0 par tag requis + 1.0 par tag souhaité + bonus de contexte
+  profil: {"category": "hair", "answers": {"step1": "curly", "step3": "dryness", "step4": ["shine"]}}
+- "config": parcours de qualification-config.json (catégorie, préoccupations, objectif)
+  score = concern_match * part pondérée des préoccupations traitées par le produit
+        + objective_match * part des objectifs dont un mot-clé (objective_to_benefit_keywords)
+          apparaît dans les bienfaits / la description
+        + category_match (les produits d'une autre catégorie sont écartés)
+  produits sous min_confidence_threshold écartés
+  profil: {"category": "hair", "concerns": ["dryness", "frizz"], "objectives": ["shine"]}
+
+Usage:
+    python batch_scoring.py --profiles profils.json [--mode config] [--top 3] [-o top.json]
+    python batch_scoring.py --random 10000 [--mode config]      # profils aléatoires (benchmark)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle des scripts
+    np = None
+
+from text_utils import normalize_text
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config")
+DEFAULT_CATALOG = os.path.join(CONFIG_DIR, "products.json")
+DEFAULT_QUESTIONS = os.path.join(CONFIG_DIR, "qualification-questions.json")
+DEFAULT_CONFIG = os.path.join(CONFIG_DIR, "qualification-config.json")
+
+# Profils scorés par bloc: borne la mémoire des matrices profils x produits
+PROFILE_CHUNK_SIZE = 4096
+
+# Constantes de BenefitsMatchingSystem.scoreProduct (backend/benefitsMatchingSystem.js)
+REQUIRED_TAG_WEIGHT = 3.0
+DESIRED_TAG_WEIGHT = 1.0
+SAFE_BONUS = 0.7
+MULTIPLE_REQUIRED_BONUS = 1.0
+MULTIPLE_DESIRED_BONUS = 0.5
+HUMIDITY_RESISTANT_BONUS = 3.0
+FRIZZ_TAGS = {"anti-frizz", "frizz-control", "smooth"}
+# Champ des options lu pour chaque phase de qualification-questions.json
+PHASE_FIELDS = {"phase1": "contraindications", "phase2": "requiredTags", "phase3": "benefitTags"}
+
+def require_numpy():
+    if np is None:
+        sys.exit("❌ NumPy est requis pour le scoring par lots: pip install numpy")
+
+def load_json(filepath: str) -> Dict:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _vocabulary(values: Iterable[str]) -> Dict[str, int]:
+    return {value: i for i, value in enumerate(dict.fromkeys(values))}
+
+def _encode(rows: Sequence[Iterable[str]], vocabulary: Dict[str, int], dtype=None) -> "np.ndarray":
+    """Matrice booléenne (ou 0/1 de type `dtype`) len(rows) x len(vocabulary); valeurs inconnues ignorées"""
+    matrix = np.zeros((len(rows), len(vocabulary)), dtype=dtype or bool)
+    for i, values in enumerate(rows):
+        for value in values:
+            if value in vocabulary:
+                matrix[i, vocabulary[value]] = 1
+    return matrix
+
+def _selected(answer) -> List:
+    return answer if isinstance(answer, list) else [answer]
+
+def _top_n(scores: "np.ndarray", keep: "np.ndarray", ids: List[str], limit: int,
+           extra: "np.ndarray" = None) -> List[List[Tuple]]:
+    """
+    Meilleurs produits de chaque profil: score décroissant, ordre du catalogue à égalité
+    (tri stable, comme Array.prototype.sort côté backend)
+    """
+    ranked = np.argsort(-np.where(keep, scores, -np.inf), axis=1, kind="stable")[:, :limit]
+    results = []
+    for row, columns in enumerate(ranked):
+        top = []
+        for column in columns:
+            if not keep[row, column]:
+                break
+            entry = (ids[column], float(scores[row, column]))
+            if extra is not None:
+                entry += (float(extra[row, column]),)
+            top.append(entry)
+        results.append(top)
+    return results
+
+class QuestionsScorer:
+    """Mode "questions": BenefitsMatchingSystem.matchProducts vectorisé"""
+
+    def __init__(self, products: List[Dict], questions: Dict):
+        require_numpy()
+        self.questions = questions
+        self.ids = [p["id"] for p in products]
+        self.categories = np.array([p.get("category") or "" for p in products], dtype=object)
+        tags = [p.get("tags") or [] for p in products]
+        contraindications = [p.get("contraindications") or [] for p in products]
+        self.tag_vocabulary = _vocabulary(t for row in tags for t in row)
+        self.contraindication_vocabulary = _vocabulary(c for row in contraindications for c in row)
+        # Matrices produits x vocabulaire (int16: les produits matriciels comptent les tags communs)
+        self.tags = _encode(tags, self.tag_vocabulary, np.int16)
+        self.contraindications = _encode(contraindications, self.contraindication_vocabulary, np.int16)
+        self.has_tags = np.array([bool(row) for row in tags])
+        self.humidity_resistant = np.array([(p.get("metadata") or {}).get("humidity-resistant") is True
+                                            for p in products])
+
+    def requirements(self, category: str, answers: Dict) -> Tuple[List[str], List[str], List[str]]:
+        """(contre-indications, tags requis, tags souhaités), comme les extract* du backend"""
+        data = self.questions[category]
+        steps = {step["id"]: step for step in data["steps"]}
+        collected = {phase: [] for phase in PHASE_FIELDS}
+        for phase, values in collected.items():
+            for step_id in data["phases"][phase]["steps"]:
+                answer = answers.get(f"step{step_id}")
+                if step_id not in steps or not answer:
+                    continue
+                # Phase 2: une seule réponse (une liste ne correspond à aucune option)
+                selected = [answer] if phase == "phase2" else _selected(answer)
+                for option in steps[step_id]["options"]:
+                    if option["id"] in selected:
+                        values.extend(option.get(PHASE_FIELDS[phase], []))
+        return tuple(list(dict.fromkeys(values)) for values in collected.values())
+
+    def score(self, profiles: Sequence[Dict]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """(totalScore, normalizedScore, retenu) de chaque profil x produit"""
+        requirements = [self.requirements(p["category"], p.get("answers", {})) for p in profiles]
+        user_contraindications = _encode([r[0] for r in requirements], self.contraindication_vocabulary, np.int16)
+        required = _encode([r[1] for r in requirements], self.tag_vocabulary, np.int16)
+        desired = _encode([r[2] for r in requirements], self.tag_vocabulary, np.int16)
+        required_count = np.array([len(r[1]) for r in requirements])
+        desired_count = np.array([len(r[2]) for r in requirements])
+        frizz = np.array([bool(FRIZZ_TAGS.intersection(r[1])) for r in requirements])
+        categories = np.array([p["category"] for p in profiles], dtype=object)
+
+        required_matches = required @ self.tags.T
+        desired_matches = desired @ self.tags.T
+        safe = (user_contraindications @ self.contraindications.T) == 0
+
+        keep = (safe & self.has_tags[None, :]
+                & (categories[:, None] == self.categories[None, :])
+                & ((required_count == 0)[:, None] | (required_matches > 0)))
+
+        # Même ordre d'additions que le backend: résultats identiques au bit près
+        context = (SAFE_BONUS
+                   + np.where(required_matches >= 2, MULTIPLE_REQUIRED_BONUS, 0.0)
+                   + np.where(desired_matches >= 2, MULTIPLE_DESIRED_BONUS, 0.0)
+                   + np.where(frizz[:, None] & self.humidity_resistant[None, :], HUMIDITY_RESISTANT_BONUS, 0.0))
+        total = (REQUIRED_TAG_WEIGHT * required_matches + DESIRED_TAG_WEIGHT * desired_matches) + context
+        max_possible = REQUIRED_TAG_WEIGHT * required_count + DESIRED_TAG_WEIGHT * desired_count + 3.0
+        normalized = np.minimum(total / max_possible[:, None], 1.0)
+        return total, normalized, keep
+
+    def top_n(self, profiles: Sequence[Dict], limit: int = 3) -> List[List[Tuple[str, float, float]]]:
+        """[(id, totalScore, normalizedScore)] des `limit` meilleurs produits de chaque profil"""
+        results = []
+        for start in range(0, len(profiles), PROFILE_CHUNK_SIZE):
+            total, normalized, keep = self.score(profiles[start:start + PROFILE_CHUNK_SIZE])
+            results.extend(_top_n(total, keep & (total > 0), self.ids, limit, normalized))
+        return results
+
+    def random_profiles(self, count: int, seed: int = 0) -> List[Dict]:
+        rng = random.Random(seed)
+        profiles = []
+        for _ in range(count):
+            category = rng.choice(sorted(self.questions.keys() - {"metadata"}))
+            answers = {}
+            for step in self.questions[category]["steps"]:
+                options = [o["id"] for o in step["options"]]
+                if step["type"] == "multi_select":
+                    answers[f"step{step['id']}"] = rng.sample(options, rng.randint(step.get("min", 0), step.get("max", 1)))
+                else:
+                    answers[f"step{step['id']}"] = rng.choice(options)
+            profiles.append({"category": category, "answers": answers})
+        return profiles
+
+class ConfigScorer:
+    """Mode "config": préoccupations / objectifs de qualification-config.json"""
+
+    def __init__(self, products: List[Dict], config: Dict):
+        require_numpy()
+        self.config = config
+        self.weights = config["scoring_config"]["weights"]
+        self.threshold = config["scoring_config"].get("min_confidence_threshold", 0.0)
+        flow = config["qualification_flow"]
+        self.concern_weights = {category: {o["id"]: o.get("weight", 1) for o in options}
+                                for category, options in flow["step2"]["options_by_category"].items()}
+        self.objectives = {category: [o["id"] for o in options]
+                           for category, options in flow["step3"]["options_by_category"].items()}
+
+        self.ids = [p["id"] for p in products]
+        self.categories = np.array([p.get("category") or "" for p in products], dtype=object)
+        concerns = [p.get("concerns") or [] for p in products]
+        self.concern_vocabulary = _vocabulary(c for weights in self.concern_weights.values() for c in weights)
+        self.concerns = _encode(concerns, self.concern_vocabulary, np.float64)
+
+        keywords = config["objective_to_benefit_keywords"]
+        self.objective_vocabulary = _vocabulary(keywords)
+        texts = [normalize_text(json.dumps([p.get("benefits"), p.get("description")], ensure_ascii=False))
+                 for p in products]
+        hits = [[objective for objective, words in keywords.items()
+                 if any(normalize_text(word) in text for word in words)] for text in texts]
+        self.objective_hits = _encode(hits, self.objective_vocabulary, np.float64)
+
+    def score(self, profiles: Sequence[Dict]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """(score 0-1, retenu) de chaque profil x produit"""
+        concern_weights = np.zeros((len(profiles), len(self.concern_vocabulary)))
+        objectives = _encode([_selected(p.get("objectives") or []) for p in profiles],
+                             self.objective_vocabulary, np.float64)
+        for i, profile in enumerate(profiles):
+            weights = self.concern_weights.get(profile["category"], {})
+            for concern in profile.get("concerns") or []:
+                if concern in self.concern_vocabulary:
+                    concern_weights[i, self.concern_vocabulary[concern]] = weights.get(concern, 1)
+        categories = np.array([p["category"] for p in profiles], dtype=object)
+
+        # Parts (0 si le profil n'a rien sélectionné): divisions protégées
+        concern_total = concern_weights.sum(axis=1, keepdims=True)
+        concern_share = (concern_weights @ self.concerns.T) / np.where(concern_total > 0, concern_total, 1)
+        objective_total = objectives.sum(axis=1, keepdims=True)
+        objective_share = (objectives @ self.objective_hits.T) / np.where(objective_total > 0, objective_total, 1)
+        category_match = (categories[:, None] == self.categories[None, :]).astype(np.float64)
+
+        score = (self.weights["concern_match"] * concern_share
+                 + self.weights["objective_match"] * objective_share
+                 + self.weights["category_match"] * category_match)
+        return score, (category_match > 0) & (score >= self.threshold)
+
+    def top_n(self, profiles: Sequence[Dict], limit: int = 3) -> List[List[Tuple[str, float]]]:
+        results = []
+        for start in range(0, len(profiles), PROFILE_CHUNK_SIZE):
+            score, keep = self.score(profiles[start:start + PROFILE_CHUNK_SIZE])
+            results.extend(_top_n(score, keep, self.ids, limit))
+        return results
+
+    def random_profiles(self, count: int, seed: int = 0) -> List[Dict]:
+        rng = random.Random(seed)
+        profiles = []
+        for _ in range(count):
+            category = rng.choice(sorted(self.concern_weights))
+            concerns = list(self.concern_weights[category])
+            profiles.append({"category": category,
+                             "concerns": rng.sample(concerns, rng.randint(1, min(3, len(concerns)))),
+                             "objectives": [rng.choice(self.objectives[category])]})
+        return profiles
+
+def create_scorer(mode: str, catalog_path: str = DEFAULT_CATALOG, questions_path: str = DEFAULT_QUESTIONS,
+                  config_path: str = DEFAULT_CONFIG):
+    products = load_json(catalog_path)["products"]
+    if mode == "questions":
+        return QuestionsScorer(products, load_json(questions_path))
+    return ConfigScorer(products, load_json(config_path))
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring vectorisé de profils de qualification")
+    parser.add_argument("--mode", choices=["questions", "config"], default="questions")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--profiles", help="Fichier JSON: liste de profils")
+    source.add_argument("--random", type=int, help="Nombre de profils aléatoires à scorer")
+    parser.add_argument("--top", type=int, default=3, help="Produits retenus par profil")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("-o", "--output", help="Résultats JSON (défaut: résumé seulement)")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    scorer = create_scorer(args.mode, args.catalog)
+    profiles = load_json(args.profiles) if args.profiles else scorer.random_profiles(args.random)
+
+    start = time.perf_counter()
+    results = scorer.top_n(profiles, args.top)
+    elapsed = time.perf_counter() - start
+    print(f"🚀 {len(profiles)} profils x {len(scorer.ids)} produits en {elapsed * 1000:.1f} ms "
+          f"({len(profiles) / max(elapsed, 1e-9):,.0f} profils/s)")
+
+    if args.output:
+        from atomic_io import write_json
+        write_json(args.output, [{"profile": profile, "top": [list(entry) for entry in top]}
+                                 for profile, top in zip(profiles, results)])
+        print(f"✅ Résultats: {args.output}")
+    else:
+        for profile, top in list(zip(profiles, results))[:5]:
+            print(f"  {json.dumps(profile, ensure_ascii=False)} -> {[entry[0] for entry in top]}")
+
+if __name__ == "__main__":
+    main()
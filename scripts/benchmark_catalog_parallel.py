@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark de montée en charge du pipeline catalogue (enrichissement + amélioration)
+Exécute le pipeline en flux avec 1, 2, 4... processus sur un catalogue synthétique,
+rapporte le débit en produits/s et vérifie que la sortie est identique au mode série.
+
+Usage: python scripts/benchmark_catalog_parallel.py [--size 20000] [--workers 1 2 4]
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from benchmark_catalog_stream import generate_catalog
+from catalog_io import CatalogStream, write_catalog_stream
+from enrich_product_catalog import enrich_products
+from improve_catalog_descriptions import improve_products
+from product_matcher import ProductMatcher
+
+def default_worker_counts():
+    """1, 2, 4... jusqu'au nombre de cœurs"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+def run_pipeline(input_path, output_path, workers):
+    """Enrichissement puis amélioration en flux; retourne la durée en s"""
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        with CatalogStream(input_path) as catalog:
+            stats = {"matched": 0, "generated": 0, "total": 0, "improved": 0}
+            enriched = enrich_products(catalog, ProductMatcher([]), {}, stats, verbose=False, workers=workers)
+            write_catalog_stream(output_path, catalog.sections, improve_products(enriched, stats, workers))
+    return time.perf_counter() - start
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline catalogue multi-processus")
+    parser.add_argument("--size", type=int, default=20000, help="Produits du catalogue synthétique")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_worker_counts())
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmark: {args.size} produits, {os.cpu_count()} cœur(s) disponibles\n")
+    print(f"{'processus':>10} {'durée s':>8} {'produits/s':>11} {'accélération':>13} {'sortie':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "catalog.json")
+        generate_catalog(input_path, args.size)
+
+        reference = None
+        baseline = None
+        for workers in args.workers:
+            output_path = os.path.join(tmp, f"out_{workers}.json")
+            elapsed = run_pipeline(input_path, output_path, workers)
+            output = read_bytes(output_path)
+            if reference is None:
+                reference, baseline = output, elapsed
+            identical = "✅" if output == reference else "❌"
+            print(f"{workers:>10} {elapsed:>8.2f} {args.size / elapsed:>11.0f} "
+                  f"{baseline / elapsed:>12.2f}x {identical:>7}")
+
+if __name__ == "__main__":
+    main()
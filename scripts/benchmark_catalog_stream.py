@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire du pipeline catalogue: json.load/json.dump complet vs lecture/écriture en flux
+Génère des catalogues synthétiques (10k et 100k produits par défaut), exécute
+enrichissement + amélioration dans un sous-processus par mode et rapporte le pic RSS.
+
+Usage: python scripts/benchmark_catalog_stream.py [--sizes 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from catalog_io import CatalogStream, iter_products, write_catalog_stream
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_CATALOG = os.path.join(SCRIPT_DIR, "..", "config", "products.json")
+
+def synthetic_products(count):
+    """Variantes des vrais produits, avec de longues descriptions bilingues"""
+    base = list(iter_products(SOURCE_CATALOG))
+    for i in range(count):
+        product = json.loads(json.dumps(base[i % len(base)]))
+        product["id"] = f"{product['id']}-{i}"
+        for lang in ("en", "ar"):
+            text = product.get("description", {}).get(lang, "")
+            product.setdefault("description", {})[lang] = (text + "\n\n") * 4
+        yield product
+
+def generate_catalog(path, count):
+    with CatalogStream(SOURCE_CATALOG) as source:
+        sections = source.sections
+        write_catalog_stream(path, sections, synthetic_products(count))
+
+def run_pipeline(mode, input_path, output_path):
+    """Enrichissement puis amélioration, sans mapping backup (descriptions générées)"""
+    from enrich_product_catalog import create_enriched_product, enrich_products
+    from improve_catalog_descriptions import improve_chunk, improve_products
+    from product_matcher import ProductMatcher
+
+    if mode == "json":
+        with open(input_path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+        enriched = [create_enriched_product(p) for p in catalog["products"]]
+        catalog["products"] = [product for product, _ in improve_chunk(enriched)]
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, ensure_ascii=False, indent=2)
+    else:
+        with CatalogStream(input_path) as catalog:
+            stats = {"matched": 0, "generated": 0, "total": 0, "improved": 0}
+            enriched = enrich_products(catalog, ProductMatcher([]), {}, stats, verbose=False)
+            write_catalog_stream(output_path, catalog.sections, improve_products(enriched, stats))
+
+def measure(mode, input_path, output_path):
+    """Lance le pipeline dans un processus neuf et retourne (pic RSS en Mo, durée en s)"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--run", mode, input_path, output_path]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True, cwd=SCRIPT_DIR)
+    peak_kb, elapsed = result.stdout.split()
+    return int(peak_kb) / 1024, float(elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mémoire: json.load vs flux")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--run", nargs=3, metavar=("MODE", "INPUT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # Mode interne: exécution mesurée dans un sous-processus
+        import io
+        from contextlib import redirect_stdout
+        mode, input_path, output_path = args.run
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            run_pipeline(mode, input_path, output_path)
+        elapsed = time.perf_counter() - start
+        # ru_maxrss est en Ko sous Linux
+        print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, elapsed)
+        return
+
+    print(f"{'produits':>10} {'taille Mo':>10} {'mode':<6} {'pic RSS Mo':>11} {'durée s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            input_path = os.path.join(tmp, f"catalog_{size}.json")
+            generate_catalog(input_path, size)
+            file_mb = os.path.getsize(input_path) / 1e6
+            for mode in ("json", "stream"):
+                peak_mb, elapsed = measure(mode, input_path, os.path.join(tmp, f"out_{mode}.json"))
+                print(f"{size:>10} {file_mb:>10.1f} {mode:<6} {peak_mb:>11.1f} {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
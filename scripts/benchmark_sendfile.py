@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark CPU par Mo servi par start-chatbot.py pour les gros fichiers
+Compare la copie via buffers Python (--no-sendfile) à l'envoi zéro-copie (sendfile),
+cache mémoire désactivé pour que chaque requête parte du disque
+
+Usage: python scripts/benchmark_sendfile.py [--clients 8] [--requests 200]
+Mesure CPU via /proc: Linux uniquement
+"""
+
+import argparse
+
+from benchmark_web_server import benchmark_mode, find_free_port
+
+# Les plus gros fichiers servis: catalogue et images produits
+LARGE_PATHS = [
+    "/config/products.json",
+    "/widget/images/Cocoa%20shea%20hand-cream.webp",
+    "/widget/images/MixoilBlackBodycream.webp",
+    "/widget/images/AfricaHairMask.webp",
+]
+
+MODES = {
+    "copy": ["--mode", "threaded", "--cache-mb", "0", "--no-sendfile"],
+    "sendfile": ["--mode", "threaded", "--cache-mb", "0"],
+    "memory-cache": ["--mode", "threaded"],
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU/Mo: copie Python vs sendfile")
+    parser.add_argument("--clients", type=int, default=8, help="Clients concurrents")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par client")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmark gros fichiers: {args.clients} clients x {args.requests} requêtes\n")
+    rows = [
+        benchmark_mode(mode, MODES[mode], find_free_port(), args.clients, args.requests,
+                       paths=LARGE_PATHS)
+        for mode in args.modes
+    ]
+
+    print(f"{'mode':<14} {'Mo servis':>10} {'CPU s':>8} {'CPU ms/Mo':>10} {'MB/s':>8} {'erreurs':>8}")
+    for row in rows:
+        cpu = f"{row['cpu_s']:.2f}" if row["cpu_s"] is not None else "n/a"
+        per_mb = f"{row['cpu_ms_per_mb']:.2f}" if row["cpu_ms_per_mb"] is not None else "n/a"
+        print(f"{row['mode']:<14} {row['megabytes']:>10.1f} {cpu:>8} {per_mb:>10} "
+              f"{row['mb_per_s']:>8.1f} {row['errors']:>8}")
+
+    before, after = rows[0]["cpu_ms_per_mb"], rows[1]["cpu_ms_per_mb"] if len(rows) > 1 else None
+    if before and after:
+        print(f"\n📊 CPU par Mo {rows[1]['mode']} vs {rows[0]['mode']}: {after / before:.0%}")
+
+if __name__ == "__main__":
+    main()
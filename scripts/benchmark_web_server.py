@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark de débit du serveur web Python (start-chatbot.py)
+Compare le mode historique single-thread au mode threaded (pool de workers + keep-alive)
+
+Usage: python scripts/benchmark_web_server.py [--clients 16] [--requests 200]
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(ROOT_DIR, "start-chatbot.py")
+
+# Mélange représentatif d'une visite: page, widget, catalogue, images
+PATHS = [
+    "/",
+    "/widget/chatbot.js",
+    "/widget/chatbot.css",
+    "/config/products.json",
+    "/widget/images/MixoilWhiteshampoo.webp",
+    "/widget/images/CocosheaMask.webp",
+]
+
+MODES = {
+    "single": ["--mode", "single"],
+    "threaded": ["--mode", "threaded"],
+}
+
+def find_free_port():
+    """Port libre choisi par l'OS (évite les ports encore en TIME_WAIT)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=10.0):
+    """Attend que le serveur accepte les connexions"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Le serveur n'a pas démarré sur le port {port}")
+
+def start_server(port, server_args):
+    """Lance start-chatbot.py dans un sous-processus"""
+    cmd = [sys.executable, SERVER_SCRIPT, "--port", str(port), "--no-browser"] + server_args
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port)
+    return proc
+
+def hold_idle_connection(port, seconds, stop):
+    """Client lent: ouvre une connexion et n'envoie la requête qu'au bout de `seconds`"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    try:
+        stop.wait(seconds)
+        sock.sendall(b"GET / HTTP/1.0\r\n\r\n")
+        sock.recv(1)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+def process_cpu_seconds(pid):
+    """Temps CPU (user + system) d'un processus, via /proc (Linux uniquement)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime et stime sont les champs 14 et 15 de /proc/<pid>/stat
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def run_client(port, num_requests, results, lock, paths=PATHS):
+    """Un client qui réutilise sa connexion tant que le serveur la garde ouverte"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies = []
+    total_bytes = 0
+    errors = 0
+    for i in range(num_requests):
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            total_bytes += len(response.read())
+            if response.status not in (200, 206):
+                errors += 1
+            if response.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        results["latencies"].extend(latencies)
+        results["bytes"] += total_bytes
+        results["errors"] += errors
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def benchmark_mode(mode, server_args, port, clients, requests_per_client, slow_seconds=0.0,
+                   paths=PATHS):
+    proc = start_server(port, server_args)
+    results = {"latencies": [], "bytes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    try:
+        slow = None
+        if slow_seconds > 0:
+            slow = threading.Thread(target=hold_idle_connection, args=(port, slow_seconds, stop))
+            slow.start()
+            time.sleep(0.1)
+
+        threads = [
+            threading.Thread(target=run_client, args=(port, requests_per_client, results, lock, paths))
+            for _ in range(clients)
+        ]
+        cpu_before = process_cpu_seconds(proc.pid)
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        cpu_after = process_cpu_seconds(proc.pid)
+
+        stop.set()
+        if slow:
+            slow.join()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    total = len(results["latencies"])
+    megabytes = results["bytes"] / 1e6
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return {
+        "mode": mode,
+        "requests": total,
+        "errors": results["errors"],
+        "elapsed": elapsed,
+        "rps": total / elapsed if elapsed else 0.0,
+        "mb_per_s": results["bytes"] / elapsed / 1e6 if elapsed else 0.0,
+        "p50_ms": percentile(results["latencies"], 50) * 1000,
+        "p99_ms": percentile(results["latencies"], 99) * 1000,
+        "megabytes": megabytes,
+        "cpu_s": cpu,
+        "cpu_ms_per_mb": cpu * 1000 / megabytes if cpu is not None and megabytes else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du serveur web start-chatbot.py")
+    parser.add_argument("--clients", type=int, default=16, help="Clients concurrents")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par client")
+    parser.add_argument("--slow-seconds", type=float, default=0.0,
+                        help="Ajoute un client lent qui garde une connexion muette ouverte")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmark: {args.clients} clients x {args.requests} requêtes\n")
+    rows = []
+    for mode in args.modes:
+        rows.append(benchmark_mode(mode, MODES[mode], find_free_port(),
+                                   args.clients, args.requests, args.slow_seconds))
+
+    print(f"{'mode':<10} {'req/s':>10} {'MB/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'erreurs':>8}")
+    for row in rows:
+        print(f"{row['mode']:<10} {row['rps']:>10.0f} {row['mb_per_s']:>8.1f} "
+              f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['errors']:>8}")
+
+    if len(rows) > 1 and rows[0]["rps"]:
+        print(f"\n📊 Gain {rows[-1]['mode']} vs {rows[0]['mode']}: x{rows[-1]['rps'] / rows[0]['rps']:.2f}")
+
+if __name__ == "__main__":
+    main()
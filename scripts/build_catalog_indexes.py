@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Index de recherche précalculés du catalogue (config/products.indexes.json)
+
+Produits par improve_catalog_descriptions.py à chaque écriture de products.json, ou à la
+demande via ce script. Chaque index associe une valeur à la liste des positions des
+produits dans products.json["products"] (accès direct products[i] côté backend):
+
+{
+  "indexFormat": 1,
+  "catalog": {"file": "products.json", "sha256": ..., "products": 32, "version": "4.1.0"},
+  "priceBucketSize": 100,
+  "byId": {"cocoshea-shampoo": 18, ...},
+  "byType": {"shampoo": [0, 10, ...]}, "byCollection": {...}, "byCategory": {...},
+  "byConcern": {...}, "byHairType": {...}, "byPriceBucket": {"100": [...], "200": [...]},
+  "byTag": {"hydration": [...]}
+}
+- sha256: empreinte du fichier products.json indexé; un index dont l'empreinte ne
+  correspond plus au catalogue doit être ignoré
+- byPriceBucket: tranche de prix [clé, clé + priceBucketSize[
+
+Usage: python build_catalog_indexes.py [CATALOGUE] [-o SORTIE]
+"""
+
+import argparse
+import hashlib
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator
+
+from atomic_io import write_json
+from catalog_io import CatalogStream
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "products.json")
+
+INDEX_FORMAT = 1
+PRICE_BUCKET_SIZE = 100
+INDEX_SUFFIX = ".indexes.json"
+
+# Index multi-valeurs: nom de l'index -> champ du produit (valeur simple ou liste)
+FIELD_INDEXES = {
+    "byType": "type",
+    "byCollection": "collection",
+    "byCategory": "category",
+    "byConcern": "concerns",
+    "byHairType": "hairTypes",
+    "byTag": "tags",
+}
+
+def index_path(catalog_path: str) -> str:
+    """config/products.json -> config/products.indexes.json"""
+    return os.path.splitext(catalog_path)[0] + INDEX_SUFFIX
+
+def file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class CatalogIndexBuilder:
+    """Construit les index au fil d'un flux de produits (voir `observe`)"""
+
+    def __init__(self, price_bucket_size: int = PRICE_BUCKET_SIZE):
+        self.price_bucket_size = price_bucket_size
+        self.count = 0
+        self.by_id: Dict[str, int] = {}
+        self.postings = {name: defaultdict(list) for name in list(FIELD_INDEXES) + ["byPriceBucket"]}
+
+    def add(self, product: Dict):
+        position = self.count
+        self.count += 1
+        self.by_id[product["id"]] = position
+
+        for name, field in FIELD_INDEXES.items():
+            values = product.get(field)
+            if values is None:
+                continue
+            if not isinstance(values, list):
+                values = [values]
+            # dict.fromkeys: sans doublon, ordre conservé
+            for value in dict.fromkeys(values):
+                self.postings[name][str(value)].append(position)
+
+        price = product.get("price")
+        if isinstance(price, (int, float)):
+            bucket = int(price // self.price_bucket_size) * self.price_bucket_size
+            self.postings["byPriceBucket"][str(bucket)].append(position)
+
+    def observe(self, products: Iterable[Dict]) -> Iterator[Dict]:
+        """Laisse passer les produits en les indexant (à insérer dans un pipeline en flux)"""
+        for product in products:
+            self.add(product)
+            yield product
+
+    def result(self, catalog_path: str, version: str = None) -> Dict:
+        """Index complets, avec l'empreinte du fichier catalogue tel qu'écrit sur disque"""
+        indexes = {
+            "indexFormat": INDEX_FORMAT,
+            "catalog": {
+                "file": os.path.basename(catalog_path),
+                "sha256": file_sha256(catalog_path),
+                "products": self.count,
+                "version": version,
+            },
+            "priceBucketSize": self.price_bucket_size,
+            "byId": self.by_id,
+        }
+        for name, postings in self.postings.items():
+            indexes[name] = dict(postings)
+        return indexes
+
+def write_indexes(builder: CatalogIndexBuilder, catalog_path: str, version: str = None,
+                  output_path: str = None) -> str:
+    """Écrit les index (JSON compact, écriture atomique); retourne le chemin écrit"""
+    output_path = output_path or index_path(catalog_path)
+    write_json(output_path, builder.result(catalog_path, version), generation=True,
+               indent=None, separators=(",", ":"))
+    return output_path
+
+def build_indexes(catalog_path: str, output_path: str = None) -> str:
+    """Indexe un catalogue existant (lu en flux)"""
+    builder = CatalogIndexBuilder()
+    with CatalogStream(catalog_path) as catalog:
+        for _ in builder.observe(catalog):
+            pass
+        version = catalog.sections.get("metadata", {}).get("version")
+    return write_indexes(builder, catalog_path, version, output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit les index de recherche du catalogue")
+    parser.add_argument("catalog", nargs="?", default=DEFAULT_CATALOG)
+    parser.add_argument("-o", "--output", help="Fichier d'index (défaut: <catalogue>.indexes.json)")
+    args = parser.parse_args()
+
+    output = build_indexes(args.catalog, args.output)
+    print(f"✅ Index écrits: {output} ({os.path.getsize(output) / 1024:.1f} Ko)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Images produits adressées par contenu (widget/images/built/, config/images.manifest.json)
+
+Chaque image source de widget/images/ est publiée sous un nom dérivé de son contenu,
+avec des variantes réduites pour les cartes produits du chat:
+
+    images/Cocoa shea hand-cream.webp
+      -> images/built/cocoa-shea-hand-cream.3f2a1b9c0d4e.webp         (original)
+      -> images/built/cocoa-shea-hand-cream-medium.8e1f...webp         (480 px max)
+      -> images/built/cocoa-shea-hand-cream-thumb.a94c...webp          (200 px max)
+
+- nom: nom source normalisé (minuscules, tirets), variante, 12 premiers caractères du
+  sha256 du fichier écrit: un contenu modifié change d'URL, le navigateur peut garder
+  une URL en cache indéfiniment (backend/server.js: Cache-Control immutable)
+- le manifeste associe chaque source à ses fichiers; une source inchangée (même sha256,
+  fichiers présents) n'est pas retraitée
+- products.json: `image` pointe vers l'original publié, `imageSizes` vers les variantes;
+  les index du catalogue sont reconstruits
+- variantes: Pillow requis (pip install Pillow); sans Pillow, seuls les originaux sont
+  publiés. Une image déjà plus petite que la variante n'est pas agrandie (même fichier).
+- traitement en parallèle sur tous les cœurs (--workers)
+
+Ordre du pipeline: à lancer après improve_catalog_descriptions.py. La chaîne
+sync -> enrich -> improve réécrit products.json avec les chemins sources (`image` vers
+images/<source>, sans `imageSizes`): relancer build_images.py après elle, sinon
+check_images.py --prune voit tout images/built/ comme orphelin et le supprime.
+Le catalogue réécrit change d'empreinte: reconstruire ensuite build_recommendation_table.py
+et compile_knowledge_base.py.
+
+Usage: python build_images.py [--workers N] [--no-catalog]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow optionnel: originaux seulement
+    Image = None
+
+from atomic_io import atomic_write, write_json
+from build_catalog_indexes import CatalogIndexBuilder, write_indexes
+from catalog_io import CatalogStream, map_in_chunks, resolve_workers, write_catalog_stream
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+WIDGET_DIR = os.path.join(ROOT_DIR, "widget")
+IMAGES_DIR = os.path.join(WIDGET_DIR, "images")
+BUILT_DIR = os.path.join(IMAGES_DIR, "built")
+DEFAULT_CATALOG = os.path.join(ROOT_DIR, "config", "products.json")
+DEFAULT_MANIFEST = os.path.join(ROOT_DIR, "config", "images.manifest.json")
+
+MANIFEST_FORMAT = 1
+IMAGE_EXTENSIONS = (".webp", ".png", ".jpg", ".jpeg")
+HASH_LENGTH = 12
+# Variante -> plus grand côté en pixels
+VARIANTS = {"medium": 480, "thumb": 200}
+WEBP_QUALITY = 80
+# Images par lot envoyé à un processus worker
+IMAGE_CHUNK_SIZE = 4
+
+def slugify(filename: str) -> str:
+    """'Cocoa shea hand-cream.webp' -> 'cocoa-shea-hand-cream'"""
+    stem = os.path.splitext(filename)[0]
+    return re.sub(r"[^a-z0-9]+", "-", stem.lower()).strip("-") or "image"
+
+def widget_path(filepath: str) -> str:
+    """Chemin tel qu'utilisé par le widget et le catalogue ("images/...")"""
+    return os.path.relpath(filepath, WIDGET_DIR).replace(os.sep, "/")
+
+def _publish(data: bytes, slug: str, extension: str, built_dir: str) -> Dict:
+    """Écrit `data` sous son nom adressé par contenu (s'il n'existe pas déjà)"""
+    digest = hashlib.sha256(data).hexdigest()
+    filepath = os.path.join(built_dir, f"{slug}.{digest[:HASH_LENGTH]}{extension}")
+    if not os.path.exists(filepath):
+        atomic_write(filepath, data)
+    return {"path": widget_path(filepath), "bytes": len(data)}
+
+def build_image(source_path: str, built_dir: str = BUILT_DIR) -> Dict:
+    """Publie une image source et ses variantes; retourne l'entrée du manifeste"""
+    with open(source_path, "rb") as f:
+        data = f.read()
+    slug = slugify(os.path.basename(source_path))
+    extension = os.path.splitext(source_path)[1].lower()
+    entry = {"sha256": hashlib.sha256(data).hexdigest(), "full": _publish(data, slug, extension, built_dir)}
+    if Image is None:
+        return entry
+
+    with Image.open(io.BytesIO(data)) as image:
+        entry["width"], entry["height"] = image.size
+        variants = {}
+        for variant, size in VARIANTS.items():
+            if max(image.size) <= size:
+                variants[variant] = entry["full"]
+                continue
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+            variants[variant] = _publish(buffer.getvalue(), f"{slug}-{variant}", ".webp", built_dir)
+    entry["variants"] = variants
+    return entry
+
+def build_chunk(jobs: List) -> List:
+    """Worker: publie un lot de (source, dossier de sortie)"""
+    return [build_image(*job) for job in jobs]
+
+def _is_current(entry: Optional[Dict], sha256: str) -> bool:
+    """Entrée du manifeste encore valide pour ce contenu (fichiers publiés présents)"""
+    if not entry or entry.get("sha256") != sha256 or (Image is not None and "variants" not in entry):
+        return False
+    files = [entry["full"]] + list(entry.get("variants", {}).values())
+    return all(os.path.exists(os.path.join(WIDGET_DIR, file["path"])) for file in files)
+
+def source_images(images_dir: str = IMAGES_DIR) -> List[str]:
+    """Images sources (fichiers directs de widget/images/, hors dossier built/)"""
+    return sorted(os.path.join(images_dir, name) for name in os.listdir(images_dir)
+                  if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(images_dir, name)))
+
+def load_manifest(manifest_path: str = DEFAULT_MANIFEST) -> Dict:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"format": MANIFEST_FORMAT, "images": {}}
+
+def build_images(sources: Iterable[str], manifest: Dict, workers: int = 1, stats: Dict = None) -> Dict:
+    """Manifeste à jour: sources modifiées ou nouvelles publiées en parallèle, les autres reprises"""
+    stats = stats if stats is not None else {}
+    previous = manifest.get("images", {})
+    images, jobs = {}, []
+    for source_path in sources:
+        key = widget_path(source_path)
+        with open(source_path, "rb") as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        if _is_current(previous.get(key), sha256):
+            images[key] = previous[key]
+            stats["reused"] = stats.get("reused", 0) + 1
+        else:
+            images[key] = None
+            jobs.append((source_path, BUILT_DIR))
+
+    os.makedirs(BUILT_DIR, exist_ok=True)
+    for (source_path, _), entry in zip(jobs, map_in_chunks(build_chunk, jobs, workers, IMAGE_CHUNK_SIZE)):
+        images[widget_path(source_path)] = entry
+        stats["built"] = stats.get("built", 0) + 1
+    return {"format": MANIFEST_FORMAT, "variants": VARIANTS, "images": images}
+
+def image_lookup(manifest: Dict, previous: Dict = None) -> Dict[str, Dict]:
+    """
+    Chemin d'image du catalogue -> entrée du manifeste: chemins sources, et chemins publiés
+    (actuels ou du manifeste précédent) pour relancer le script sur un catalogue déjà réécrit
+    """
+    lookup = {}
+    for manifest_images in ((previous or {}).get("images", {}), manifest["images"]):
+        for source, entry in manifest_images.items():
+            current = manifest["images"].get(source)
+            if current is None:
+                continue
+            lookup[source] = current
+            lookup[entry["full"]["path"]] = current
+    return lookup
+
+def rewrite_image_references(products: Iterable[Dict], lookup: Dict[str, Dict], stats: Dict) -> Iterator[Dict]:
+    """Étape en flux: `image` -> original publié, `imageSizes` -> variantes (juste après `image`)"""
+    for product in products:
+        entry = lookup.get(product.get("image"))
+        if entry is None:
+            if product.get("image"):
+                stats["unknown"] = stats.get("unknown", 0) + 1
+                print(f"⚠️  {product.get('id')}: image sans source dans widget/images ({product['image']})")
+            yield product
+            continue
+        rewritten = {}
+        for key, value in product.items():
+            if key == "imageSizes":
+                continue
+            rewritten[key] = value
+            if key == "image":
+                rewritten["image"] = entry["full"]["path"]
+                if "variants" in entry:
+                    rewritten["imageSizes"] = {variant: file["path"] for variant, file in entry["variants"].items()}
+        stats["rewritten"] = stats.get("rewritten", 0) + 1
+        yield rewritten
+
+def rewrite_catalog(catalog_path: str, lookup: Dict[str, Dict], stats: Dict) -> str:
+    """Réécrit les références d'images du catalogue (en flux, atomique) et reconstruit ses index"""
+    indexer = CatalogIndexBuilder()
+    with CatalogStream(catalog_path) as catalog:
+        write_catalog_stream(catalog_path, catalog.sections,
+                             indexer.observe(rewrite_image_references(catalog, lookup, stats)),
+                             generation=True)
+        version = catalog.sections.get("metadata", {}).get("version")
+    return write_indexes(indexer, catalog_path, version)
+
+def main():
+    parser = argparse.ArgumentParser(description="Publie les images produits sous des noms adressés par contenu")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processus de traitement en parallèle (0 = un par cœur, défaut)")
+    parser.add_argument("--no-catalog", action="store_true", help="Publie les images sans réécrire le catalogue")
+    args = parser.parse_args()
+    workers = resolve_workers(args.workers)
+
+    if sys.platform == 'win32':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    if Image is None:
+        print("⚠️  Pillow absent: originaux publiés sans variantes (pip install Pillow)")
+
+    previous = load_manifest(args.manifest)
+    stats = {}
+    manifest = build_images(source_images(), previous, workers, stats)
+    write_json(args.manifest, manifest, generation=True)
+    source_bytes = sum(entry["full"]["bytes"] for entry in manifest["images"].values())
+    print(f"🖼️  {len(manifest['images'])} images ({stats.get('built', 0)} publiées, "
+          f"{stats.get('reused', 0)} inchangées, {workers} processus)")
+    for variant in VARIANTS:
+        variant_bytes = sum(entry["variants"][variant]["bytes"]
+                            for entry in manifest["images"].values() if "variants" in entry)
+        if variant_bytes:
+            print(f"   - {variant}: {variant_bytes / 1024:.0f} Ko ({variant_bytes / source_bytes:.0%} des originaux)")
+    print(f"✅ Manifeste: {args.manifest}")
+
+    if not args.no_catalog:
+        indexes_path = rewrite_catalog(args.catalog, image_lookup(manifest, previous), stats)
+        print(f"✅ Catalogue mis à jour: {stats.get('rewritten', 0)} produits ({args.catalog})")
+        print(f"🗂️  Index: {indexes_path}")
+        print("ℹ️  Reconstruire aussi build_recommendation_table.py et compile_knowledge_base.py "
+              "(empreinte du catalogue modifiée)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Table précalculée des recommandations de qualification (config/recommendations.table.json)
+
+Le questionnaire (qualification-questions.json) est un arbre fini: chaque combinaison de
+réponses possible est énumérée et le catalogue est scoré pour toutes en une passe
+(batch_scoring.QuestionsScorer, identique au backend). Le backend sert ensuite
+/api/qualification/recommendations par une simple lecture dans la table.
+
+{
+  "tableFormat": 1,
+  "catalog":   {"file": "products.json", "sha256": ..., "version": "5.0.0"},
+  "questions": {"file": "qualification-questions.json", "sha256": ...},
+  "products": [ids],                                  # positions dans products.json
+  "paths": {"hair:curly/fine/dryness/deep-nourishment+shine": [12, 3, 7, ...], ...}
+}
+- clé: catégorie, puis les réponses des étapes dans l'ordre, séparées par "/";
+  choix multiples triés et joints par "+", étape sans réponse vide
+- valeur: produits retenus (positions), du meilleur au moins bon
+- sha256: empreintes des fichiers sources; une table dont le catalogue ou le questionnaire
+  a changé est ignorée par le backend (calcul à la volée)
+
+Usage: python build_recommendation_table.py [-o SORTIE]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+from typing import Dict, Iterator, List
+
+from atomic_io import write_json
+from batch_scoring import DEFAULT_CATALOG, DEFAULT_QUESTIONS, QuestionsScorer, load_json
+from build_catalog_indexes import file_sha256
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(DEFAULT_CATALOG), "recommendations.table.json")
+
+TABLE_FORMAT = 1
+
+def answer_path(category: str, steps: List[Dict], answers: Dict) -> str:
+    """Clé de la table pour des réponses (même construction que le backend)"""
+    parts = []
+    for step in steps:
+        answer = answers.get(f"step{step['id']}")
+        if isinstance(answer, list):
+            parts.append("+".join(sorted(answer)))
+        else:
+            parts.append(answer or "")
+    return f"{category}:{'/'.join(parts)}"
+
+def _step_answers(step: Dict) -> List:
+    """Réponses possibles d'une étape: une option, ou toute combinaison autorisée"""
+    options = [option["id"] for option in step["options"]]
+    if step["type"] != "multi_select":
+        return options
+    sizes = range(step.get("min", 0), step.get("max", len(options)) + 1)
+    return [sorted(combination) for size in sizes for combination in itertools.combinations(options, size)]
+
+def enumerate_profiles(questions: Dict) -> Iterator[Dict]:
+    """Tous les profils atteignables, catégorie par catégorie"""
+    for category, data in questions.items():
+        if category == "metadata":
+            continue
+        steps = data["steps"]
+        for combination in itertools.product(*(_step_answers(step) for step in steps)):
+            answers = {f"step{step['id']}": answer for step, answer in zip(steps, combination)}
+            yield {"category": category, "answers": answers}
+
+def build_table(catalog_path: str = DEFAULT_CATALOG, questions_path: str = DEFAULT_QUESTIONS) -> Dict:
+    catalog = load_json(catalog_path)
+    questions = load_json(questions_path)
+    scorer = QuestionsScorer(catalog["products"], questions)
+    positions = {product_id: i for i, product_id in enumerate(scorer.ids)}
+
+    profiles = list(enumerate_profiles(questions))
+    ranked = scorer.top_n(profiles, limit=len(scorer.ids))
+    paths = {}
+    for profile, top in zip(profiles, ranked):
+        key = answer_path(profile["category"], questions[profile["category"]]["steps"], profile["answers"])
+        paths[key] = [positions[entry[0]] for entry in top]
+
+    return {
+        "tableFormat": TABLE_FORMAT,
+        "catalog": {"file": os.path.basename(catalog_path), "sha256": file_sha256(catalog_path),
+                    "version": catalog.get("metadata", {}).get("version")},
+        "questions": {"file": os.path.basename(questions_path), "sha256": file_sha256(questions_path)},
+        "products": scorer.ids,
+        "paths": paths,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Précalcule les recommandations de chaque parcours de qualification")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS)
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    table = build_table(args.catalog, args.questions)
+    write_json(args.output, table, generation=True, indent=None, separators=(",", ":"))
+    empty = sum(1 for ranked in table["paths"].values() if not ranked)
+    print(f"📊 {len(table['paths'])} parcours ({empty} sans produit), catalogue {table['catalog']['version']}")
+    print(f"✅ Table écrite: {args.output} ({os.path.getsize(args.output) / 1024:.1f} Ko)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Diff / patch structurel des catalogues (products.json, products_enriched.json)
+
+Compare deux versions d'un catalogue section par section; les listes d'objets ayant un
+"id" (products, bundles, collections) sont comparées produit par produit et champ par
+champ, y compris dans les objets imbriqués (name / description / benefits par langue).
+
+Format du patch (JSON compact):
+{
+  "patchFormat": 1,
+  "base":   {"sha256": ..., "version": ...},     # catalogue d'origine
+  "target": {"sha256": ..., "version": ...},     # catalogue attendu après application
+  "sections": {
+    "metadata": {"set": {"/version": "4.1.0"}, "unset": ["/old"], "order": {"": [clés]}},
+    "products": {"key": "id", "removed": [ids], "added": [objets],
+                 "changed": {id: {"set": {...}, "unset": [...]}}, "order": [ids]},
+    "promotions": {"replace": valeur},
+    "obsolete": {"remove": true}
+  },
+  "sectionOrder": [...]                           # seulement si l'ordre des sections change
+}
+- chemins au format JSON Pointer (RFC 6901), relatifs à la section ou au produit
+- les listes simples (tags, concerns, benefits.en...) sont remplacées en entier
+- "order" d'un objet ({chemin: clés}, "" pour l'objet lui-même) n'est présent que si
+  l'ordre final des clés diffère de: clés d'origine conservées, puis clés ajoutées; le
+  catalogue patché s'écrit alors octet pour octet comme la version attendue
+- "order" n'est présent que si l'ordre final diffère de: ordre d'origine sans les
+  éléments retirés, puis éléments ajoutés
+- sha256: empreinte du JSON canonique (clés triées), indépendante de la mise en forme
+
+Usage:
+    python catalog_diff.py diff ANCIEN.json NOUVEAU.json [-o patch.json]
+    python catalog_diff.py apply CATALOGUE.json patch.json [-o SORTIE.json] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Any, Dict, List
+
+from atomic_io import atomic_write
+from catalog_source import write_catalog
+
+PATCH_FORMAT = 1
+
+class PatchError(ValueError):
+    """Patch incompatible avec le catalogue auquel on l'applique"""
+
+def catalog_digest(catalog: Dict) -> str:
+    """Empreinte du contenu, indépendante de la mise en forme et de l'ordre des clés"""
+    canonical = json.dumps(catalog, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def _split(pointer: str) -> List[str]:
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer.split("/")[1:]]
+
+# --- Diff ---
+
+def diff_fields(old: Dict, new: Dict, prefix: str = "") -> Dict:
+    """
+    {"set": {chemin: valeur}, "unset": [chemins], "order": {chemin: clés}} pour passer de `old`
+    à `new` (objets imbriqués compris)
+    """
+    changes = {"set": {}, "unset": [], "order": {}}
+    for key, value in new.items():
+        path = f"{prefix}/{_escape(key)}"
+        if key not in old:
+            changes["set"][path] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested = diff_fields(old[key], value, path)
+            changes["set"].update(nested.get("set", {}))
+            changes["unset"].extend(nested.get("unset", []))
+            changes["order"].update(nested.get("order", {}))
+        elif old[key] != value:
+            changes["set"][path] = value
+    changes["unset"].extend(f"{prefix}/{_escape(key)}" for key in old if key not in new)
+    natural = [key for key in old if key in new] + [key for key in new if key not in old]
+    if natural != list(new):
+        changes["order"][prefix] = list(new)
+    return {name: ops for name, ops in changes.items() if ops}
+
+def _keyed(values: Any, key: str = "id") -> bool:
+    """Liste d'objets identifiés par un `key` unique"""
+    if not isinstance(values, list) or not all(isinstance(v, dict) and key in v for v in values):
+        return False
+    return len({v[key] for v in values}) == len(values)
+
+def diff_keyed_list(old: List[Dict], new: List[Dict], key: str = "id") -> Dict:
+    old_by_id = {item[key]: item for item in old}
+    new_ids = {item[key] for item in new}
+    patch = {"key": key}
+
+    removed = [item[key] for item in old if item[key] not in new_ids]
+    added = [item for item in new if item[key] not in old_by_id]
+    changed = {}
+    for item in new:
+        if item[key] in old_by_id:
+            fields = diff_fields(old_by_id[item[key]], item)
+            if fields:
+                changed[item[key]] = fields
+
+    natural = [item[key] for item in old if item[key] in new_ids] + [item[key] for item in added]
+    target = [item[key] for item in new]
+    for name, value in (("removed", removed), ("added", added), ("changed", changed)):
+        if value:
+            patch[name] = value
+    if natural != target:
+        patch["order"] = target
+    return patch if len(patch) > 1 else {}
+
+def diff_catalogs(old: Dict, new: Dict) -> Dict:
+    """Patch qui transforme `old` en `new`"""
+    sections = {}
+    for name, value in new.items():
+        if name not in old:
+            sections[name] = {"replace": value}
+        elif _keyed(old[name]) and _keyed(value):
+            section = diff_keyed_list(old[name], value)
+            if section:
+                sections[name] = section
+        elif isinstance(old[name], dict) and isinstance(value, dict):
+            section = diff_fields(old[name], value)
+            if section:
+                sections[name] = section
+        elif old[name] != value:
+            sections[name] = {"replace": value}
+    for name in old:
+        if name not in new:
+            sections[name] = {"remove": True}
+
+    patch = {
+        "patchFormat": PATCH_FORMAT,
+        "base": {"sha256": catalog_digest(old), "version": old.get("metadata", {}).get("version")},
+        "target": {"sha256": catalog_digest(new), "version": new.get("metadata", {}).get("version")},
+        "sections": sections,
+    }
+    natural = [name for name in old if name in new] + [name for name in new if name not in old]
+    if natural != list(new):
+        patch["sectionOrder"] = list(new)
+    return patch
+
+# --- Application ---
+
+def apply_fields(target: Dict, changes: Dict):
+    """Applique un {"set", "unset", "order"} de diff_fields sur `target` (modifié sur place)"""
+    for pointer in changes.get("unset", []):
+        *parents, leaf = _split(pointer)
+        node = target
+        for part in parents:
+            node = node.get(part, {})
+        node.pop(leaf, None)
+    for pointer, value in changes.get("set", {}).items():
+        *parents, leaf = _split(pointer)
+        node = target
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    for pointer, keys in changes.get("order", {}).items():
+        node = target
+        for part in _split(pointer):
+            node = node.setdefault(part, {})
+        ordered = {key: node[key] for key in keys if key in node}
+        ordered.update(node)  # clés absentes de "order" (patch appliqué avec --force): à la fin
+        node.clear()
+        node.update(ordered)
+
+def apply_keyed_list(items: List[Dict], patch: Dict) -> List[Dict]:
+    key = patch.get("key", "id")
+    removed = set(patch.get("removed", []))
+    by_id = {item[key]: item for item in items if item[key] not in removed}
+    for item_id, changes in patch.get("changed", {}).items():
+        if item_id not in by_id:
+            raise PatchError(f"élément '{item_id}' absent du catalogue")
+        apply_fields(by_id[item_id], changes)
+    result = [item for item in items if item[key] not in removed]
+    for item in patch.get("added", []):
+        by_id[item[key]] = item
+        result.append(item)
+    if "order" in patch:
+        result = [by_id[item_id] for item_id in patch["order"]]
+    return result
+
+def apply_patch(catalog: Dict, patch: Dict, force: bool = False) -> Dict:
+    """
+    Applique un patch de diff_catalogs et retourne le nouveau catalogue (`catalog` est modifié)
+    Vérifie l'empreinte du catalogue d'origine et celle du résultat, sauf avec `force`
+    (patch appliqué sur une autre version: le résultat ne peut pas être la version attendue).
+    """
+    if patch.get("patchFormat") != PATCH_FORMAT:
+        raise PatchError(f"format de patch non supporté: {patch.get('patchFormat')}")
+    if not force and catalog_digest(catalog) != patch["base"]["sha256"]:
+        raise PatchError("le catalogue ne correspond pas à la version d'origine du patch")
+
+    for name, section in patch["sections"].items():
+        if section.get("remove"):
+            catalog.pop(name, None)
+        elif "replace" in section:
+            catalog[name] = section["replace"]
+        elif "key" in section:
+            catalog[name] = apply_keyed_list(catalog.get(name, []), section)
+        else:
+            apply_fields(catalog.setdefault(name, {}), section)
+
+    if "sectionOrder" in patch:
+        catalog = {name: catalog[name] for name in patch["sectionOrder"]}
+    if not force and catalog_digest(catalog) != patch["target"]["sha256"]:
+        raise PatchError("le résultat ne correspond pas à la version attendue")
+    return catalog
+
+def _changed_fields(changes: Dict) -> List[str]:
+    return (sorted(changes.get("set", {})) + [f"-{p}" for p in changes.get("unset", [])]
+            + [f"{p or '/'} (ordre des clés)" for p in changes.get("order", {})])
+
+def summarize(patch: Dict) -> List[str]:
+    """Résumé lisible: une ligne par section / élément modifié"""
+    lines = []
+    for name, section in patch["sections"].items():
+        if section.get("remove"):
+            lines.append(f"➖ {name}: section supprimée")
+        elif "replace" in section:
+            lines.append(f"✏️  {name}: remplacée")
+        elif "key" in section:
+            for item_id in section.get("removed", []):
+                lines.append(f"➖ {name}/{item_id}")
+            for item in section.get("added", []):
+                lines.append(f"➕ {name}/{item[section['key']]}")
+            for item_id, changes in section.get("changed", {}).items():
+                lines.append(f"✏️  {name}/{item_id}: {', '.join(_changed_fields(changes))}")
+            if "order" in section:
+                lines.append(f"🔀 {name}: ordre modifié")
+        else:
+            lines.append(f"✏️  {name}: {', '.join(_changed_fields(section))}")
+    return lines
+
+def load_json(filepath: str) -> Dict:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff / patch structurel des catalogues produits")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff_cmd = commands.add_parser("diff", help="Crée le patch entre deux versions")
+    diff_cmd.add_argument("old")
+    diff_cmd.add_argument("new")
+    diff_cmd.add_argument("-o", "--output", help="Fichier patch (défaut: sortie standard)")
+    apply_cmd = commands.add_parser("apply", help="Applique un patch à un catalogue")
+    apply_cmd.add_argument("catalog")
+    apply_cmd.add_argument("patch")
+    apply_cmd.add_argument("-o", "--output", help="Catalogue résultat (défaut: remplace CATALOGUE)")
+    apply_cmd.add_argument("--force", action="store_true",
+                           help="Appliquer même si le catalogue n'est pas la version d'origine du patch")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    if args.command == "diff":
+        patch = diff_catalogs(load_json(args.old), load_json(args.new))
+        text = json.dumps(patch, ensure_ascii=False, separators=(",", ":"))
+        if not args.output:
+            print(text)
+            return
+        atomic_write(args.output, text)
+        for line in summarize(patch):
+            print(line)
+        print(f"\n✅ Patch: {args.output} ({len(text.encode('utf-8')) / 1024:.1f} Ko)")
+    else:
+        try:
+            catalog = apply_patch(load_json(args.catalog), load_json(args.patch), args.force)
+        except PatchError as e:
+            sys.exit(f"❌ {e}")
+        output = args.output or args.catalog
+        write_catalog(catalog, output, generation=True)
+        print(f"✅ Patch appliqué: {output}")
+
+if __name__ == "__main__":
+    main()
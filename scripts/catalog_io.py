@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Lecture / écriture en flux des catalogues produits (products.json, products_enriched.json)
+Les produits sont lus et écrits un par un: la mémoire reste constante quelle que soit
+la taille du catalogue. Le fichier écrit est identique octet pour octet à
+json.dump(catalog, f, ensure_ascii=False, indent=2).
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from atomic_io import atomic_open
+
+READ_CHUNK_SIZE = 64 * 1024
+PRODUCTS_KEY = "products"
+# Produits par lot envoyé à un processus worker
+PARALLEL_CHUNK_SIZE = 256
+
+_decoder = json.JSONDecoder()
+
+class CatalogStream:
+    """
+    Lecteur en flux d'un catalogue JSON {"metadata": ..., "products": [...], "bundles": ...}
+
+    - `sections` contient les sections hors produits, dans l'ordre du fichier.
+      Celles placées avant "products" sont disponibles dès l'ouverture, celles placées
+      après (ex: "bundles") une fois l'itération des produits terminée.
+    - itérer sur l'objet produit les produits un par un (une seule itération possible)
+    """
+
+    def __init__(self, filepath: str, array_key: str = PRODUCTS_KEY):
+        self.filepath = filepath
+        self.array_key = array_key
+        self.sections: Dict[str, Any] = {}
+        self.count = 0
+        self._file = None
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._consumed = False
+
+    def open(self) -> "CatalogStream":
+        """Ouvre le fichier et lit les sections placées avant les produits"""
+        self._file = open(self.filepath, "r", encoding="utf-8")
+        self._expect("{")
+        self._read_sections(stop_at_array=True)
+        return self
+
+    def __enter__(self) -> "CatalogStream":
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._consumed:
+            raise RuntimeError("CatalogStream ne peut être itéré qu'une seule fois")
+        self._consumed = True
+
+        if self.array_key in self.sections:
+            self._expect("[")
+            if self._peek() == "]":
+                self._pos += 1
+            else:
+                while True:
+                    yield self._decode_value()
+                    self.count += 1
+                    char = self._next_char()
+                    if char == "]":
+                        break
+                    self._check(",", char)
+            # Sections placées après le tableau de produits
+            char = self._next_char()
+            if char == ",":
+                self._read_sections(stop_at_array=False)
+            else:
+                self._check("}", char)
+        # Fichier fermé dès la fin de lecture: il peut alors être remplacé (os.replace sous Windows)
+        self.close()
+
+    # --- Lecture bas niveau ---
+
+    def _fill(self) -> bool:
+        """Ajoute un bloc au buffer; False en fin de fichier"""
+        if self._eof:
+            return False
+        chunk = self._file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        # Libère la partie déjà décodée du buffer
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Premier caractère non blanc, sans le consommer"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError(f"{self.filepath}: fin de fichier inattendue")
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _expect(self, expected: str):
+        self._check(expected, self._next_char())
+
+    def _check(self, expected: str, char: str):
+        if char != expected:
+            raise ValueError(f"{self.filepath}: '{expected}' attendu, '{char}' trouvé")
+
+    def _decode_value(self) -> Any:
+        """Décode la valeur JSON suivante, en relisant tant qu'elle est incomplète"""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Un nombre en bout de buffer peut être tronqué: on complète avant de conclure
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _read_sections(self, stop_at_array: bool):
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+            if stop_at_array and key == self.array_key:
+                # Marque la position des produits dans l'ordre des sections
+                self.sections[key] = None
+                return
+            self.sections[key] = self._decode_value()
+            char = self._next_char()
+            if char == "}":
+                return
+            self._check(",", char)
+
+def iter_products(filepath: str) -> Iterator[Dict]:
+    """Produits d'un catalogue, un par un"""
+    with CatalogStream(filepath) as catalog:
+        yield from catalog
+
+class OrderedLookup:
+    """
+    Accès par id aux produits d'un flux, lu au fur et à mesure des demandes
+    Prévu pour un flux dans le même ordre que les demandes (ex: sortie précédente
+    d'un pipeline): les produits sautés sont gardés de côté, la mémoire ne croît
+    qu'avec le désordre entre les deux.
+    """
+
+    def __init__(self, products: Iterable[Dict], key: str = "id"):
+        self.products = iter(products)
+        self.key = key
+        self.pending: Dict[Any, Dict] = {}
+
+    def get(self, product_id: Any):
+        if product_id in self.pending:
+            return self.pending.pop(product_id)
+        for product in self.products:
+            if product.get(self.key) == product_id:
+                return product
+            self.pending[product.get(self.key)] = product
+        return None
+
+def resolve_workers(workers: int) -> int:
+    """0 = un worker par cœur"""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def map_in_chunks(func: Callable[[List[Any]], List[Any]], items: Iterable[Any], workers: int = 1,
+                  chunk_size: int = PARALLEL_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Applique `func` (lot -> liste de résultats) à `items` découpé en lots,
+    dans un pool de `workers` processus. Les résultats sont produits dans l'ordre
+    d'entrée; au plus 2 lots par worker sont en vol, la mémoire reste bornée.
+    workers <= 1: même découpage, exécuté dans le processus courant.
+    `func` doit être une fonction de module (sérialisable par pickle).
+    """
+    items = iter(items)
+    chunks = iter(lambda: list(islice(items, chunk_size)), [])
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(func, chunk))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def _dump_indented(value: Any, indent: str) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + indent)
+
+def write_catalog_stream(filepath: str, sections: Dict[str, Any], products: Iterable[Dict],
+                         array_key: str = PRODUCTS_KEY, generation: bool = False) -> int:
+    """
+    Écrit un catalogue en consommant `products` au fil de l'eau
+    `sections` peut être le `sections` d'un CatalogStream en cours de lecture: les sections
+    situées après les produits sont écrites une fois `products` épuisé.
+    Écriture atomique (voir atomic_io), ce qui permet aussi de réécrire le fichier en
+    cours de lecture. `generation`: incrémente <fichier>.generation.
+    Retourne le nombre de produits écrits.
+    """
+    count = 0
+    written = set()
+    with atomic_open(filepath, generation=generation) as f:
+        f.write("{")
+        separator = "\n"
+
+        for key in list(sections):
+            if key == array_key:
+                break
+            f.write(f'{separator}  {json.dumps(key, ensure_ascii=False)}: {_dump_indented(sections[key], "  ")}')
+            written.add(key)
+            separator = ",\n"
+
+        f.write(f'{separator}  {json.dumps(array_key)}: [')
+        for product in products:
+            f.write(("\n" if count == 0 else ",\n") + "    " + _dump_indented(product, "    "))
+            count += 1
+        f.write("\n  ]" if count else "]")
+        written.add(array_key)
+
+        for key in list(sections):
+            if key not in written:
+                f.write(f',\n  {json.dumps(key, ensure_ascii=False)}: {_dump_indented(sections[key], "  ")}')
+        f.write("\n}")
+    return count
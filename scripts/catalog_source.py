@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Source tabulaire des catalogues produits (remplace les listes Python des scripts sync_products_*)
+
+Une source est un dossier contenant:
+- catalog.json: sections du catalogue (metadata, promotions, collections, bundles...),
+  dans l'ordre de sortie, plus une clé "source" qui décrit le fichier de produits:
+    "source": {
+        "products": "products.csv",
+        "columns": {"price": "int", "concerns": "list"},   # types (défaut: texte)
+        "defaults": {"hairTypes": ["all"]}                  # champs ajoutés à chaque produit
+    }
+- products.csv: un produit par ligne. "name.en" / "name.ar" construisent {"name": {"en", "ar"}},
+  les listes sont séparées par "|", une cellule vide = champ absent.
+
+`load_catalog_source` lit et valide la source (catalog_schema.py, étape "source") sans rien
+écrire; `write_catalog` écrit le résultat. `update_products_csv` / `append_products_csv`
+modifient ou complètent le fichier produits (store_sync.py).
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+from atomic_io import atomic_open
+from catalog_io import write_catalog_stream
+from catalog_schema import validate_catalog
+
+MANIFEST_FILE = "catalog.json"
+LIST_SEPARATOR = "|"
+
+class CatalogSourceError(ValueError):
+    """Source de catalogue invalide; `errors` liste tous les problèmes trouvés"""
+
+    def __init__(self, source: str, errors: List[str]):
+        self.errors = errors
+        details = "\n".join(f"  - {error}" for error in errors)
+        super().__init__(f"{source}: {len(errors)} erreur(s)\n{details}")
+
+def _convert(value: str, kind: str):
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "list":
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    return value
+
+def _set_path(product: Dict, path: str, value: Any):
+    """'name.en' -> product["name"]["en"]"""
+    *parents, leaf = path.split(".")
+    for key in parents:
+        product = product.setdefault(key, {})
+    product[leaf] = value
+
+def read_products(csv_path: str, columns: Dict[str, str] = None, defaults: Dict[str, Any] = None,
+                  errors: List[str] = None) -> List[Dict]:
+    """Produits d'un fichier CSV, dans l'ordre des lignes (erreurs de conversion ajoutées à `errors`)"""
+    columns = columns or {}
+    defaults = defaults or {}
+    errors = errors if errors is not None else []
+    products = []
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        for line, row in enumerate(reader, start=2):
+            product = {}
+            for column in reader.fieldnames:
+                cell = (row.get(column) or "").strip()
+                if not cell:
+                    continue
+                try:
+                    _set_path(product, column, _convert(cell, columns.get(column, "str")))
+                except ValueError:
+                    errors.append(f"{os.path.basename(csv_path)}:{line}: {column}={cell!r} n'est pas un {columns[column]}")
+            for key, value in defaults.items():
+                product.setdefault(key, json.loads(json.dumps(value)))
+            products.append(product)
+    return products
+
+def load_catalog_source(source_dir: str) -> Dict:
+    """
+    Construit le catalogue d'une source (voir docstring du module), sans écrire de fichier
+    - metadata.lastUpdated à null: remplacé par la date du jour
+    - metadata.totalProducts: recalculé d'après les produits lus
+    Lève CatalogSourceError si la source est invalide.
+    """
+    with open(os.path.join(source_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    source = manifest.pop("source")
+
+    errors = []
+    products = read_products(os.path.join(source_dir, source["products"]),
+                             source.get("columns"), source.get("defaults"), errors)
+
+    catalog = {}
+    for key, value in manifest.items():
+        catalog[key] = products if key == "products" else value
+    catalog.setdefault("products", products)
+
+    metadata = catalog.get("metadata", {})
+    if "lastUpdated" in metadata and metadata["lastUpdated"] is None:
+        metadata["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+    if "totalProducts" in metadata:
+        metadata["totalProducts"] = len(products)
+
+    # Catalogue d'une source: ni description ni catégorie (ajoutées par la suite du pipeline)
+    errors.extend(validate_catalog(catalog, stage="source")[0])
+    if errors:
+        raise CatalogSourceError(source_dir, errors)
+    return catalog
+
+def update_products_csv(source_dir: str, updates: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Modifie des cellules du fichier produits d'une source: {id: {colonne: valeur}}
+    Les autres lignes et colonnes restent inchangées. Retourne le nombre de lignes modifiées.
+    """
+    csv_path, fieldnames, rows = _read_rows(source_dir)
+    changed = 0
+    for row in rows:
+        before = dict(row)
+        for column, value in updates.get(row["id"], {}).items():
+            if column not in fieldnames:
+                raise CatalogSourceError(source_dir, [f"colonne inconnue '{column}'"])
+            row[column] = LIST_SEPARATOR.join(value) if isinstance(value, list) else str(value)
+        if row != before:
+            changed += 1
+    _write_rows(csv_path, fieldnames, rows)
+    return changed
+
+def _flatten(product: Dict, prefix: str = "") -> Dict[str, str]:
+    """Inverse de read_products: {"name": {"en": ...}} -> {"name.en": ...}, listes jointes"""
+    row = {}
+    for key, value in product.items():
+        if isinstance(value, dict):
+            row.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            row[prefix + key] = LIST_SEPARATOR.join(value) if isinstance(value, list) else str(value)
+    return row
+
+def append_products_csv(source_dir: str, products: List[Dict]) -> int:
+    """
+    Ajoute des produits (format du catalogue) à la fin du fichier produits d'une source
+    Une colonne absente du fichier (ex: "image") est ajoutée en fin d'en-tête, vide pour les
+    lignes existantes. Retourne le nombre de lignes ajoutées.
+    """
+    csv_path, fieldnames, rows = _read_rows(source_dir)
+    new_rows = [_flatten(product) for product in products]
+    for row in new_rows:
+        fieldnames.extend(column for column in row if column not in fieldnames)
+    _write_rows(csv_path, fieldnames, rows + new_rows)
+    return len(new_rows)
+
+def _read_rows(source_dir: str):
+    """(chemin, colonnes, lignes) du fichier produits d'une source"""
+    with open(os.path.join(source_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        csv_path = os.path.join(source_dir, json.load(f)["source"]["products"])
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        return csv_path, list(reader.fieldnames), list(reader)
+
+def _write_rows(csv_path: str, fieldnames: List[str], rows: List[Dict]):
+    with atomic_open(csv_path, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_catalog(catalog: Dict, output_path: str, generation: bool = False) -> int:
+    """
+    Écrit le catalogue (même format que json.dump indent=2, écriture atomique)
+    `generation`: incrémente <fichier>.generation. Retourne le nombre de produits.
+    """
+    # "products" reste à sa place parmi les sections, son contenu est écrit en flux
+    sections = {key: None if key == "products" else value for key, value in catalog.items()}
+    return write_catalog_stream(output_path, sections, catalog["products"], generation=generation)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Intégrité des images produits: références du catalogue <-> fichiers de widget/images/
+
+Un seul parcours de chaque côté:
+- fichiers: widget/images/ (sous-dossiers compris, ex: built/) -> taille en octets
+- références: `image` et `imageSizes` des produits de products.json (lu en flux)
+puis comparaison des deux ensembles:
+- manquante: référence sans fichier. Si un fichier ne diffère que par la casse, les
+  espaces ou l'encodage URL (%20), il est signalé: il fonctionne sur un poste Windows /
+  macOS mais pas sur le serveur Linux
+- orpheline: fichier qu'aucune référence n'utilise. Les sources du manifeste de
+  build_images.py (config/images.manifest.json) dont une version publiée est utilisée
+  ne sont pas orphelines.
+
+--prune supprime les fichiers orphelins (et les retire du manifeste). À lancer sur un
+catalogue passé par build_images.py: après improve_catalog_descriptions.py, products.json
+ne référence que les sources et tout images/built/ serait supprimé.
+
+Usage: python check_images.py [--catalog FICHIER] [--images-dir DOSSIER] [--report FICHIER] [--prune]
+"""
+
+import argparse
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+from urllib.parse import unquote
+
+from atomic_io import write_json
+from build_images import DEFAULT_MANIFEST, IMAGES_DIR, load_manifest
+from catalog_io import CatalogStream
+from catalog_schema import IMAGE_PREFIX
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config", "products.json")
+
+def normalize_path(path: str) -> str:
+    """Clé de comparaison tolérante: encodage URL, casse, espaces et '_' ignorés"""
+    return re.sub(r"[\s_]+", "-", unquote(path).strip().lower())
+
+def disk_assets(images_dir: str = IMAGES_DIR) -> Dict[str, int]:
+    """Chemin widget ("images/...") -> taille, pour chaque fichier de `images_dir`"""
+    assets = {}
+    for directory, _, names in os.walk(images_dir):
+        for name in names:
+            filepath = os.path.join(directory, name)
+            path = IMAGE_PREFIX + os.path.relpath(filepath, images_dir).replace(os.sep, "/")
+            assets[path] = os.path.getsize(filepath)
+    return assets
+
+def catalog_references(products: Iterable[Dict]) -> Dict[str, List[str]]:
+    """Chemin référencé -> ids des produits qui l'utilisent ("#<position>" pour un produit sans id)"""
+    references = defaultdict(list)
+    for position, product in enumerate(products, start=1):
+        paths = [product.get("image")] + list((product.get("imageSizes") or {}).values())
+        for path in paths:
+            if path:
+                references[path].append(product.get("id") or f"#{position}")
+    return dict(references)
+
+def manifest_sources(manifest: Dict, references: Set[str]) -> Set[str]:
+    """Sources du manifeste dont l'original ou une variante publiée est référencé"""
+    used = set()
+    for source, entry in manifest.get("images", {}).items():
+        published = [entry["full"]["path"]] + [file["path"] for file in entry.get("variants", {}).values()]
+        if any(path in references for path in published):
+            used.add(source)
+    return used
+
+def check_images(assets: Dict[str, int], references: Dict[str, List[str]], manifest: Dict = None) -> Dict:
+    """Rapport {missing, orphans, totals} à partir des deux ensembles"""
+    normalized = defaultdict(list)
+    for path in assets:
+        normalized[normalize_path(path)].append(path)
+
+    missing, matched = [], set()
+    for path, products in sorted(references.items()):
+        if path in assets:
+            matched.add(path)
+            continue
+        near = normalized.get(normalize_path(path), [])
+        matched.update(near)
+        missing.append({"path": path, "products": products, "nearMatches": near})
+
+    used = matched | manifest_sources(manifest or {}, set(references))
+    orphans = [{"path": path, "bytes": size} for path, size in sorted(assets.items()) if path not in used]
+    return {
+        "missing": missing,
+        "orphans": orphans,
+        "totals": {
+            "files": len(assets),
+            "bytes": sum(assets.values()),
+            "references": len(references),
+            "orphanBytes": sum(orphan["bytes"] for orphan in orphans),
+        },
+    }
+
+def prune_orphans(orphans: List[Dict], manifest: Dict, manifest_path: str, images_dir: str = IMAGES_DIR) -> int:
+    """Supprime les fichiers orphelins (et leurs entrées de manifeste); retourne les octets libérés"""
+    freed = 0
+    for orphan in orphans:
+        os.remove(os.path.join(images_dir, *orphan["path"][len(IMAGE_PREFIX):].split("/")))
+        freed += orphan["bytes"]
+    pruned = {orphan["path"] for orphan in orphans}
+    images = manifest.get("images", {})
+    if any(source in pruned for source in images):
+        manifest["images"] = {source: entry for source, entry in images.items() if source not in pruned}
+        write_json(manifest_path, manifest, generation=True)
+    return freed
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie les images référencées par le catalogue et les fichiers inutilisés")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--images-dir", default=IMAGES_DIR, help="Dossier des images du widget")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--report", metavar="FICHIER", help="Écrit le rapport en JSON")
+    parser.add_argument("--prune", action="store_true", help="Supprime les fichiers orphelins")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    assets = disk_assets(args.images_dir)
+    with CatalogStream(args.catalog) as catalog:
+        references = catalog_references(catalog)
+    manifest = load_manifest(args.manifest)
+    report = check_images(assets, references, manifest)
+    totals = report["totals"]
+
+    print(f"🖼️  {totals['files']} fichiers ({totals['bytes'] / 1024:.0f} Ko), {totals['references']} chemins référencés")
+    for item in report["missing"]:
+        hint = f" (casse/espaces différents: {', '.join(item['nearMatches'])})" if item["nearMatches"] else ""
+        print(f"❌ Manquante: {item['path']} <- {', '.join(map(str, item['products']))}{hint}")
+    for orphan in report["orphans"]:
+        print(f"🗑️  Orpheline: {orphan['path']} ({orphan['bytes'] / 1024:.1f} Ko)")
+    print(f"📊 {len(report['missing'])} manquante(s), {len(report['orphans'])} orpheline(s) "
+          f"({totals['orphanBytes'] / 1024:.0f} Ko)")
+
+    if args.report:
+        write_json(args.report, report)
+        print(f"✅ Rapport: {args.report}")
+
+    if args.prune and report["orphans"]:
+        freed = prune_orphans(report["orphans"], manifest, args.manifest, args.images_dir)
+        print(f"✅ {len(report['orphans'])} fichier(s) supprimé(s), {freed / 1024:.0f} Ko libérés")
+
+    if report["missing"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
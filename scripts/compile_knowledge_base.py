@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Compilation de la base de connaissances pour le backend (config/knowledge_base.compiled.json)
+
+INnatural_Chatbot_Knowledge_Base_v2.json reste le fichier d'édition. Ce script:
+- valide sa structure (tous les problèmes signalés en une fois)
+- ne garde que ce que lit le backend (claudeService.js): catégories, scénarios
+  (mots-clés, requêtes, tags, réponses, questions de suivi), config, ton, modèles de
+  réponses et messages de repli; usage_count, descriptions, métadonnées d'édition,
+  analytics et synonymes (compilés à part, voir compile_synonyms.py) sont retirés
+- résout recommended_products / related_products en ids du catalogue (products.json):
+  id exact, sinon correspondance ProductMatcher restreinte au type et à la collection
+  nommés par la référence; les références introuvables ou ambiguës sont signalées et
+  retirées
+- supprime les doublons et espaces superflus des listes de textes
+- recalcule metadata.total_scenarios / total_categories
+
+Le fichier compilé contient l'empreinte de la source ("compiled.source.sha256") et celle
+du catalogue ("compiled.catalog.sha256", références produits résolues contre lui): le
+backend revient au fichier d'édition si l'un des deux a changé depuis la compilation.
+
+Usage: python compile_knowledge_base.py [--strict] [-o SORTIE]
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from atomic_io import write_json
+from build_catalog_indexes import file_sha256
+from product_matcher import ProductMatcher, infer_type
+from text_utils import words
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config")
+DEFAULT_KNOWLEDGE_BASE = os.path.join(CONFIG_DIR, "INnatural_Chatbot_Knowledge_Base_v2.json")
+DEFAULT_CATALOG = os.path.join(CONFIG_DIR, "products.json")
+DEFAULT_OUTPUT = os.path.join(CONFIG_DIR, "knowledge_base.compiled.json")
+
+COMPILED_FORMAT = 1
+
+# Sections copiées telles quelles
+RUNTIME_SECTIONS = ("config", "tone_guidelines", "response_templates", "fallback_messages", "escalation_triggers")
+METADATA_FIELDS = ("version", "last_updated", "primary_language", "supported_languages", "product_types")
+# Textes par langue d'un scénario ({"ar": [...], "en": [...]})
+SCENARIO_TEXT_FIELDS = ("keywords", "user_queries", "tags")
+RESPONSE_FIELDS = ("response_type", "language", "text")
+
+# Confiance minimale pour rattacher une référence produit inconnue à un id du catalogue
+MIN_REFERENCE_CONFIDENCE = 0.55
+# Type donné aux bundles pour l'appariement, et mots qui désignent un bundle dans une référence
+BUNDLE_TYPE = "bundle"
+BUNDLE_WORDS = {"bundle", "collection", "set", "kit"}
+
+class KnowledgeBaseError(ValueError):
+    """Base de connaissances invalide; `errors` liste tous les problèmes trouvés"""
+
+    def __init__(self, source: str, errors: List[str]):
+        self.errors = errors
+        details = "\n".join(f"  - {error}" for error in errors)
+        super().__init__(f"{source}: {len(errors)} erreur(s)\n{details}")
+
+def _is_text_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def validate_knowledge_base(kb: Dict) -> Tuple[List[str], List[str]]:
+    """(erreurs, avertissements) de structure"""
+    errors, warnings = [], []
+    for section in ("metadata", "categories") + RUNTIME_SECTIONS[:2]:
+        if section not in kb:
+            errors.append(f"section '{section}' manquante")
+    languages = kb.get("metadata", {}).get("supported_languages", ["ar", "en"])
+
+    category_ids, scenario_ids = set(), set()
+    for position, category in enumerate(kb.get("categories", []), start=1):
+        label = category.get("category_id") or f"catégorie #{position}"
+        for field in ("category_id", "category_name", "scenarios"):
+            if field not in category:
+                errors.append(f"{label}: champ '{field}' manquant")
+        if label in category_ids:
+            errors.append(f"{label}: category_id en double")
+        category_ids.add(label)
+
+        for index, scenario in enumerate(category.get("scenarios", []), start=1):
+            scenario_label = scenario.get("scenario_id") or f"{label}/scénario #{index}"
+            if "scenario_id" not in scenario:
+                errors.append(f"{scenario_label}: champ 'scenario_id' manquant")
+            elif scenario_label in scenario_ids:
+                errors.append(f"{scenario_label}: scenario_id en double")
+            scenario_ids.add(scenario_label)
+
+            for field in SCENARIO_TEXT_FIELDS:
+                texts = scenario.get(field)
+                if not isinstance(texts, dict):
+                    errors.append(f"{scenario_label}: '{field}' doit être un objet par langue")
+                    continue
+                for language, values in texts.items():
+                    if not _is_text_list(values):
+                        errors.append(f"{scenario_label}: '{field}.{language}' doit être une liste de textes")
+                for language in languages:
+                    if not texts.get(language):
+                        warnings.append(f"{scenario_label}: '{field}.{language}' vide")
+
+            responses = scenario.get("responses")
+            if not isinstance(responses, list) or not responses:
+                errors.append(f"{scenario_label}: aucune réponse")
+                continue
+            for response in responses:
+                if response.get("language") not in languages:
+                    errors.append(f"{scenario_label}: réponse en langue inconnue '{response.get('language')}'")
+                if not isinstance(response.get("text"), str) or not response["text"].strip():
+                    errors.append(f"{scenario_label}: réponse sans texte")
+
+    declared = kb.get("metadata", {}).get("total_scenarios")
+    if declared is not None and declared != len(scenario_ids):
+        warnings.append(f"metadata.total_scenarios = {declared}, {len(scenario_ids)} scénarios trouvés")
+    return errors, warnings
+
+def _unique_texts(values: List[str]) -> List[str]:
+    """Textes sans espaces superflus ni doublons, ordre conservé"""
+    return list(dict.fromkeys(value.strip() for value in values if value.strip()))
+
+class ProductReferenceResolver:
+    """
+    Références produits de la base de connaissances -> ids du catalogue (produits et bundles)
+    Id exact, sinon correspondance ProductMatcher limitée au type et à la collection que
+    nomme la référence ('mixoil-rosemary-hair-mask' -> masque de mixoil-rosemary-almond).
+    Reste non résolue (et signalée) une référence:
+    - sans type reconnu (type du catalogue, ou mot de BUNDLE_WORDS pour un bundle)
+    - sans mot en commun avec le nom d'une collection
+    - dont le meilleur candidat n'est pas le seul à partager autant de mots avec elle
+      ('mixoil-shampoo': deux collections MixOil ont un shampoing)
+    """
+
+    def __init__(self, catalog: Dict, min_confidence: float = MIN_REFERENCE_CONFIDENCE):
+        products = catalog.get("products", [])
+        items = products + [dict(bundle, type=BUNDLE_TYPE) for bundle in catalog.get("bundles", [])]
+        self.ids = {item["id"] for item in items}
+        self.types = sorted({product["type"] for product in products if product.get("type")})
+        self.collections = {item["id"]: item.get("collection") for item in items}
+        self.collection_words = {collection: set(words(collection))
+                                 for collection in set(self.collections.values()) if collection}
+        self.item_words = {item["id"]: set(words(f"{item['id']} {(item.get('name') or {}).get('en', '')}"))
+                           for item in items}
+        self.min_confidence = min_confidence
+        self.matcher = ProductMatcher(items, min_confidence=min_confidence)
+        self.resolved: Dict[str, Optional[str]] = {}
+
+    def resolve(self, reference: str) -> Optional[str]:
+        if reference not in self.resolved:
+            self.resolved[reference] = reference if reference in self.ids else self._match(reference)
+        return self.resolved[reference]
+
+    def _match(self, reference: str) -> Optional[str]:
+        reference_words = set(words(reference))
+        product_type = BUNDLE_TYPE if reference_words & BUNDLE_WORDS else infer_type(reference, self.types)
+        # Collections partageant le plus de mots avec la référence (plusieurs si ex aequo)
+        shared = {collection: len(reference_words & collection_words)
+                  for collection, collection_words in self.collection_words.items()}
+        best_shared = max(shared.values(), default=0)
+        if product_type is None or best_shared == 0:
+            return None
+        collections = {collection for collection, count in shared.items() if count == best_shared}
+
+        scored = [(confidence, item_id) for confidence, item_id in
+                  self.matcher.candidates({"id": reference, "type": product_type})
+                  if self.collections[item_id] in collections]
+        if not scored or scored[0][0] < self.min_confidence:
+            return None
+        best_id = scored[0][1]
+        overlap = len(reference_words & self.item_words[best_id])
+        if any(len(reference_words & self.item_words[item_id]) >= overlap for _, item_id in scored[1:]):
+            return None
+        return best_id
+
+    def resolve_all(self, references: List) -> List[str]:
+        """Ids résolus (sans doublon); accepte aussi {"product_id": ...}"""
+        ids = []
+        for reference in references or []:
+            if isinstance(reference, dict):
+                reference = reference.get("product_id")
+            resolved = self.resolve(reference) if reference else None
+            if resolved and resolved not in ids:
+                ids.append(resolved)
+        return ids
+
+    def unresolved(self) -> List[str]:
+        return sorted(reference for reference, resolved in self.resolved.items() if resolved is None)
+
+    def renamed(self) -> Dict[str, str]:
+        return {reference: resolved for reference, resolved in self.resolved.items()
+                if resolved is not None and resolved != reference}
+
+def compile_scenario(scenario: Dict, resolver: ProductReferenceResolver) -> Dict:
+    compiled = {"scenario_id": scenario["scenario_id"], "priority": scenario.get("priority", 5)}
+    for field in SCENARIO_TEXT_FIELDS:
+        compiled[field] = {language: _unique_texts(values) for language, values in scenario[field].items()}
+    compiled["responses"] = [{field: response[field] for field in RESPONSE_FIELDS if field in response}
+                             for response in scenario["responses"]]
+    if "follow_up_questions" in scenario:
+        compiled["follow_up_questions"] = {language: _unique_texts(values)
+                                           for language, values in scenario["follow_up_questions"].items()}
+    recommended = resolver.resolve_all(scenario.get("metadata", {}).get("recommended_products"))
+    related = resolver.resolve_all(scenario.get("related_products"))
+    if recommended:
+        compiled["recommended_products"] = recommended
+    if related:
+        compiled["related_products"] = related
+    return compiled
+
+def compile_knowledge_base(kb: Dict, catalog: Dict) -> Tuple[Dict, ProductReferenceResolver]:
+    """Forme compilée (sans la section "compiled") et résolution des références produits"""
+    resolver = ProductReferenceResolver(catalog)
+    categories = []
+    for category in kb["categories"]:
+        compiled = {"category_id": category["category_id"], "category_name": category["category_name"]}
+        for field in ("product_type", "priority"):
+            if field in category:
+                compiled[field] = category[field]
+        compiled["scenarios"] = [compile_scenario(scenario, resolver) for scenario in category["scenarios"]]
+        categories.append(compiled)
+
+    metadata = {field: kb["metadata"][field] for field in METADATA_FIELDS if field in kb["metadata"]}
+    metadata["total_categories"] = len(categories)
+    metadata["total_scenarios"] = sum(len(category["scenarios"]) for category in categories)
+
+    runtime = {"metadata": metadata}
+    runtime.update({section: kb[section] for section in RUNTIME_SECTIONS if section in kb})
+    runtime["categories"] = categories
+    return runtime, resolver
+
+def load_json(filepath: str) -> Dict:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def build(knowledge_base_path: str, catalog_path: str, strict: bool = False) -> Tuple[Dict, List[str]]:
+    """Valide et compile; lève KnowledgeBaseError (ou en mode strict, aussi pour les avertissements)"""
+    kb = load_json(knowledge_base_path)
+    errors, warnings = validate_knowledge_base(kb)
+    if errors:
+        raise KnowledgeBaseError(os.path.basename(knowledge_base_path), errors)
+
+    catalog = load_json(catalog_path)
+    runtime, resolver = compile_knowledge_base(kb, catalog)
+    warnings += [f"référence produit introuvable dans le catalogue: '{r}' (retirée)" for r in resolver.unresolved()]
+    if strict and warnings:
+        raise KnowledgeBaseError(os.path.basename(knowledge_base_path), warnings)
+
+    runtime["compiled"] = {
+        "format": COMPILED_FORMAT,
+        "source": {"file": os.path.basename(knowledge_base_path), "sha256": file_sha256(knowledge_base_path)},
+        "catalog": {"file": os.path.basename(catalog_path), "sha256": file_sha256(catalog_path),
+                    "version": catalog.get("metadata", {}).get("version")},
+        "productReferences": resolver.renamed(),
+    }
+    return runtime, warnings
+
+def main():
+    parser = argparse.ArgumentParser(description="Valide et compile la base de connaissances pour le backend")
+    parser.add_argument("--knowledge-base", default=DEFAULT_KNOWLEDGE_BASE)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--strict", action="store_true", help="Échoue aussi sur les avertissements")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    try:
+        runtime, warnings = build(args.knowledge_base, args.catalog, args.strict)
+    except KnowledgeBaseError as e:
+        sys.exit(f"❌ {e}")
+
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+    for reference, resolved in runtime["compiled"]["productReferences"].items():
+        print(f"🔗 {reference} -> {resolved}")
+
+    write_json(args.output, runtime, generation=True, indent=None, separators=(",", ":"))
+    source_size = os.path.getsize(args.knowledge_base)
+    output_size = os.path.getsize(args.output)
+    print(f"✅ Base compilée: {args.output} ({output_size / 1024:.1f} Ko, source {source_size / 1024:.1f} Ko, "
+          f"{runtime['metadata']['total_scenarios']} scénarios)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Compilation des synonymes de la base de connaissances (config/synonyms.compiled.json)
+
+La section "synonyms" de INnatural_Chatbot_Knowledge_Base_v2.json ({"ar": {terme
+principal: [variantes]}, "en": {...}}) est compilée en un trie de mots par langue,
+chargé tel quel par backend/synonyms.js: un seul parcours du message trouve toutes les
+occurrences de variantes, expressions de plusieurs mots comprises.
+
+{
+  "format": 1,
+  "source": {"file": "INnatural_Chatbot_Knowledge_Base_v2.json", "sha256": ...},
+  "languages": {
+    "ar": {"terms": ["شعر جاف", ...], "maxPhraseLength": 4,
+           "trie": {"شعر": {"جاف": {"$": 0}, "ناشف": {"$": 0}}, ...}},
+    "en": {...}
+  },
+  "synonyms": {"ar": {...}, "en": {...}},         # section d'origine (variantes par terme)
+  "conflicts": [{"language": "ar", "variant": "هيشان", "terms": ["هيشان", "تقصف"]}]
+}
+- clés du trie: mots normalisés et racinisés (text_utils), "$": position du terme principal
+- conflit: variante associée à plusieurs termes principaux; le terme dont elle est le nom
+  l'emporte, sinon le premier déclaré (le premier de "terms")
+
+Usage:
+    python compile_synonyms.py [--strict] [-o SORTIE]
+    python compile_synonyms.py --query "شعري ناشف ومبهدل" [--language ar]
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from atomic_io import write_json
+from build_catalog_indexes import file_sha256
+from text_utils import light_stem, words
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config")
+DEFAULT_KNOWLEDGE_BASE = os.path.join(CONFIG_DIR, "INnatural_Chatbot_Knowledge_Base_v2.json")
+DEFAULT_OUTPUT = os.path.join(CONFIG_DIR, "synonyms.compiled.json")
+
+COMPILED_FORMAT = 1
+TERMINAL = "$"
+
+def phrase_key(text: str) -> Tuple[str, ...]:
+    """Suite de mots normalisés et racinisés d'une variante (ou d'un message)"""
+    return tuple(light_stem(word) for word in words(text))
+
+def compile_language(synonyms: Dict[str, List[str]]) -> Tuple[Dict, List[Dict]]:
+    """Trie d'une langue + conflits détectés"""
+    terms = list(synonyms)
+    owners: Dict[Tuple[str, ...], List[int]] = {}
+    texts: Dict[Tuple[str, ...], str] = {}
+    # Les noms des termes principaux d'abord: ils gardent leur propre sens
+    entries = [(i, term) for i, term in enumerate(terms)]
+    entries += [(i, variant) for i, term in enumerate(terms) for variant in synonyms[term]]
+    for position, variant in entries:
+        key = phrase_key(variant)
+        if key and position not in owners.setdefault(key, []):
+            owners[key].append(position)
+            texts.setdefault(key, variant)
+
+    trie: Dict = {}
+    conflicts = []
+    for key, positions in owners.items():
+        node = trie
+        for word in key:
+            node = node.setdefault(word, {})
+        node[TERMINAL] = positions[0]
+        if len(positions) > 1:
+            conflicts.append({"variant": texts[key], "terms": [terms[p] for p in positions]})
+
+    compiled = {"terms": terms, "maxPhraseLength": max((len(key) for key in owners), default=0), "trie": trie}
+    return compiled, conflicts
+
+def compile_synonyms(knowledge_base_path: str = DEFAULT_KNOWLEDGE_BASE) -> Dict:
+    with open(knowledge_base_path, "r", encoding="utf-8") as f:
+        synonyms = json.load(f).get("synonyms", {})
+
+    languages = {}
+    conflicts = []
+    for language, mapping in synonyms.items():
+        languages[language], found = compile_language(mapping)
+        conflicts.extend(dict(conflict, language=language) for conflict in found)
+
+    return {
+        "format": COMPILED_FORMAT,
+        "source": {"file": os.path.basename(knowledge_base_path), "sha256": file_sha256(knowledge_base_path)},
+        "languages": languages,
+        "synonyms": synonyms,
+        "conflicts": conflicts,
+    }
+
+def find_matches(compiled: Dict, text: str) -> List[Tuple[int, int, str]]:
+    """
+    Toutes les occurrences (chevauchantes comprises) en un parcours du message:
+    [(premier mot, mot suivant la fin, terme principal)]
+    """
+    key = phrase_key(text)
+    trie, terms = compiled["trie"], compiled["terms"]
+    matches = []
+    for start in range(len(key)):
+        node = trie
+        for end in range(start, min(len(key), start + compiled["maxPhraseLength"])):
+            node = node.get(key[end])
+            if node is None:
+                break
+            if TERMINAL in node:
+                matches.append((start, end + 1, terms[node[TERMINAL]]))
+    return matches
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile les synonymes de la base de connaissances")
+    parser.add_argument("--knowledge-base", default=DEFAULT_KNOWLEDGE_BASE)
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--strict", action="store_true", help="Échoue si des variantes sont en conflit")
+    parser.add_argument("--query", help="Affiche les synonymes trouvés dans un message")
+    parser.add_argument("--language", choices=["ar", "en"], default="ar")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    compiled = compile_synonyms(args.knowledge_base)
+
+    if args.query:
+        for start, end, term in find_matches(compiled["languages"][args.language], args.query):
+            print(f"  mots {start}-{end}: {term}")
+        return
+
+    for conflict in compiled["conflicts"]:
+        print(f"⚠️  [{conflict['language']}] '{conflict['variant']}' -> {' / '.join(conflict['terms'])}"
+              f" (gardé: {conflict['terms'][0]})")
+    if args.strict and compiled["conflicts"]:
+        sys.exit(f"❌ {len(compiled['conflicts'])} conflit(s) de synonymes")
+
+    write_json(args.output, compiled, generation=True, indent=None, separators=(",", ":"))
+    for language, data in compiled["languages"].items():
+        print(f"📚 {language}: {len(data['terms'])} termes, expressions jusqu'à {data['maxPhraseLength']} mots")
+    print(f"✅ Synonymes compilés: {args.output} ({os.path.getsize(args.output) / 1024:.1f} Ko)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Templates des descriptions générées (config/description_templates.json)
+
+Les textes sont des données, modifiables sans toucher au code:
+- "basic": description courte par type de produit (produits sans équivalent dans le
+  backup, enrich_product_catalog.py), "default" pour les autres types
+- "body": description complète des produits body (improve_catalog_descriptions.py):
+  paragraphes par type et langue, pied de page commun, phrase d'ingrédients par collection
+Variables: {name} (nom du produit dans la langue du texte), {ingredients} (body).
+
+Le fichier est lu et validé une fois (`get_templates`), puis compilé: chaque template body
+est préparé pour chaque collection, phrase d'ingrédients et pied de page déjà insérés.
+Rendre une description ne coûte plus qu'un str.format sur le nom.
+
+Usage: python description_templates.py [--templates FICHIER] [--benchmark N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import string
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config")
+DEFAULT_TEMPLATES = os.path.join(CONFIG_DIR, "description_templates.json")
+
+LANGUAGES = ("en", "ar")
+PARAGRAPH_SEPARATOR = "\n\n"
+# Variables autorisées par section
+BASIC_FIELDS = {"name"}
+BODY_FIELDS = {"name", "ingredients"}
+
+class TemplateError(ValueError):
+    """Fichier de templates invalide; `errors` liste tous les problèmes trouvés"""
+
+    def __init__(self, source: str, errors: List[str]):
+        self.errors = errors
+        details = "\n".join(f"  - {error}" for error in errors)
+        super().__init__(f"{source}: {len(errors)} erreur(s)\n{details}")
+
+def _escape(text: str) -> str:
+    """Texte inséré dans un template avant le rendu final (accolades littérales)"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+def _check_template(label: str, template: str, allowed: set, errors: List[str]):
+    try:
+        fields = {field for _, field, _, _ in string.Formatter().parse(template) if field is not None}
+    except ValueError as e:
+        errors.append(f"{label}: {e}")
+        return
+    unknown = fields - allowed
+    if unknown:
+        errors.append(f"{label}: variable(s) inconnue(s) {sorted(unknown)} (autorisées: {sorted(allowed)})")
+
+class DescriptionTemplates:
+    """Templates compilés: `basic(produit)` et `body(produit)` retournent {"en": ..., "ar": ...}"""
+
+    def __init__(self, data: Dict, source: str = "templates"):
+        errors = []
+        basic = data.get("basic", {})
+        body = data.get("body", {})
+
+        # Description courte: un template par type et langue
+        self.basic_templates = {}
+        for product_type, texts in dict(basic.get("types", {}), **{"": basic.get("default", {})}).items():
+            self.basic_templates[product_type] = self._localized(
+                f"basic.{product_type or 'default'}", texts, BASIC_FIELDS, errors)
+
+        # Description body: paragraphes + pied de page, ingrédients insérés par collection
+        footer = self._localized("body.footer", body.get("footer", {}), set(), errors)
+        ingredients = body.get("ingredients", {})
+        phrases = dict(ingredients.get("collections", {}), **{"": ingredients.get("default", {})})
+        for collection, texts in phrases.items():
+            self._localized(f"body.ingredients.{collection or 'default'}", texts, set(), errors)
+
+        self.body_templates = {}
+        for product_type, paragraphs in body.get("types", {}).items():
+            missing = [language for language in LANGUAGES if not paragraphs.get(language)]
+            if missing:
+                errors.append(f"body.{product_type}: paragraphes '{'/'.join(missing)}' manquants")
+                continue
+            texts = {language: PARAGRAPH_SEPARATOR.join(paragraphs[language] + [footer.get(language, "")])
+                     for language in LANGUAGES}
+            templates = self._localized(f"body.{product_type}", texts, BODY_FIELDS, errors)
+            if errors:
+                continue
+            self.body_templates[product_type] = {
+                collection: {language: templates[language].replace("{ingredients}", _escape(phrase[language]))
+                             for language in LANGUAGES}
+                for collection, phrase in phrases.items()
+            }
+
+        if errors:
+            raise TemplateError(source, errors)
+
+    @staticmethod
+    def _localized(label: str, texts: Dict, allowed: set, errors: List[str]) -> Dict[str, str]:
+        for language in LANGUAGES:
+            if not isinstance(texts.get(language), str) or not texts[language]:
+                errors.append(f"{label}: texte '{language}' manquant")
+            else:
+                _check_template(f"{label}.{language}", texts[language], allowed, errors)
+        return texts
+
+    def basic(self, product: Dict) -> Dict[str, str]:
+        """Description courte d'un produit, selon son type"""
+        templates = self.basic_templates.get(product.get("type"), self.basic_templates[""])
+        name = product["name"]
+        return {language: templates[language].format(name=name[language]) for language in LANGUAGES}
+
+    def body(self, product: Dict) -> Optional[Dict[str, str]]:
+        """Description complète d'un produit body, None si son type n'a pas de template"""
+        by_collection = self.body_templates.get(product.get("type"))
+        if by_collection is None:
+            return None
+        templates = by_collection.get(product.get("collection", ""), by_collection[""])
+        name = product["name"]
+        return {language: templates[language].format(name=name[language]) for language in LANGUAGES}
+
+    def render_many(self, products: Iterable[Dict], kind: str = "basic") -> Iterator[Optional[Dict[str, str]]]:
+        """Descriptions d'une suite de produits ("basic" ou "body")"""
+        return map(self.basic if kind == "basic" else self.body, products)
+
+_templates: Optional[DescriptionTemplates] = None
+_templates_digest: Optional[str] = None
+
+def load_templates(filepath: str = DEFAULT_TEMPLATES) -> DescriptionTemplates:
+    with open(filepath, "r", encoding="utf-8") as f:
+        return DescriptionTemplates(json.load(f), os.path.basename(filepath))
+
+def get_templates() -> DescriptionTemplates:
+    """Templates du fichier par défaut, chargés et compilés au premier appel"""
+    global _templates
+    if _templates is None:
+        _templates = load_templates()
+    return _templates
+
+def templates_digest() -> str:
+    """Empreinte du fichier de templates (invalide les produits générés avec d'autres textes)"""
+    global _templates_digest
+    if _templates_digest is None:
+        with open(DEFAULT_TEMPLATES, "rb") as f:
+            _templates_digest = hashlib.sha256(f.read()).hexdigest()
+    return _templates_digest
+
+def main():
+    parser = argparse.ArgumentParser(description="Valide les templates de description et mesure le rendu")
+    parser.add_argument("--templates", default=DEFAULT_TEMPLATES)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Rend N descriptions de produits synthétiques")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    try:
+        templates = load_templates(args.templates)
+    except TemplateError as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ Templates valides: {len(templates.basic_templates) - 1} types (basic), "
+          f"{len(templates.body_templates)} types (body)")
+
+    if args.benchmark:
+        types = list(templates.body_templates)
+        collections = list(next(iter(templates.body_templates.values()), {"": None}))
+        products = [{"name": {"en": f"Product {i}", "ar": f"منتج {i}"}, "type": types[i % len(types)],
+                     "collection": collections[i % len(collections)]} for i in range(args.benchmark)]
+        for kind in ("basic", "body"):
+            start = time.perf_counter()
+            rendered = list(templates.render_many(products, kind))
+            elapsed = time.perf_counter() - start
+            print(f"⏱️  {kind}: {len(rendered)} descriptions en {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,31 @@ Script pour enrichir le catalogue produit actuel avec les descriptions détaill
 Fusionne products.json (structure moderne) avec products.json.backup (descriptions riches)
 """
 
+import argparse
+import hashlib
 import json
 import os
-from typing import Dict, List, Any
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Any
 from datetime import datetime
 
+from atomic_io import write_json
+from catalog_io import CatalogStream, OrderedLookup, map_in_chunks, resolve_workers, write_catalog_stream
+from catalog_schema import CatalogValidationError, validated
+from description_templates import get_templates, templates_digest
+from product_matcher import DEFAULT_MIN_CONFIDENCE, ProductMatcher
+
 # Chemins des fichiers
 CURRENT_CATALOG = "../config/products.json"
 BACKUP_CATALOG = "../config/products.json.backup"
 OUTPUT_CATALOG = "../config/products_enriched.json"
+# Empreinte de chaque produit enrichi, pour ne retraiter que ce qui a changé
+HASHES_FILE = "../config/products_enriched.hashes.json"
+
+# À incrémenter à chaque modification de la génération des descriptions / bénéfices
+# (invalide toutes les empreintes: tout est régénéré au prochain lancement).
+# Les textes de config/description_templates.json comptent par leur empreinte.
+TEMPLATE_VERSION = "1"
 
 def load_json(filepath: str) -> Dict:
     """Charge un fichier JSON"""
@@ -20,67 +36,51 @@ def load_json(filepath: str) -> Dict:
         return json.load(f)
 
 def save_json(data: Dict, filepath: str):
-    """Sauvegarde un dictionnaire en JSON avec formatage"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Sauvegarde un dictionnaire en JSON avec formatage (écriture atomique)"""
+    write_json(filepath, data, generation=True)
     print(f"✅ Fichier sauvegardé: {filepath}")
 
-def create_product_mapping() -> Dict[str, str]:
+def load_hashes(filepath: str) -> Dict[str, str]:
+    """Charge les empreintes du dernier enrichissement (vide si absentes)"""
+    if not os.path.exists(filepath):
+        return {}
+    return load_json(filepath).get("products", {})
+
+def save_hashes(hashes: Dict[str, str], filepath: str):
+    """Sauvegarde les empreintes (écriture atomique: jamais de fichier à moitié écrit)"""
+    write_json(filepath, {"templateVersion": TEMPLATE_VERSION, "products": hashes})
+
+def product_hash(product: Dict, backup_id: str = None, backup_product: Dict = None) -> str:
+    """Empreinte des entrées de l'enrichissement: produit source, produit backup et version des templates"""
+    payload = json.dumps([TEMPLATE_VERSION, templates_digest(), product, backup_id, backup_product],
+                         ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# Correspondances forcées, prioritaires sur l'appariement automatique
+# (équivalences que les noms seuls ne permettent pas de retrouver)
+MANUAL_MATCHES = {
+    "mixoil-rosemary-shampoo": "mixoil-rosemary",
+    "mixoil-rosemary-oil": "mixoil-rosemary-almond",
+    "mixoil-castor-shampoo": "mixoil-castor",
+    "mixoil-castor-oil": "mixoil-triple-blend",
+    "mixoil-coconut-mist": "mixoil-coconut",
+    "curly-shampoo": "curly-shampoo",
+    "curly-conditioner": "curly-conditioner",
+    "curly-leave-in": "curly-leave-in",
+    "curly-mask": "curly-hair-mask",
+    "africa-mask": "africa-shea-butter",
+}
+
+def create_product_matcher(backup_products: Dict[str, Dict],
+                           min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> ProductMatcher:
     """
-    Crée un mapping entre les IDs du catalogue actuel et du backup
-    Basé sur les noms de produits similaires
+    Crée l'appariement entre les produits du catalogue actuel et ceux du backup
+    Basé sur les noms bilingues, le type, la collection et la taille (voir product_matcher.py);
+    seules les correspondances forcées dont le produit backup existe sont gardées
     """
-    return {
-        # MixOil Rosemary + Almond Collection
-        "mixoil-rosemary-shampoo": "mixoil-rosemary",  # Mapping approximatif
-        "mixoil-rosemary-conditioner": None,  # Pas d'équivalent exact
-        "mixoil-rosemary-leave-in": None,
-        "mixoil-rosemary-mask": None,
-        "mixoil-rosemary-serum": None,
-        "mixoil-rosemary-oil": "mixoil-rosemary-almond",
-        "mixoil-rosemary-mist": None,
-
-        # MixOil Castor + Coconut + Jojoba Collection
-        "mixoil-castor-shampoo": "mixoil-castor",
-        "mixoil-castor-conditioner": None,
-        "mixoil-castor-leave-in": None,
-        "mixoil-castor-mask": None,
-        "mixoil-castor-serum": None,
-        "mixoil-castor-oil": "mixoil-triple-blend",
-        "mixoil-coconut-mist": "mixoil-coconut",
-
-        # Body products
-        "mixoil-almond-body-butter": None,
-        "mixoil-almond-body-cream": None,
-        "mixoil-almond-body-scrub": None,
-        "mixoil-coconut-body-cream": None,
-        "mixoil-coconut-body-scrub": None,
-        "mixoil-coconut-body-butter": None,
-
-        # CocoShea Collection
-        "cocoshea-shampoo": None,
-        "cocoshea-conditioner": None,
-        "cocoshea-leave-in": None,
-        "cocoshea-mask": None,
-        "cocoshea-serum": None,
-        "cocoshea-mist": None,
-        "cocoshea-body-cream": None,
-        "cocoshea-body-scrub": None,
-        "cocoshea-hand-cream": None,
-
-        # Curly Hair Collection
-        "curly-shampoo": "curly-shampoo",
-        "curly-conditioner": "curly-conditioner",
-        "curly-leave-in": "curly-leave-in",
-        "curly-mask": "curly-hair-mask",
-
-        # Africa Collection
-        "africa-shampoo": None,
-        "africa-conditioner": None,
-        "africa-treatment": None,
-        "africa-mask": "africa-shea-butter",
-        "africa-serum": None,
-    }
+    overrides = {current_id: backup_id for current_id, backup_id in MANUAL_MATCHES.items()
+                 if backup_id in backup_products}
+    return ProductMatcher(backup_products.values(), overrides=overrides, min_confidence=min_confidence)
 
 def create_enriched_product(current_product: Dict, backup_product: Dict = None) -> Dict:
     """
@@ -114,63 +114,9 @@ def create_enriched_product(current_product: Dict, backup_product: Dict = None)
 def generate_basic_description(product: Dict) -> Dict[str, str]:
     """
     Génère une description basique pour les produits sans équivalent dans le backup
+    (textes: config/description_templates.json, section "basic")
     """
-    name_en = product["name"]["en"]
-    collection = product.get("collection", "")
-    product_type = product.get("type", "product")
-
-    # Templates de descriptions par type
-    templates = {
-        "shampoo": {
-            "en": f"A gentle and effective {name_en} specially formulated for your hair care needs. This premium shampoo cleanses thoroughly while nourishing your hair.",
-            "ar": f"شامبو {product['name']['ar']} لطيف وفعال مصمم خصيصاً لتلبية احتياجات العناية بشعرك. ينظف بعمق مع تغذية شعرك."
-        },
-        "conditioner": {
-            "en": f"Experience the nourishing power of {name_en}. This rich conditioner detangles, softens, and restores your hair's natural beauty.",
-            "ar": f"اختبري قوة التغذية مع {product['name']['ar']}. هذا البلسم الغني يفك التشابكات، ينعم، ويعيد الجمال الطبيعي لشعرك."
-        },
-        "leave-in": {
-            "en": f"{name_en} provides daily protection and continuous moisture throughout the day. Perfect for maintaining healthy, beautiful hair.",
-            "ar": f"{product['name']['ar']} يوفر حماية يومية ورطوبة مستمرة طوال اليوم. مثالي للحفاظ على شعر صحي وجميل."
-        },
-        "mask": {
-            "en": f"An intensive treatment with {name_en} that deeply nourishes and repairs your hair. Experience visible results with regular use.",
-            "ar": f"علاج مكثف مع {product['name']['ar']} يغذي ويصلح شعرك بعمق. اختبري نتائج مرئية مع الاستخدام المنتظم."
-        },
-        "serum": {
-            "en": f"{name_en} is a concentrated treatment that targets specific hair concerns with powerful active ingredients.",
-            "ar": f"{product['name']['ar']} علاج مركز يستهدف مشاكل الشعر المحددة بمكونات نشطة قوية."
-        },
-        "oil": {
-            "en": f"Pure and nourishing {name_en} that penetrates deep to strengthen, protect, and beautify your hair naturally.",
-            "ar": f"{product['name']['ar']} نقي ومغذي يخترق بعمق ليقوي، يحمي، ويجمل شعرك بشكل طبيعي."
-        },
-        "mist": {
-            "en": f"{name_en} is a refreshing spray that adds fragrance, moisture, and protection throughout the day.",
-            "ar": f"{product['name']['ar']} بخاخ منعش يضيف عطراً، رطوبة، وحماية طوال اليوم."
-        },
-        "body-butter": {
-            "en": f"Luxurious {name_en} that deeply hydrates and nourishes your skin, leaving it soft and supple.",
-            "ar": f"{product['name']['ar']} فاخر يرطب ويغذي بشرتك بعمق، يتركها ناعمة ومرنة."
-        },
-        "body-cream": {
-            "en": f"{name_en} provides lasting moisture and softness for your skin with a lightweight, fast-absorbing formula.",
-            "ar": f"{product['name']['ar']} يوفر رطوبة ونعومة دائمة لبشرتك بتركيبة خفيفة سريعة الامتصاص."
-        },
-        "body-scrub": {
-            "en": f"Exfoliating {name_en} that removes dead skin cells and reveals smoother, brighter skin.",
-            "ar": f"{product['name']['ar']} مقشر يزيل خلايا الجلد الميتة ويكشف عن بشرة أكثر نعومة وإشراقاً."
-        },
-        "hand-cream": {
-            "en": f"{name_en} protects and nourishes your hands with intensive care that lasts all day.",
-            "ar": f"{product['name']['ar']} يحمي ويغذي يديك بعناية مكثفة تدوم طوال اليوم."
-        }
-    }
-
-    return templates.get(product_type, {
-        "en": f"Premium {name_en} for your hair and beauty care needs.",
-        "ar": f"{product['name']['ar']} المميز لاحتياجات العناية بشعرك وجمالك."
-    })
+    return get_templates().basic(product)
 
 def generate_basic_benefits(product: Dict) -> Dict[str, List[str]]:
     """
@@ -224,7 +170,96 @@ def generate_basic_benefits(product: Dict) -> Dict[str, List[str]]:
         "ar": benefits_ar
     }
 
+def enrich_chunk(jobs: List) -> List:
+    """Worker: enrichit un lot de (produit, produit backup); None = produit repris tel quel"""
+    return [create_enriched_product(*job) if job is not None else None for job in jobs]
+
+def enrich_products(products: Iterable[Dict], matcher: ProductMatcher, backup_products: Dict[str, Dict],
+                    stats: Dict[str, int], verbose: bool = True,
+                    previous_hashes: Dict[str, str] = None, previous_output: CatalogStream = None,
+                    hashes: Dict[str, str] = None, workers: int = 1) -> Iterator[Dict]:
+    """
+    Étape d'enrichissement en flux: produit les produits enrichis un par un
+    `stats` est mis à jour au fil de l'eau (matched / generated / reused)
+
+    Mode incrémental: si l'empreinte d'un produit est identique à `previous_hashes`,
+    le produit enrichi est repris tel quel de `previous_output` (sortie précédente).
+    Les nouvelles empreintes sont ajoutées à `hashes`.
+
+    workers > 1: les produits à régénérer sont traités par lots dans un pool de processus,
+    l'ordre et le contenu de la sortie sont identiques au mode série.
+    """
+    previous_hashes = previous_hashes or {}
+    previous = OrderedLookup(previous_output) if previous_output is not None else None
+    # (id, id backup, backup trouvé, produit repris) dans l'ordre d'entrée
+    planned = deque()
+
+    def jobs():
+        for product in products:
+            product_id = product["id"]
+            backup_id = matcher.get(product)
+            backup_product = backup_products.get(backup_id) if backup_id else None
+
+            reused = None
+            if hashes is not None:
+                digest = product_hash(product, backup_id, backup_product)
+                hashes[product_id] = digest
+                if previous is not None and previous_hashes.get(product_id) == digest:
+                    reused = previous.get(product_id)
+
+            planned.append((product_id, backup_id, backup_product is not None, reused))
+            yield None if reused is not None else (product, backup_product)
+
+    for enriched_product in map_in_chunks(enrich_chunk, jobs(), workers):
+        product_id, backup_id, has_backup, reused = planned.popleft()
+
+        if reused is not None:
+            stats["reused"] = stats.get("reused", 0) + 1
+            if verbose:
+                print(f"⏭️  {product_id} → inchangé, repris tel quel")
+            yield reused
+            continue
+
+        if has_backup:
+            stats["matched"] += 1
+            if verbose:
+                print(f"✅ {product_id} → mappé avec {backup_id}")
+        else:
+            stats["generated"] += 1
+            if verbose:
+                print(f"🔧 {product_id} → description générée automatiquement")
+        yield enriched_product
+
+    # Fermer la sortie précédente avant qu'elle ne soit remplacée
+    if previous_output is not None:
+        previous_output.close()
+
+def print_match_report(matcher: ProductMatcher):
+    """Affiche les scores d'appariement et les produits restés sans correspondance"""
+    print(f"\n🔗 Appariement avec le backup (confiance minimale {matcher.min_confidence}):")
+    for match in matcher.report:
+        if match.backup_id is not None:
+            print(f"   {match.confidence:.2f} {match.source:<6} {match.product_id} → {match.backup_id}")
+    unmatched = matcher.unmatched()
+    if unmatched:
+        print(f"\n⚠️  {len(unmatched)} produits sans correspondance:")
+        for match in unmatched:
+            best = f" (meilleur candidat: {match.best_candidate}, {match.confidence:.2f})" if match.best_candidate else ""
+            print(f"   - {match.product_id}{best}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Enrichit le catalogue produit avec les descriptions du backup")
+    parser.add_argument('--full', action='store_true',
+                        help="Régénérer tous les produits, même ceux inchangés depuis le dernier lancement")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processus de génération en parallèle (0 = un par cœur, défaut: 1)")
+    parser.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help=f"Confiance minimale d'un appariement automatique (défaut: {DEFAULT_MIN_CONFIDENCE})")
+    parser.add_argument('--match-report', metavar='FICHIER',
+                        help="Écrit le rapport d'appariement (scores, produits sans correspondance) en JSON")
+    args = parser.parse_args()
+    workers = resolve_workers(args.workers)
+
     # Set UTF-8 encoding for Windows console
     import sys
     if sys.platform == 'win32':
@@ -233,59 +268,70 @@ def main():
 
     print("🚀 Démarrage de l'enrichissement du catalogue produit...\n")
 
-    # Charger les catalogues
+    # Charger les catalogues (le catalogue actuel est lu en flux, produit par produit)
     print("📖 Chargement des catalogues...")
-    current = load_json(CURRENT_CATALOG)
     backup = load_json(BACKUP_CATALOG)
 
-    print(f"✅ Catalogue actuel: {current['metadata']['totalProducts']} produits")
-    print(f"✅ Catalogue backup: {len(backup['products'])} produits\n")
-
-    # Créer le mapping
-    mapping = create_product_mapping()
-
-    # Créer un dictionnaire des produits backup par ID
-    backup_products = {p["id"]: p for p in backup["products"]}
-
-    # Enrichir chaque produit du catalogue actuel
-    enriched_products = []
-    matched_count = 0
-    generated_count = 0
-
-    print("🔄 Enrichissement des produits en cours...\n")
-
-    for product in current["products"]:
-        product_id = product["id"]
-        backup_id = mapping.get(product_id)
-        backup_product = backup_products.get(backup_id) if backup_id else None
-
-        enriched_product = create_enriched_product(product, backup_product)
-        enriched_products.append(enriched_product)
-
-        if backup_product:
-            matched_count += 1
-            print(f"✅ {product_id} → mappé avec {backup_id}")
-        else:
-            generated_count += 1
-            print(f"🔧 {product_id} → description générée automatiquement")
-
-    # Créer le catalogue enrichi
-    enriched_catalog = current.copy()
-    enriched_catalog["products"] = enriched_products
-    enriched_catalog["metadata"]["version"] = "4.0.0"
-    enriched_catalog["metadata"]["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
-    enriched_catalog["metadata"]["enriched"] = True
-    enriched_catalog["metadata"]["enrichmentDate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Sauvegarder
-    save_json(enriched_catalog, OUTPUT_CATALOG)
+    with CatalogStream(CURRENT_CATALOG) as current:
+        print(f"✅ Catalogue actuel: {os.path.basename(current.filepath)} (lu en flux)")
+        print(f"✅ Catalogue backup: {len(backup['products'])} produits\n")
+
+        # Créer un dictionnaire des produits backup par ID
+        backup_products = {p["id"]: p for p in backup["products"]}
+
+        # Indexer le backup pour l'appariement automatique
+        matcher = create_product_matcher(backup_products, args.min_confidence)
+
+        print(f"🔄 Enrichissement des produits en cours ({workers} processus)...\n")
+
+        # Métadonnées du catalogue enrichi (écrites avant les produits)
+        metadata = current.sections["metadata"]
+        metadata["version"] = "4.0.0"
+        metadata["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+        metadata["enriched"] = True
+        metadata["enrichmentDate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Mode incrémental: reprendre les produits inchangés de la sortie précédente
+        previous_hashes = {} if args.full else load_hashes(HASHES_FILE)
+        previous_output = None
+        if previous_hashes and os.path.exists(OUTPUT_CATALOG):
+            previous_output = CatalogStream(OUTPUT_CATALOG).open()
+            print(f"♻️  Mode incrémental: {len(previous_hashes)} empreintes du dernier lancement\n")
+
+        # Enrichir et sauvegarder chaque produit au fil de l'eau
+        stats = {"matched": 0, "generated": 0, "reused": 0}
+        hashes = {}
+        try:
+            # Catalogue validé au passage (sortie de sync_products_*, sans description ni
+            # catégorie): s'il est invalide, rien n'est écrit
+            total = write_catalog_stream(OUTPUT_CATALOG, current.sections,
+                                         enrich_products(validated(current, stage="source"), matcher,
+                                                         backup_products, stats,
+                                                         previous_hashes=previous_hashes,
+                                                         previous_output=previous_output,
+                                                         hashes=hashes, workers=workers),
+                                         generation=True)
+        except CatalogValidationError as e:
+            sys.exit(f"❌ {e}")
+        finally:
+            if previous_output is not None:
+                previous_output.close()
+        save_hashes(hashes, HASHES_FILE)
+        print(f"✅ Fichier sauvegardé: {OUTPUT_CATALOG}")
+
+    print_match_report(matcher)
+    if args.match_report:
+        write_json(args.match_report, matcher.report_dict())
+        print(f"✅ Rapport d'appariement: {args.match_report}")
 
     print(f"\n{'='*60}")
     print("✨ ENRICHISSEMENT TERMINÉ !\n")
     print(f"📊 Statistiques:")
-    print(f"   - Total produits: {len(enriched_products)}")
-    print(f"   - Descriptions du backup: {matched_count}")
-    print(f"   - Descriptions générées: {generated_count}")
+    print(f"   - Total produits: {total}")
+    print(f"   - Descriptions du backup: {stats['matched']}")
+    print(f"   - Descriptions générées: {stats['generated']}")
+    print(f"   - Produits inchangés repris: {stats['reused']}")
+    print(f"   - Produits retraités: {total - stats['reused']}")
     print(f"\n📁 Fichier créé: {OUTPUT_CATALOG}")
     print(f"{'='*60}\n")
 
@@ -6,11 +6,17 @@ Script pour améliorer les descriptions du catalogue enrichi
 - Améliore la cohérence des bénéfices
 """
 
-import json
+import argparse
+import re
 import sys
 import io
 from datetime import datetime
 
+from build_catalog_indexes import CatalogIndexBuilder, write_indexes
+from catalog_io import CatalogStream, map_in_chunks, resolve_workers, write_catalog_stream
+from catalog_schema import CatalogValidationError, validated
+from description_templates import get_templates
+
 # Configuration UTF-8 pour Windows
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -19,20 +25,11 @@ if sys.platform == 'win32':
 CATALOG_PATH = "../config/products.json"
 OUTPUT_PATH = "../config/products.json"
 
-def load_catalog():
-    """Charge le catalogue"""
-    with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_catalog(catalog):
-    """Sauvegarde le catalogue"""
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        json.dump(catalog, f, ensure_ascii=False, indent=2)
+BODY_TYPES = ('body-butter', 'body-cream', 'body-scrub', 'hand-cream')
 
 def is_body_product(product_type):
     """Vérifie si c'est un produit pour le corps"""
-    body_types = ['body-butter', 'body-cream', 'body-scrub', 'hand-cream']
-    return product_type in body_types
+    return product_type in BODY_TYPES
 
 def get_body_product_benefits(product_type, collection_name=""):
     """Génère des bénéfices appropriés pour les produits body"""
@@ -111,190 +108,162 @@ def get_body_product_benefits(product_type, collection_name=""):
     }
 
 def enrich_body_product_description(product):
-    """Enrichit la description d'un produit body"""
-    product_type = product.get("type", "")
-    product_name_en = product["name"]["en"]
-    product_name_ar = product["name"]["ar"]
-    collection = product.get("collection", "")
-
-    # Déterminer les ingrédients selon la collection
-    ingredients_map = {
-        "mixoil-rosemary-almond": {
-            "en": "enriched with sweet almond oil and rosemary extract",
-            "ar": "غني بزيت اللوز الحلو وخلاصة الروزماري"
-        },
-        "mixoil-castor-coconut-jojoba": {
-            "en": "enriched with coconut oil, jojoba, and nourishing botanicals",
-            "ar": "غني بزيت جوز الهند والجوجوبا والمواد النباتية المغذية"
-        },
-        "cocoshea": {
-            "en": "enriched with coconut oil and shea butter",
-            "ar": "غني بزيت جوز الهند وزبدة الشيا"
-        }
-    }
-
-    ingredients = ingredients_map.get(collection, {
-        "en": "enriched with natural ingredients",
-        "ar": "غني بالمكونات الطبيعية"
-    })
-
-    # Templates enrichis selon le type
-    if product_type == "body-butter":
-        description_en = f"""Luxurious {product_name_en} that deeply hydrates and nourishes your skin 🧈✨
-
-This rich, creamy body butter is {ingredients['en']} that penetrate deep to provide intensive moisture. Perfect for dry skin, it leaves your skin feeling soft, supple, and beautifully smooth all day long.
-
-The thick, indulgent texture melts into your skin, creating a protective barrier that locks in moisture and keeps your skin hydrated for hours. Ideal for use after showering or bathing when your skin needs extra nourishment.
-
-Your skin deserves the best care 💛
-
-WhatsApp/Call: +20155 5590333"""
-
-        description_ar = f"""زبدة الجسم الفاخرة {product_name_ar} التي ترطب وتغذي بشرتك بعمق 🧈✨
-
-زبدة الجسم الغنية والكريمية هذه {ingredients['ar']} التي تخترق بعمق لتوفير ترطيب مكثف. مثالية للبشرة الجافة، تترك بشرتك ناعمة ومرنة ومنعشة بشكل جميل طوال اليوم.
-
-القوام السميك واللذيذ يذوب في بشرتك، مما يخلق حاجزاً واقياً يحبس الرطوبة ويحافظ على ترطيب بشرتك لساعات. مثالي للاستخدام بعد الاستحمام عندما تحتاج بشرتك إلى تغذية إضافية.
-
-بشرتك تستحق أفضل عناية 💛
-
-WhatsApp / Call:
-+20155 5590333"""
-
-    elif product_type == "body-cream":
-        description_en = f"""Silky smooth {product_name_en} for daily hydration ✨
-
-This lightweight body cream is {ingredients['en']} that absorb quickly without leaving any greasy residue. Perfect for everyday use, it provides lasting moisture and leaves your skin feeling soft, smooth, and refreshed.
-
-The fast-absorbing formula is ideal for busy mornings when you need quick, effective hydration. Your skin will feel nourished and protected throughout the day.
-
-Beautiful skin starts here 💛
-
-WhatsApp/Call: +20155 5590333"""
-
-        description_ar = f"""كريم الجسم الناعم {product_name_ar} للترطيب اليومي ✨
-
-كريم الجسم الخفيف هذا {ingredients['ar']} الذي يمتص بسرعة دون ترك أي بقايا دهنية. مثالي للاستخدام اليومي، يوفر ترطيباً دائماً ويترك بشرتك ناعمة ومنتعشة.
-
-التركيبة سريعة الامتصاص مثالية للصباح المزدحم عندما تحتاجين إلى ترطيب سريع وفعال. ستشعرين ببشرتك مغذية ومحمية طوال اليوم.
-
-البشرة الجميلة تبدأ من هنا 💛
-
-WhatsApp / Call:
-+20155 5590333"""
-
-    elif product_type == "body-scrub":
-        description_en = f"""Exfoliating {product_name_en} for radiant, smooth skin ✨
-
-This gentle yet effective body scrub is {ingredients['en']} that polish away dead skin cells and reveal the soft, glowing skin beneath. Use 2-3 times per week for best results.
-
-The fine exfoliating particles work to smooth rough patches, improve skin texture, and prepare your skin to better absorb your moisturizer. Your skin will feel incredibly soft and look noticeably brighter.
-
-Reveal your skin's natural glow 💛
-
-WhatsApp/Call: +20155 5590333"""
-
-        description_ar = f"""مقشر الجسم {product_name_ar} لبشرة ناعمة ومشرقة ✨
-
-مقشر الجسم اللطيف والفعال هذا {ingredients['ar']} الذي يزيل خلايا الجلد الميتة ويكشف عن البشرة الناعمة والمتوهجة تحتها. استخدميه 2-3 مرات في الأسبوع لأفضل النتائج.
-
-جزيئات التقشير الدقيقة تعمل على تنعيم المناطق الخشنة، وتحسين ملمس البشرة، وتحضير بشرتك لامتصاص المرطب بشكل أفضل. ستشعرين ببشرتك ناعمة بشكل لا يصدق وتبدو أكثر إشراقاً.
-
-اكشفي عن توهج بشرتك الطبيعي 💛
-
-WhatsApp / Call:
-+20155 5590333"""
-
-    elif product_type == "hand-cream":
-        description_en = f"""Nourishing {product_name_en} for soft, protected hands 🙌
-
-This intensive hand cream is {ingredients['en']} that provide deep nourishment and protection for your hardworking hands. The rich formula absorbs quickly and creates a protective barrier against dryness.
-
-Perfect for frequent use throughout the day, especially after washing hands. Keeps your hands soft, smooth, and protected even with frequent washing.
-
-Your hands deserve special care 💛
-
-WhatsApp/Call: +20155 5590333"""
-
-        description_ar = f"""كريم اليد المغذي {product_name_ar} لأيادي ناعمة ومحمية 🙌
-
-كريم اليد المكثف هذا {ingredients['ar']} الذي يوفر تغذية عميقة وحماية ليديك العاملتين. التركيبة الغنية تمتص بسرعة وتخلق حاجزاً واقياً ضد الجفاف.
-
-مثالي للاستخدام المتكرر طوال اليوم، خاصة بعد غسل اليدين. يحافظ على يديك ناعمة ومنعشة ومحمية حتى مع الغسيل المتكرر.
-
-يداك تستحقان عناية خاصة 💛
-
-WhatsApp / Call:
-+20155 5590333"""
-
-    else:
-        # Fallback générique
-        return product.get("description", {})
-
-    return {
-        "en": description_en,
-        "ar": description_ar
-    }
-
-def improve_product(product):
-    """Améliore un produit"""
-    product_type = product.get("type", "")
-
-    # Si c'est un produit body avec des mauvais bénéfices
-    if is_body_product(product_type):
-        # Vérifier si les bénéfices parlent de cheveux (erreur)
-        current_benefits = product.get("benefits", {})
-        if current_benefits:
-            benefits_text = str(current_benefits.get("en", []))
-            if "hair" in benefits_text.lower():
-                print(f"   🔧 Correction bénéfices body: {product['id']}")
-                # Remplacer par des bénéfices appropriés
-                product["benefits"] = get_body_product_benefits(product_type, product.get("collection", ""))
-
-                # Enrichir la description si elle est basique
-                current_desc = product.get("description", {}).get("en", "")
-                if len(current_desc) < 200 or "provides lasting moisture" in current_desc:
-                    print(f"   ✨ Enrichissement description: {product['id']}")
-                    product["description"] = enrich_body_product_description(product)
-
-    return product
+    """
+    Enrichit la description d'un produit body
+    (textes: config/description_templates.json, section "body")
+    """
+    return get_templates().body(product) or product.get("description", {})
+
+def is_basic_description(description):
+    """Description générée automatiquement (courte ou texte générique du template)"""
+    text = description.get("en", "") if isinstance(description, dict) else ""
+    return len(text) < 200 or "provides lasting moisture" in text
+
+def fix_body_benefits(product):
+    """Bénéfices body parlant de cheveux: bénéfices peau, et description enrichie si basique"""
+    updates = {"benefits": get_body_product_benefits(product.get("type", ""), product.get("collection", ""))}
+    if is_basic_description(product.get("description", {})):
+        updates["description"] = enrich_body_product_description(product)
+    return updates
+
+# Règles de correction: quand un des mots-clés apparaît dans champ[langue] d'un produit
+# de l'un des types, `fix(produit)` retourne les nouvelles valeurs des champs à corriger
+CORRECTION_RULES = [
+    {
+        "name": "body-benefits",
+        "types": BODY_TYPES,
+        "field": "benefits",
+        "language": "en",
+        "keywords": ["hair"],
+        "fix": fix_body_benefits,
+    },
+]
+
+class CorrectionEngine:
+    """
+    Applique les règles de correction en un passage par produit
+
+    Les règles sont indexées par type de produit, puis regroupées par (champ, langue):
+    les mots-clés d'un groupe sont compilés en une seule expression, un seul parcours du
+    texte trouve toutes les règles déclenchées. Un produit ne voit que les règles de son
+    type: le coût reste proportionnel au texte examiné, pas au nombre de règles.
+    """
+
+    def __init__(self, rules=CORRECTION_RULES):
+        self.rules = rules
+        # type -> [(champ, langue, regex, {mot-clé: [positions des règles]})]
+        self.by_type = {}
+        groups = {}
+        for position, rule in enumerate(rules):
+            for product_type in rule["types"]:
+                group = groups.setdefault((product_type, rule["field"], rule["language"]), {})
+                for keyword in rule["keywords"]:
+                    group.setdefault(keyword.lower(), []).append(position)
+        for (product_type, field, language), keywords in groups.items():
+            alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+            pattern = re.compile(rf"\b(?:{alternatives})", re.IGNORECASE)
+            self.by_type.setdefault(product_type, []).append((field, language, pattern, keywords))
+
+    def triggered(self, product):
+        """Positions des règles déclenchées par un produit, dans l'ordre de déclaration"""
+        positions = set()
+        for field, language, pattern, keywords in self.by_type.get(product.get("type"), ()):
+            value = product.get(field)
+            value = value.get(language) if isinstance(value, dict) else None
+            if not value:
+                continue
+            text = "\n".join(value) if isinstance(value, list) else str(value)
+            for match in pattern.finditer(text):
+                positions.update(keywords[match.group(0).lower()])
+        return sorted(positions)
+
+    def apply(self, product):
+        """
+        Corrige le produit en place; retourne {règle: [champs réellement modifiés]}
+        (une correction qui redonne la même valeur n'est pas comptée)
+        """
+        changes = {}
+        for position in self.triggered(product):
+            rule = self.rules[position]
+            updates = rule["fix"](product)
+            changed = [field for field, value in updates.items() if product.get(field) != value]
+            for field in changed:
+                product[field] = updates[field]
+            if changed:
+                changes[rule["name"]] = changed
+        return changes
+
+_engine = CorrectionEngine()
+
+def improve_chunk(products):
+    """Worker: améliore un lot de produits, retourne (produit, modifications) pour chacun"""
+    return [(product, _engine.apply(product)) for product in products]
+
+def improve_products(products, stats, workers=1):
+    """
+    Étape d'amélioration en flux: produit les produits améliorés un par un
+    `stats`: total, improved (produits modifiés) et nombre de produits modifiés par règle
+    workers > 1: lots traités dans un pool de processus, sortie identique au mode série
+    """
+    for improved_product, changes in map_in_chunks(improve_chunk, products, workers):
+        stats["total"] += 1
+        if changes:
+            stats["improved"] += 1
+            print(f"   🔧 {improved_product['id']}: " +
+                  ", ".join(f"{rule} ({', '.join(fields)})" for rule, fields in changes.items()))
+        rule_counts = stats.setdefault("rules", {})
+        for rule in changes:
+            rule_counts[rule] = rule_counts.get(rule, 0) + 1
+        yield improved_product
 
 def main():
+    parser = argparse.ArgumentParser(description="Améliore les descriptions du catalogue")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processus d'amélioration en parallèle (0 = un par cœur, défaut: 1)")
+    args = parser.parse_args()
+    workers = resolve_workers(args.workers)
+
     print("🚀 Amélioration complète du catalogue...\n")
 
-    # Charger le catalogue
+    # Lire le catalogue en flux (réécrit via un fichier temporaire: même chemin en entrée et en sortie)
     print("📖 Chargement du catalogue...")
-    catalog = load_catalog()
-
-    total_products = len(catalog["products"])
-    print(f"✅ {total_products} produits trouvés\n")
-
-    # Améliorer chaque produit
-    print("🔄 Amélioration en cours...\n")
-    improved_count = 0
-
-    for product in catalog["products"]:
-        original_product = product.copy()
-        improved_product = improve_product(product)
-
-        if improved_product != original_product:
-            improved_count += 1
-
-    # Mettre à jour les métadonnées
-    catalog["metadata"]["version"] = "4.1.0"
-    catalog["metadata"]["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
-    catalog["metadata"]["improved"] = True
-    catalog["metadata"]["improvementDate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Sauvegarder
-    save_catalog(catalog)
+    with CatalogStream(CATALOG_PATH) as catalog:
+        # Mettre à jour les métadonnées (écrites avant les produits)
+        catalog.sections["metadata"]["version"] = "4.1.0"
+        catalog.sections["metadata"]["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+        catalog.sections["metadata"]["improved"] = True
+        catalog.sections["metadata"]["improvementDate"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Améliorer et sauvegarder chaque produit au fil de l'eau
+        print(f"🔄 Amélioration en cours ({workers} processus)...\n")
+        stats = {"total": 0, "improved": 0}
+        indexer = CatalogIndexBuilder()
+        # Catalogue validé au passage (descriptions présentes, catégorie pas encore
+        # obligatoire): s'il est invalide, le fichier n'est pas réécrit
+        try:
+            write_catalog_stream(OUTPUT_PATH, catalog.sections,
+                                 indexer.observe(improve_products(validated(catalog, stage="enriched"),
+                                                                  stats, workers)),
+                                 generation=True)
+        except CatalogValidationError as e:
+            sys.exit(f"❌ {e}")
+        version = catalog.sections["metadata"]["version"]
+
+    # Index précalculés pour le backend (id, type, collection, concern, prix, tags...)
+    indexes_path = write_indexes(indexer, OUTPUT_PATH, version)
+
+    total_products = stats["total"]
+    improved_count = stats["improved"]
 
     print(f"\n{'='*60}")
     print("✨ AMÉLIORATION TERMINÉE !\n")
     print(f"📊 Statistiques:")
     print(f"   - Total produits: {total_products}")
     print(f"   - Produits améliorés: {improved_count}")
+    for rule, count in stats.get("rules", {}).items():
+        print(f"     · {rule}: {count}")
     print(f"\n📁 Fichier mis à jour: {OUTPUT_PATH}")
+    print(f"🗂️  Index: {indexes_path}")
     print(f"📌 Nouvelle version: 4.1.0")
     print(f"{'='*60}\n")
 
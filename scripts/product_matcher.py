@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Appariement automatique des produits entre deux catalogues (ex: products.json et son backup)
+Compare noms bilingues, id, type, collection et taille via des index inversés
+(mots et trigrammes de caractères): seuls les produits qui partagent au moins un
+mot ou trigramme sont comparés, sans balayage de toutes les paires.
+"""
+
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from text_utils import words
+
+# Seuil de confiance par défaut en dessous duquel un produit reste sans correspondance
+DEFAULT_MIN_CONFIDENCE = 0.55
+
+# Mots trop génériques pour départager deux produits
+STOPWORDS = {"and", "with", "for", "the", "of", "hair", "و", "مع", "لل", "الشعر", "شعر"}
+
+# Poids des composantes du score de confiance
+WEIGHTS = {"tokens": 0.55, "trigrams": 0.30, "size": 0.15}
+
+# Recherche des candidats: un mot ou trigramme présent dans plus de cette part du
+# catalogue (et au moins MIN_POSTINGS_LIMIT produits) ne sert pas à trouver des
+# candidats, il reste compté dans le score
+MAX_POSTINGS_SHARE = 0.05
+MIN_POSTINGS_LIMIT = 64
+# Nombre de candidats scorés en détail par produit
+MAX_CANDIDATES = 50
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in words(text) if t not in STOPWORDS]
+
+def trigrams(text: str) -> set:
+    padded = f" {' '.join(tokenize(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def normalize_size(size) -> Optional[str]:
+    """'250 ml' / '250ML' -> '250ml'"""
+    if not size:
+        return None
+    return re.sub(r"\s+", "", str(size).lower())
+
+def infer_type(name: str, types: Iterable[str]) -> Optional[str]:
+    """
+    Type du catalogue nommé dans un titre ou un id, ou None
+    ('MixOil Rosemary + Almond Hair Mask' -> 'mask'): le plus proche de la fin du titre
+    l'emporte, puis le plus long ('Body Cream' -> 'body-cream' plutôt que 'cream')
+    """
+    text = f" {' '.join(words(name or ''))} "
+    best = None
+    for product_type in types:
+        phrase = f" {' '.join(words(product_type))} "
+        position = text.rfind(phrase)
+        if position >= 0 and (best is None or (position + len(phrase), len(phrase)) > best[0]):
+            best = ((position + len(phrase), len(phrase)), product_type)
+    return best[1] if best else None
+
+class Match(NamedTuple):
+    product_id: str
+    backup_id: Optional[str]
+    confidence: float
+    source: str           # "auto", "manuel" ou "aucun"
+    best_candidate: Optional[str] = None
+
+class _Features:
+    __slots__ = ("tokens", "grams", "type", "size")
+
+    def __init__(self, product: Dict):
+        name = product.get("name") or {}
+        if isinstance(name, str):
+            name = {"en": name}
+        text = " ".join([product.get("id", "").replace("-", " "), name.get("en", ""), name.get("ar", ""),
+                         str(product.get("collection", "")).replace("-", " ")])
+        self.tokens = set(tokenize(text))
+        self.grams = trigrams(name.get("en", "") or product.get("id", "").replace("-", " "))
+        self.type = product.get("type")
+        self.size = normalize_size(product.get("size"))
+
+class ProductMatcher:
+    """
+    Index des produits backup; `match(produit)` retourne la meilleure correspondance
+    avec un score de confiance entre 0 et 1.
+    - `overrides`: correspondances forcées {id actuel: id backup} (confiance 1.0)
+    - deux produits de types différents ne sont jamais appariés
+    - `report` garde le résultat de chaque appel à `match`, dans l'ordre
+    """
+
+    def __init__(self, backup_products: Iterable[Dict], overrides: Dict[str, str] = None,
+                 min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.overrides = overrides or {}
+        self.min_confidence = min_confidence
+        self.report: List[Match] = []
+        self._ids: List[str] = []
+        self._features: List[_Features] = []
+        self._token_postings: Dict[str, List[int]] = defaultdict(list)
+        self._gram_postings: Dict[str, List[int]] = defaultdict(list)
+
+        for product in backup_products:
+            features = _Features(product)
+            index = len(self._ids)
+            self._ids.append(product["id"])
+            self._features.append(features)
+            for token in features.tokens:
+                self._token_postings[token].append(index)
+            for gram in features.grams:
+                self._gram_postings[gram].append(index)
+
+        count = len(self._ids)
+        self._idf = {token: math.log(1 + count / len(postings)) for token, postings in self._token_postings.items()}
+        self._postings_limit = max(MIN_POSTINGS_LIMIT, int(count * MAX_POSTINGS_SHARE))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _token_weight(self, tokens: set) -> float:
+        # Mot inconnu du backup: poids maximal (il pénalise la correspondance)
+        default = math.log(1 + max(1, len(self._ids)))
+        return sum(self._idf.get(t, default) for t in tokens)
+
+    def _score(self, features: _Features, candidate: _Features) -> float:
+        components = {}
+        shared_weight = self._token_weight(features.tokens & candidate.tokens)
+        total_weight = self._token_weight(features.tokens) + self._token_weight(candidate.tokens)
+        components["tokens"] = 2 * shared_weight / total_weight if total_weight else 0.0
+        total_grams = len(features.grams) + len(candidate.grams)
+        components["trigrams"] = 2 * len(features.grams & candidate.grams) / total_grams if total_grams else 0.0
+        if features.size and candidate.size:
+            components["size"] = 1.0 if features.size == candidate.size else 0.0
+
+        weight = sum(WEIGHTS[name] for name in components)
+        return sum(WEIGHTS[name] * value for name, value in components.items()) / weight
+
+    def _candidate_indexes(self, features: _Features) -> List[int]:
+        """Produits backup partageant des mots / trigrammes peu courants, les plus proches d'abord"""
+        votes = defaultdict(float)
+        rarest = None
+        for postings, weight in self._lookups(features):
+            if rarest is None or len(postings) < len(rarest):
+                rarest = postings
+            if len(postings) <= self._postings_limit:
+                for index in postings:
+                    votes[index] += weight
+        if not votes and rarest:
+            # Que des mots courants: on se rabat sur le plus rare d'entre eux
+            votes = dict.fromkeys(rarest, 0.0)
+        return heapq.nlargest(MAX_CANDIDATES, votes, key=votes.get)
+
+    def _lookups(self, features: _Features):
+        for token in features.tokens:
+            postings = self._token_postings.get(token)
+            if postings:
+                yield postings, self._idf[token]
+        for gram in features.grams:
+            postings = self._gram_postings.get(gram)
+            if postings:
+                # Un trigramme compte moins qu'un mot entier
+                yield postings, 1 / len(features.grams)
+
+    def candidates(self, product: Dict) -> List[tuple]:
+        """[(confiance, id backup)] triés par confiance décroissante"""
+        features = _Features(product)
+        scored = []
+        for index in self._candidate_indexes(features):
+            candidate = self._features[index]
+            if features.type and candidate.type and features.type != candidate.type:
+                continue
+            scored.append((round(self._score(features, candidate), 3), self._ids[index]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored
+
+    def match(self, product: Dict) -> Match:
+        product_id = product["id"]
+        if product_id in self.overrides:
+            result = Match(product_id, self.overrides[product_id], 1.0, "manuel")
+        else:
+            scored = self.candidates(product)
+            if scored and scored[0][0] >= self.min_confidence:
+                result = Match(product_id, scored[0][1], scored[0][0], "auto")
+            else:
+                best = scored[0] if scored else (0.0, None)
+                result = Match(product_id, None, best[0], "aucun", best[1])
+        self.report.append(result)
+        return result
+
+    def get(self, product: Dict) -> Optional[str]:
+        """Id backup correspondant au produit, ou None"""
+        return self.match(product).backup_id
+
+    def unmatched(self) -> List[Match]:
+        return [m for m in self.report if m.backup_id is None]
+
+    def report_dict(self) -> Dict:
+        """Rapport sérialisable en JSON: correspondances et produits sans correspondance"""
+        return {
+            "minConfidence": self.min_confidence,
+            "matched": [
+                {"id": m.product_id, "backupId": m.backup_id, "confidence": m.confidence, "source": m.source}
+                for m in self.report if m.backup_id is not None
+            ],
+            "unmatched": [
+                {"id": m.product_id, "bestCandidate": m.best_candidate, "confidence": m.confidence}
+                for m in self.unmatched()
+            ],
+        }
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Synchronisation des prix et des nouveaux produits depuis la boutique innaturalstores.com
+
+Lit les pages collections et produits de la boutique via un "fetcher" interchangeable:
+- SnapshotFetcher: rejoue des pages sauvegardées (HTML / JSON), entièrement hors ligne
+- HttpFetcher: télécharge les pages, et peut les sauvegarder pour les rejouer plus tard
+
+Les pages produits sont lues et analysées en parallèle (pool de threads borné), puis
+rapprochées un pour un des produits d'une source de catalogue (catalog_sources/) pour
+mettre à jour les prix. Les produits de la boutique sans correspondance sont convertis au
+format du catalogue (voir new_products), validés (étape "source") et ajoutés à la source.
+Une page illisible est signalée et ignorée.
+
+Formats reconnus:
+- HTML avec JSON-LD schema.org "Product" (name, offers.price, image...) ou balises
+  OpenGraph (og:title, product:price:amount)
+- JSON de type Shopify: {"product": {...}} ou {"products": [...]} (title, handle, variants)
+- pages collections: liens "/products/<handle>" et JSON {"products": [...]}
+
+Pages de test: tests/fixtures/store_snapshots (rejouées par tests/test_store_sync.py)
+
+Usage:
+    python store_sync.py --snapshots DOSSIER                 # rejoue les pages sauvegardées
+    python store_sync.py --live --save-snapshots DOSSIER     # télécharge et sauvegarde
+    python store_sync.py --snapshots DOSSIER --apply         # écrit les prix et nouveaux produits dans la source
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional
+
+from atomic_io import atomic_write
+from catalog_schema import DEFAULT_IMAGES_DIR, IMAGE_PREFIX, validate_catalog
+from catalog_source import append_products_csv, load_catalog_source, update_products_csv
+from product_matcher import Match, ProductMatcher, infer_type
+from text_utils import words
+
+STORE_URL = "https://innaturalstores.com/"
+# Pages produits en arabe (nom arabe des nouveaux produits)
+ARABIC_PREFIX = "ar/"
+COLLECTION_PATHS = [
+    "collections/mixoil",
+    "collections/cocoshea",
+    "collections/curly-hair",
+    "collections/africa",
+]
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog_sources", "complete")
+DEFAULT_WORKERS = 8
+# Confiance minimale pour appliquer un prix relevé sur la boutique à un produit du catalogue
+MIN_CONFIDENCE = 0.6
+
+_PRODUCT_LINK_RE = re.compile(r"/products/([\w-]+)")
+_SIZE_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s?(ml|g|gm|l)\b", re.IGNORECASE)
+
+# --- Fetchers ---
+
+def snapshot_path(url: str) -> str:
+    """Chemin relatif d'une page sauvegardée: 'innaturalstores.com/collections/africa.html'"""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path.strip("/") or "index"
+    if not os.path.splitext(path)[1]:
+        path += ".html"
+    return os.path.join(parts.netloc, *path.split("/"))
+
+class SnapshotFetcher:
+    """Rejoue des pages sauvegardées (voir snapshot_path); aucune requête réseau"""
+
+    def __init__(self, snapshot_dir: str):
+        self.snapshot_dir = snapshot_dir
+
+    def fetch(self, url: str) -> Optional[str]:
+        path = os.path.join(self.snapshot_dir, snapshot_path(url))
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+class HttpFetcher:
+    """Télécharge les pages; `save_dir` les sauvegarde au format de SnapshotFetcher"""
+
+    def __init__(self, timeout: float = 15.0, save_dir: str = None):
+        self.timeout = timeout
+        self.save_dir = save_dir
+
+    def fetch(self, url: str) -> Optional[str]:
+        request = urllib.request.Request(url, headers={"User-Agent": "innatural-chatbot-sync/1.0"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                text = response.read().decode(response.headers.get_content_charset() or "utf-8")
+        except OSError as e:
+            print(f"⚠️  {url}: {e}")
+            return None
+        if self.save_dir:
+            path = os.path.join(self.save_dir, snapshot_path(url))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, text)
+        return text
+
+# --- Analyse des pages ---
+
+class _PageParser(HTMLParser):
+    """Récupère les blocs JSON-LD, les balises meta et les liens d'une page HTML"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self.links: List[str] = []
+        self._in_json_ld = False
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("type") == "application/ld+json":
+            self._in_json_ld = True
+            self._buffer = []
+        elif tag == "meta":
+            key = attrs.get("property") or attrs.get("name")
+            if key and "content" in attrs:
+                self.meta.setdefault(key, attrs["content"])
+        elif tag == "a" and attrs.get("href"):
+            self.links.append(attrs["href"])
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._buffer.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+            self.json_ld.append("".join(self._buffer))
+
+def _parse_price(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        price = float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+    return int(price) if price.is_integer() else price
+
+def _parse_size(*texts: str) -> Optional[str]:
+    for text in texts:
+        match = _SIZE_RE.search(text or "")
+        if match:
+            unit = match.group(2).lower()
+            return f"{match.group(1)}{'g' if unit == 'gm' else unit}"
+    return None
+
+def _json_ld_products(blocks: Iterable[str]) -> List[Dict]:
+    products = []
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data])
+        products.extend(item for item in items if isinstance(item, dict) and item.get("@type") == "Product")
+    return products
+
+def _from_json_ld(item: Dict, url: str) -> Dict:
+    offers = item.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    image = item.get("image")
+    if isinstance(image, list):
+        image = image[0] if image else None
+    return {
+        "handle": _handle_from_url(item.get("url") or url),
+        "url": url,
+        "name": item.get("name"),
+        "price": _parse_price(offers.get("price") or offers.get("lowPrice")),
+        "currency": offers.get("priceCurrency"),
+        "available": "InStock" in str(offers.get("availability", "InStock")),
+        "image": image,
+        "size": _parse_size(item.get("name"), item.get("description")),
+    }
+
+def _from_shopify(item: Dict, url: str) -> Dict:
+    variants = item.get("variants") or [{}]
+    images = item.get("images") or []
+    image = images[0] if images else item.get("image")
+    if isinstance(image, dict):
+        image = image.get("src")
+    return {
+        "handle": item.get("handle") or _handle_from_url(url),
+        "url": url,
+        "name": item.get("title"),
+        "price": _parse_price(variants[0].get("price")),
+        "currency": None,
+        "available": any(v.get("available", True) for v in variants),
+        "image": image,
+        "size": _parse_size(variants[0].get("title"), item.get("title")),
+    }
+
+def _handle_from_url(url: str) -> Optional[str]:
+    match = _PRODUCT_LINK_RE.search(url or "")
+    return match.group(1) if match else None
+
+def parse_product_page(text: str, url: str) -> Optional[Dict]:
+    """Produit d'une page produit (HTML ou JSON), ou None si la page n'en décrit pas ou est illisible"""
+    try:
+        return _parse_product_page(text, url)
+    except (ValueError, AttributeError, LookupError, TypeError) as e:
+        # JSON invalide ou de forme inattendue (liste, champs d'un autre type...): page ignorée
+        print(f"⚠️  {url}: page produit illisible, ignorée ({type(e).__name__}: {e})")
+        return None
+
+def _parse_product_page(text: str, url: str) -> Optional[Dict]:
+    stripped = text.lstrip()
+    if stripped.startswith(("{", "[")):
+        data = json.loads(stripped)
+        if isinstance(data.get("product"), dict):
+            return _from_shopify(data["product"], url)
+        return None
+
+    parser = _PageParser()
+    parser.feed(text)
+    products = _json_ld_products(parser.json_ld)
+    if products:
+        return _from_json_ld(products[0], url)
+    price = parser.meta.get("product:price:amount") or parser.meta.get("og:price:amount")
+    if price and parser.meta.get("og:title"):
+        return {
+            "handle": _handle_from_url(url),
+            "url": url,
+            "name": parser.meta["og:title"],
+            "price": _parse_price(price),
+            "currency": parser.meta.get("product:price:currency"),
+            "available": True,
+            "image": parser.meta.get("og:image"),
+            "size": _parse_size(parser.meta["og:title"], parser.meta.get("og:description")),
+        }
+    return None
+
+def parse_collection_page(text: str, base_url: str) -> List[str]:
+    """URLs des produits listés par une page collection, sans doublons, dans l'ordre (aucune si illisible)"""
+    stripped = text.lstrip()
+    if stripped.startswith(("{", "[")):
+        try:
+            handles = [p.get("handle") for p in json.loads(stripped).get("products", []) if p.get("handle")]
+        except (ValueError, AttributeError, TypeError) as e:
+            print(f"⚠️  {base_url}: page collection illisible, ignorée ({type(e).__name__}: {e})")
+            return []
+    else:
+        parser = _PageParser()
+        parser.feed(text)
+        handles = [_handle_from_url(link) for link in parser.links]
+    urls = []
+    for handle in handles:
+        url = urllib.parse.urljoin(base_url, f"/products/{handle}") if handle else None
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+# --- Synchronisation ---
+
+def scrape_store(fetcher, store_url: str = STORE_URL, collection_paths: List[str] = COLLECTION_PATHS,
+                 workers: int = DEFAULT_WORKERS) -> List[Dict]:
+    """
+    Produits de la boutique: pages collections puis pages produits, lues et analysées
+    par au plus `workers` threads. L'ordre suit celui des collections.
+    """
+    collection_urls = [urllib.parse.urljoin(store_url, path) for path in collection_paths]
+
+    def load_collection(url):
+        text = fetcher.fetch(url)
+        return [] if text is None else [(url, product_url) for product_url in parse_collection_page(text, url)]
+
+    def load_product(entry):
+        collection_url, url = entry
+        text = fetcher.fetch(url)
+        product = parse_product_page(text, url) if text is not None else None
+        if product:
+            product["collection"] = collection_url.rstrip("/").rsplit("/", 1)[-1]
+        return product
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        entries, seen = [], set()
+        for listing in pool.map(load_collection, collection_urls):
+            for collection_url, url in listing:
+                if url not in seen:
+                    seen.add(url)
+                    entries.append((collection_url, url))
+        return [product for product in pool.map(load_product, entries) if product]
+
+def _matching_view(product_id: str, name: str, size, product_type: Optional[str]) -> Dict:
+    # Même vue des deux côtés: les pages de la boutique n'ont ni nom arabe ni collection du catalogue
+    return {"id": product_id, "name": {"en": name or ""}, "size": size, "type": product_type}
+
+def price_updates(catalog: Dict, scraped: List[Dict], min_confidence: float = MIN_CONFIDENCE):
+    """
+    Rapproche les produits relevés sur la boutique de ceux du catalogue, un pour un
+    - chaque produit du catalogue propose son meilleur candidat de la boutique (même type:
+      celui de la boutique est déduit du titre, voir infer_type)
+    - un produit de la boutique va au produit du catalogue qui l'a le mieux noté
+    - égalité (deux candidats pour un produit, ou deux produits pour un candidat): aucune
+      correspondance, un prix relevé ne s'applique jamais à plusieurs produits
+    Retourne (changements de prix {id: (ancien, nouveau)}, rapport [Match] dans l'ordre du catalogue)
+    """
+    types = {product["type"] for product in catalog["products"] if product.get("type")}
+    priced = [p for p in scraped if p.get("price") is not None]
+    matcher = ProductMatcher([_matching_view(p["handle"] or p["url"], p["name"], p["size"], infer_type(p["name"], types))
+                              for p in priced], min_confidence=min_confidence)
+    prices = {p["handle"] or p["url"]: p["price"] for p in priced}
+
+    proposals = []
+    for product in catalog["products"]:
+        view = _matching_view(product["id"], (product.get("name") or {}).get("en", ""), product.get("size"),
+                              product.get("type"))
+        scored = matcher.candidates(view)
+        best = scored[0] if scored else (0.0, None)
+        tied = len(scored) > 1 and scored[1][0] == best[0]
+        if best[1] is not None and best[0] >= min_confidence and not tied:
+            proposals.append(Match(product["id"], best[1], best[0], "auto"))
+        else:
+            proposals.append(Match(product["id"], None, best[0], "aucun", best[1]))
+
+    claims = defaultdict(list)  # id boutique -> confiances des produits du catalogue qui le proposent
+    for match in proposals:
+        if match.backup_id is not None:
+            claims[match.backup_id].append(match.confidence)
+
+    changes, report = {}, []
+    for product, match in zip(catalog["products"], proposals):
+        if match.backup_id is not None:
+            confidences = claims[match.backup_id]
+            if match.confidence < max(confidences) or confidences.count(match.confidence) > 1:
+                # Mieux noté par un autre produit du catalogue, ou à égalité
+                match = Match(match.product_id, None, match.confidence, "aucun", match.backup_id)
+            elif prices[match.backup_id] != product.get("price"):
+                changes[product["id"]] = (product.get("price"), prices[match.backup_id])
+        report.append(match)
+    return changes, report
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (text or "").lower()).strip("-")
+
+def _catalog_collection(store_collection: Optional[str], name: str, collection_ids: List[str]) -> Optional[str]:
+    """
+    Collection du catalogue d'un produit de la boutique: même id que la collection de la
+    boutique, ou sa seule déclinaison dont tous les mots sont dans le titre
+    ('mixoil' + 'MixOil Rosemary + Almond Serum' -> 'mixoil-rosemary-almond')
+    """
+    if not store_collection:
+        return None
+    if store_collection in collection_ids:
+        return store_collection
+    title = set(words(name))
+    found = [cid for cid in collection_ids if cid.startswith(store_collection + "-")
+             and set(cid[len(store_collection) + 1:].split("-")) <= title]
+    return found[0] if len(found) == 1 else None
+
+def _catalog_image(url: Optional[str], images_dir: Optional[str]) -> Optional[str]:
+    """'https://.../cdn/shop/files/x.webp?v=1' -> 'images/x.webp', si ce fichier est dans `images_dir`"""
+    name = os.path.basename(urllib.parse.urlsplit(url or "").path)
+    if name and images_dir and os.path.isfile(os.path.join(images_dir, name)):
+        return IMAGE_PREFIX + name
+    return None
+
+def new_products(catalog: Dict, scraped: List[Dict], report: List[Match], fetcher,
+                 store_url: str = STORE_URL, images_dir: Optional[str] = DEFAULT_IMAGES_DIR):
+    """
+    Produits de la boutique absents du rapport de price_updates, au format du catalogue
+    - id: handle de la boutique; nom anglais: titre de la page, nom arabe: titre de la page /ar/
+    - type déduit du titre (infer_type, types du catalogue), taille et prix de la page
+    - collection: voir _catalog_collection (absente si incertaine, requise seulement à la publication)
+    - image: images/<fichier de la boutique> si ce fichier est déjà dans `images_dir`
+    Chaque produit est validé avec les collections du catalogue (catalog_schema, étape "source").
+    Retourne (produits valides, écartés [(produit de la boutique, raison)])
+    """
+    types = sorted({product["type"] for product in catalog["products"] if product.get("type")})
+    collection_ids = [collection.get("id") for collection in catalog.get("collections", [])]
+    matched = {match.backup_id for match in report if match.backup_id}
+    taken = {product.get("id") for product in catalog["products"]}
+
+    products, skipped = [], []
+    for record in scraped:
+        if (record["handle"] or record["url"]) in matched:
+            continue
+        product_id = _slug(record["handle"])
+        product_type = infer_type(record["name"], types)
+        if not product_id or product_id in taken:
+            skipped.append((record, f"id '{product_id}' vide ou déjà pris"))
+            continue
+        if product_type is None:
+            skipped.append((record, "type introuvable dans le titre"))
+            continue
+        if record.get("price") is None:
+            skipped.append((record, "prix absent"))
+            continue
+        arabic_url = urllib.parse.urljoin(store_url, f"{ARABIC_PREFIX}products/{record['handle']}")
+        text = fetcher.fetch(arabic_url)
+        arabic = parse_product_page(text, arabic_url) if text is not None else None
+        if not arabic or not arabic.get("name"):
+            skipped.append((record, f"nom arabe introuvable ({arabic_url})"))
+            continue
+
+        product = {"id": product_id, "name": {"ar": arabic["name"], "en": record["name"]},
+                   "type": product_type, "price": record["price"]}
+        collection = _catalog_collection(record.get("collection"), record["name"], collection_ids)
+        if collection:
+            product["collection"] = collection
+        if record.get("size"):
+            product["size"] = record["size"]
+        image = _catalog_image(record.get("image"), images_dir)
+        if image:
+            product["image"] = image
+
+        errors = validate_catalog({"collections": catalog.get("collections", []), "products": [product]},
+                                  images_dir, stage="source")[0]
+        if errors:
+            skipped.append((record, "; ".join(errors)))
+            continue
+        taken.add(product_id)
+        products.append(product)
+    return products, skipped
+
+def main():
+    parser = argparse.ArgumentParser(description="Met à jour les prix et ajoute les nouveaux produits de la boutique")
+    origin = parser.add_mutually_exclusive_group(required=True)
+    origin.add_argument('--snapshots', metavar='DOSSIER', help="Rejouer les pages sauvegardées (hors ligne)")
+    origin.add_argument('--live', action='store_true', help="Télécharger les pages depuis la boutique")
+    parser.add_argument('--save-snapshots', metavar='DOSSIER', help="Avec --live: sauvegarder les pages lues")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="Source de catalogue à mettre à jour")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Pages lues en parallèle")
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR,
+                        help="Images du widget (image des nouveaux produits)")
+    parser.add_argument('--apply', action='store_true', help="Écrire les prix et nouveaux produits dans la source")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    fetcher = SnapshotFetcher(args.snapshots) if args.snapshots else HttpFetcher(save_dir=args.save_snapshots)
+
+    print("🌐 Lecture de la boutique...")
+    start = time.perf_counter()
+    scraped = scrape_store(fetcher, workers=args.workers)
+    print(f"✅ {len(scraped)} produits relevés en {time.perf_counter() - start:.2f}s\n")
+
+    catalog = load_catalog_source(args.source)
+    changes, report = price_updates(catalog, scraped)
+
+    for product_id, (old, new) in changes.items():
+        print(f"💰 {product_id}: {old} → {new} LE")
+    unmatched = [match for match in report if match.backup_id is None]
+    if unmatched:
+        print(f"\n⚠️  {len(unmatched)} produits du catalogue introuvables sur la boutique:")
+        for match in unmatched:
+            hint = f" (candidat écarté: {match.best_candidate}, {match.confidence})" if match.best_candidate else ""
+            print(f"   - {match.product_id}{hint}")
+    products, skipped = new_products(catalog, scraped, report, fetcher, images_dir=args.images_dir)
+    if products:
+        print(f"\n🆕 {len(products)} produits de la boutique absents du catalogue:")
+        for product in products:
+            print(f"   - {product['id']} ({product['type']}, {product.get('collection', 'sans collection')}, "
+                  f"{product['price']} LE)")
+    if skipped:
+        print(f"\n⚠️  {len(skipped)} produits de la boutique non importés:")
+        for record, reason in skipped:
+            print(f"   - {record['name']} {record['url']}: {reason}")
+
+    if not changes and not products:
+        print("\n✨ Catalogue à jour")
+    elif args.apply:
+        if changes:
+            updated = update_products_csv(args.source, {pid: {"price": new} for pid, (_, new) in changes.items()})
+            print(f"\n✅ {updated} prix mis à jour dans {args.source}")
+        if products:
+            added = append_products_csv(args.source, products)
+            print(f"✅ {added} produits ajoutés à {args.source}")
+    else:
+        print(f"\nℹ️  {len(changes)} prix à mettre à jour, {len(products)} produits à ajouter "
+              "(relancer avec --apply pour les écrire)")
+
+if __name__ == "__main__":
+    main()
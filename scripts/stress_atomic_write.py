@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test de charge des écritures de catalogue avec lecteurs concurrents
+Un écrivain réécrit en boucle un catalogue synthétique pendant que plusieurs processus
+le relisent (json.load). Compare l'écriture directe historique (open(..., 'w')) à
+l'écriture atomique d'atomic_io, et mesure les relectures évitées grâce aux générations.
+
+Usage: python scripts/stress_atomic_write.py [--products 2000] [--writes 20] [--readers 4]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from atomic_io import GenerationReader
+from benchmark_catalog_stream import generate_catalog
+from catalog_io import CatalogStream, write_catalog_stream
+
+def naive_write(path, sections, products):
+    """Écriture historique des scripts: le fichier est tronqué puis réécrit sur place"""
+    catalog = dict(sections)
+    catalog["products"] = products
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+
+def reader(path, stop, results, use_generations):
+    """Relit le catalogue en boucle; compte lectures, échecs et relectures évitées"""
+    reads = failures = skipped = 0
+    cached = GenerationReader(path)
+    while not stop.is_set():
+        try:
+            if use_generations:
+                if not cached.changed():
+                    skipped += 1
+                    time.sleep(0.001)
+                    continue
+                cached.load()
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    json.load(f)
+            reads += 1
+        except (ValueError, OSError):
+            failures += 1
+    results.put((reads, failures, skipped))
+
+def run(mode, path, versions, writes, readers):
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    use_generations = mode == "atomique+génération"
+    processes = [multiprocessing.Process(target=reader, args=(path, stop, results, use_generations))
+                 for _ in range(readers)]
+    for process in processes:
+        process.start()
+    time.sleep(0.2)
+
+    start = time.perf_counter()
+    for i in range(writes):
+        sections, products = versions[i % len(versions)]
+        if mode == "direct":
+            naive_write(path, sections, products)
+        else:
+            write_catalog_stream(path, sections, products, generation=use_generations)
+        # Laisse les lecteurs relire entre deux écritures
+        time.sleep(0.02)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    reads, failures, skipped = (sum(column) for column in zip(*totals))
+    return reads, failures, skipped, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Écritures de catalogue sous lectures concurrentes")
+    parser.add_argument("--products", type=int, default=2000, help="Produits du catalogue synthétique")
+    parser.add_argument("--writes", type=int, default=20, help="Nombre de réécritures")
+    parser.add_argument("--readers", type=int, default=4, help="Processus lecteurs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.json")
+        generate_catalog(source, args.products)
+        with CatalogStream(source) as catalog:
+            products = list(catalog)
+            sections = catalog.sections
+        # Deux versions qui diffèrent (prix), pour que chaque écriture change le contenu
+        changed = [dict(p, price=p.get("price", 0) + 1) for p in products]
+        versions = [(sections, products), (sections, changed)]
+        size_mb = os.path.getsize(source) / 1e6
+
+        print(f"🚀 {args.writes} écritures d'un catalogue de {size_mb:.1f} Mo, {args.readers} lecteurs\n")
+        print(f"{'mode':<20} {'lectures':>9} {'échecs':>8} {'évitées':>9} {'écriture ms':>12}")
+        for mode in ("direct", "atomique", "atomique+génération"):
+            path = os.path.join(tmp, f"products_{mode}.json")
+            naive_write(path, *versions[0])
+            reads, failures, skipped, elapsed = run(mode, path, versions, args.writes, args.readers)
+            write_ms = (elapsed / args.writes - 0.02) * 1000
+            print(f"{mode:<20} {reads:>9} {failures:>8} {skipped:>9} {write_ms:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests hors ligne de store_sync.py: rejoue les pages de fixtures/store_snapshots
+
+Usage: python -m pytest scripts/tests   (ou: python scripts/tests/test_store_sync.py)
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from catalog_schema import validate_catalog  # noqa: E402
+from catalog_source import append_products_csv, load_catalog_source  # noqa: E402
+from store_sync import (DEFAULT_SOURCE, SnapshotFetcher, _catalog_collection, infer_type,  # noqa: E402
+                        new_products, parse_product_page, price_updates, scrape_store)
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "store_snapshots")
+
+def _scrape():
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        scraped = scrape_store(SnapshotFetcher(SNAPSHOT_DIR), workers=4)
+    return scraped, output.getvalue()
+
+def _catalog_product(product_id, name, product_type, price, size="250ml"):
+    return {"id": product_id, "name": {"en": name}, "type": product_type, "price": price, "size": size}
+
+def _store_product(handle, name, price, size="250ml"):
+    return {"handle": handle, "url": f"https://innaturalstores.com/products/{handle}",
+            "name": name, "price": price, "size": size}
+
+class ScrapeSnapshotsTest(unittest.TestCase):
+    def test_pages_are_parsed_in_collection_order(self):
+        scraped, _ = _scrape()
+        self.assertEqual([(p["handle"], p["price"], p["collection"]) for p in scraped], [
+            ("mixoil-rosemary-almond-shampoo", 999, "mixoil"),
+            ("mixoil-rosemary-almond-hair-mask", 290, "mixoil"),
+            ("cocoshea-serum", 240, "cocoshea"),
+            ("cocoshea-hair-oil", 260, "cocoshea"),
+        ])
+        self.assertEqual(scraped[0]["size"], "250ml")
+        self.assertEqual(scraped[2]["image"], "https://innaturalstores.com/cdn/shop/files/cocoshea-serum.webp")
+
+    def test_unreadable_pages_are_skipped_with_a_warning(self):
+        _, output = _scrape()
+        self.assertIn("mixoil-broken-page: page produit illisible", output)
+        self.assertIn("mixoil-list-page: page produit illisible", output)
+
+    def test_malformed_json_never_raises(self):
+        url = "https://innaturalstores.com/products/x"
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in ('{"product": ', '[1, 2]', '{"product": {"variants": "250ml"}}',
+                         '<script type="application/ld+json">"Product"</script>'):
+                self.assertIsNone(parse_product_page(text, url), text)
+
+class PriceUpdatesTest(unittest.TestCase):
+    def test_store_price_applies_to_a_single_catalog_product(self):
+        # Seul le shampoing est relevé: le conditionneur, le leave-in, le masque de la même gamme gardent leur prix
+        catalog = load_catalog_source(DEFAULT_SOURCE)
+        scraped, _ = _scrape()
+        changes, report = price_updates(catalog, scraped)
+        self.assertEqual(changes, {"mixoil-rosemary-shampoo": (180, 999), "cocoshea-serum": (220, 240)})
+        matched = {m.product_id: m.backup_id for m in report if m.backup_id}
+        self.assertEqual(matched, {
+            "mixoil-rosemary-shampoo": "mixoil-rosemary-almond-shampoo",
+            "mixoil-rosemary-mask": "mixoil-rosemary-almond-hair-mask",
+            "cocoshea-serum": "cocoshea-serum",
+        })
+        self.assertEqual(len(report), len(catalog["products"]))
+
+    def test_store_product_goes_to_best_scoring_catalog_product(self):
+        catalog = {"products": [
+            _catalog_product("rosemary-shampoo", "Rosemary Almond Shampoo", "shampoo", 180),
+            _catalog_product("rosemary-shampoo-xl", "Rosemary Almond Shampoo XL", "shampoo", 300, "500ml"),
+        ]}
+        changes, report = price_updates(catalog, [_store_product("rosemary", "Rosemary Almond Shampoo", 200)])
+        self.assertEqual(changes, {"rosemary-shampoo": (180, 200)})
+        self.assertEqual(report[1].backup_id, None)
+        self.assertEqual(report[1].best_candidate, "rosemary")
+
+    def test_tied_catalog_products_are_rejected(self):
+        catalog = {"products": [
+            _catalog_product("shampoo-a", "Rosemary Shampoo", "shampoo", 180),
+            _catalog_product("shampoo-b", "Rosemary Shampoo", "shampoo", 190),
+        ]}
+        changes, report = price_updates(catalog, [_store_product("rosemary", "Rosemary Shampoo", 200)])
+        self.assertEqual(changes, {})
+        self.assertEqual([m.backup_id for m in report], [None, None])
+
+    def test_tied_store_products_are_rejected(self):
+        catalog = {"products": [_catalog_product("shampoo", "Rosemary Shampoo", "shampoo", 180)]}
+        scraped = [_store_product("rosemary-1", "Rosemary Shampoo", 200),
+                   _store_product("rosemary-2", "Rosemary Shampoo", 210)]
+        changes, report = price_updates(catalog, scraped)
+        self.assertEqual(changes, {})
+        self.assertIsNone(report[0].backup_id)
+
+    def test_type_inferred_from_store_title(self):
+        types = ["shampoo", "mask", "leave-in", "cream", "body-cream", "oil"]
+        self.assertEqual(infer_type("MixOil Rosemary + Almond Hair Mask", types), "mask")
+        self.assertEqual(infer_type("MixOil Castor + Coconut + Jojoba Leave-In", types), "leave-in")
+        self.assertEqual(infer_type("MixOil Almond Body Cream 250ml", types), "body-cream")
+        self.assertEqual(infer_type("MixOil Rosemary Hair Oil Shampoo", types), "shampoo")
+        self.assertIsNone(infer_type("Gift Card", types))
+
+class NewProductsTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = load_catalog_source(DEFAULT_SOURCE)
+        self.scraped, _ = _scrape()
+        self.report = price_updates(self.catalog, self.scraped)[1]
+        self.fetcher = SnapshotFetcher(SNAPSHOT_DIR)
+
+    def test_unmatched_store_product_is_converted_to_a_source_product(self):
+        with tempfile.TemporaryDirectory() as images_dir:
+            open(os.path.join(images_dir, "cocoshea-hair-oil.webp"), "wb").close()
+            products, skipped = new_products(self.catalog, self.scraped, self.report, self.fetcher,
+                                             images_dir=images_dir)
+            self.assertEqual(products, [{
+                "id": "cocoshea-hair-oil",
+                "name": {"ar": "زيت الشعر كوكوشيا", "en": "CocoShea Hair Oil"},
+                "type": "oil", "price": 260, "collection": "cocoshea", "size": "100ml",
+                "image": "images/cocoshea-hair-oil.webp",
+            }])
+            self.assertEqual(skipped, [])
+            catalog = dict(self.catalog, products=self.catalog["products"] + products)
+            self.assertEqual(validate_catalog(catalog, images_dir, stage="source")[0], [])
+
+    def test_image_missing_from_the_widget_is_left_out(self):
+        with tempfile.TemporaryDirectory() as images_dir:
+            products, _ = new_products(self.catalog, self.scraped, self.report, self.fetcher,
+                                       images_dir=images_dir)
+        self.assertNotIn("image", products[0])
+
+    def test_products_that_cannot_be_imported_are_skipped(self):
+        scraped = [
+            dict(_store_product("gift-card", "Gift Card", 500), collection="cocoshea"),
+            dict(_store_product("cocoshea-serum", "CocoShea Serum Duo", 400), collection="cocoshea"),
+            dict(_store_product("cocoshea-hair-oil", "CocoShea Hair Oil", None), collection="cocoshea"),
+            dict(_store_product("cocoshea-body-oil", "CocoShea Body Oil", 300), collection="cocoshea"),
+        ]
+        products, skipped = new_products(self.catalog, scraped, [], self.fetcher, images_dir=None)
+        self.assertEqual(products, [])
+        reasons = {record["handle"]: reason for record, reason in skipped}
+        self.assertEqual(reasons["gift-card"], "type introuvable dans le titre")
+        self.assertIn("déjà pris", reasons["cocoshea-serum"])
+        self.assertEqual(reasons["cocoshea-hair-oil"], "prix absent")
+        self.assertIn("nom arabe introuvable", reasons["cocoshea-body-oil"])
+
+    def test_collection_variant_is_chosen_from_the_title(self):
+        ids = ["mixoil-rosemary-almond", "mixoil-castor-coconut-jojoba", "cocoshea"]
+        self.assertEqual(_catalog_collection("mixoil", "MixOil Rosemary + Almond Serum", ids), "mixoil-rosemary-almond")
+        self.assertEqual(_catalog_collection("cocoshea", "CocoShea Hair Oil", ids), "cocoshea")
+        self.assertIsNone(_catalog_collection("mixoil", "MixOil Hair Oil", ids))
+
+    def test_imported_products_are_appended_to_the_source(self):
+        products, _ = new_products(self.catalog, self.scraped, self.report, self.fetcher, images_dir=None)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = shutil.copytree(DEFAULT_SOURCE, os.path.join(tmp, "source"))
+            self.assertEqual(append_products_csv(source, products), 1)
+            reloaded = load_catalog_source(source)
+        self.assertEqual(reloaded["products"][:-1], self.catalog["products"])
+        self.assertEqual(reloaded["products"][-1], products[0])
+
+if __name__ == "__main__":
+    unittest.main()
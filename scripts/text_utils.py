@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Normalisation de texte bilingue (arabe / anglais) partagée par l'appariement des
+produits (product_matcher.py), la compilation de la base de connaissances
+(compile_knowledge_base.py) et celle des synonymes (compile_synonyms.py).
+
+La même normalisation est réimplémentée côté backend (backend/utils/textUtils.js):
+toute modification ici doit y être reportée, et les fichiers précalculés reconstruits.
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List
+
+# Variantes d'alef (أ إ آ), ta marbuta (ة), alef maqsura (ى) et tatweel (ـ)
+_ARABIC_FOLD = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ة": "ه", "ى": "ي", "ـ": None})
+_WORD_RE = re.compile(r"\w+")
+
+# Racinisation légère, pour que "بالشعر" / "الشعر" ou "falling" / "fall" se rejoignent:
+# article et prépositions arabes collés au mot, puis une terminaison (pluriel, ta marbuta
+# déjà ramenée à ه, pronom possessif, -ing / -ed / -s / -y anglais)
+PREFIXES = ("وال", "بال", "فال", "كال", "لل", "ال")
+SUFFIXES = ("ing", "ed", "es", "s", "y", "ها", "ات", "ه", "ي")
+# Longueur minimale du mot restant après retrait d'un préfixe ou d'une terminaison
+MIN_STEM_LENGTH = 3
+
+def normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni diacritiques arabes, variantes d'alef/ta marbuta unifiées"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.lower().translate(_ARABIC_FOLD)
+
+def words(text: str) -> List[str]:
+    """Mots normalisés ('_' sépare les mots, comme '-' et les espaces)"""
+    return _WORD_RE.findall(normalize_text(text).replace("_", " "))
+
+def light_stem(word: str, prefixes: Iterable[str] = PREFIXES, suffixes: Iterable[str] = SUFFIXES) -> str:
+    """'بالشعر' -> 'شعر', 'ناشفة' -> 'ناشف', 'falling' -> 'fall' (au plus un préfixe et une terminaison)"""
+    for prefix in prefixes:
+        if word.startswith(prefix) and len(word) - len(prefix) >= MIN_STEM_LENGTH:
+            word = word[len(prefix):]
+            break
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
@@ -4,17 +4,481 @@ Serveur web simple pour le chatbot INnatural
 Lance un serveur HTTP Python et ouvre le navigateur
 """
 
+import argparse
+import email.utils
+import gzip
+import hashlib
+import http.client
 import http.server
+import queue
+import selectors
+import shutil
+import socket
 import socketserver
+import threading
+import time
 import webbrowser
 import os
 import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    import brotli
+except ImportError:  # optionnel: pip install brotli
+    brotli = None
 
 PORT = 3000
 HANDLER = http.server.SimpleHTTPRequestHandler
 
+# Mode multi-thread: taille du pool, délai d'inactivité keep-alive (connexion sans requête,
+# surveillée hors du pool) et délai de lecture d'une requête commencée (secondes)
+DEFAULT_WORKERS = 16
+KEEPALIVE_TIMEOUT = 15
+REQUEST_TIMEOUT = 5
+
+# Cache mémoire des fichiers statiques
+DEFAULT_CACHE_MB = 64
+PRELOAD_PATHS = ['chatbot-web.html', 'widget', 'config']
+
+# Les images sources changent rarement: cache navigateur d'un jour (images/built/: voir plus bas).
+# Le reste (HTML, JS, CSS, JSON) est revalidé à chaque visite via l'ETag (304).
+CACHE_CONTROL = {
+    '.webp': 'public, max-age=86400',
+    '.png': 'public, max-age=86400',
+    '.jpg': 'public, max-age=86400',
+    '.svg': 'public, max-age=86400',
+}
+DEFAULT_CACHE_CONTROL = 'no-cache'
+# Images adressées par contenu (scripts/build_images.py): une image modifiée change d'URL,
+# le navigateur peut donc les garder indéfiniment (même règle que backend/server.js)
+BUILT_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'widget', 'images', 'built') + os.sep
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+def cache_control_for(filepath, ext):
+    """En-tête Cache-Control d'un fichier servi"""
+    if os.path.abspath(filepath).startswith(BUILT_IMAGES_DIR):
+        return IMMUTABLE_CACHE_CONTROL
+    return CACHE_CONTROL.get(ext, DEFAULT_CACHE_CONTROL)
+
+# Reverse-proxy /api/* vers le backend Node (--proxy)
+BACKEND_URL = 'http://localhost:5001'
+PROXY_PREFIX = '/api/'
+PROXY_POOL_SIZE = 8
+PROXY_TIMEOUT = 60
+PROXY_CHUNK_SIZE = 16 * 1024
+# En-têtes propres à une connexion, jamais retransmis (RFC 9110 §7.6.1)
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'host',
+}
+
+# Compression: uniquement les formats texte (webp/png/jpg sont déjà compressés)
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.css', '.json', '.svg', '.txt', '.md'}
+MIN_COMPRESS_BYTES = 1024
+
+# Encodages proposés, par ordre de préférence du serveur
+ENCODERS = OrderedDict()
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=11)
+# mtime=0: sortie déterministe, donc ETag stable d'un démarrage à l'autre
+ENCODERS['gzip'] = lambda body: gzip.compress(body, compresslevel=9, mtime=0)
+
+class CachedAsset:
+    """Contenu d'un fichier statique, ses variantes compressées et ses validateurs HTTP"""
+    __slots__ = ('body', 'mtime_ns', 'digest', 'etag', 'last_modified', 'cache_control',
+                 'compressible', 'variants')
+
+    def __init__(self, body, mtime_ns, filepath):
+        ext = os.path.splitext(filepath)[1].lower()
+        self.body = body
+        self.mtime_ns = mtime_ns
+        # ETag fort: dépend uniquement du contenu
+        self.digest = hashlib.sha1(body).hexdigest()[:20]
+        self.etag = '"%s"' % self.digest
+        self.last_modified = email.utils.formatdate(mtime_ns / 1e9, usegmt=True)
+        self.cache_control = cache_control_for(filepath, ext)
+        self.compressible = ext in COMPRESSIBLE_EXTENSIONS and len(body) >= MIN_COMPRESS_BYTES
+        # encodage -> (corps compressé, ETag de la variante)
+        self.variants = {}
+
+    @property
+    def nbytes(self):
+        return len(self.body) + sum(len(body) for body, _ in self.variants.values())
+
+class FileAsset:
+    """Validateurs HTTP d'un fichier servi directement depuis le disque (hors cache)"""
+    __slots__ = ('size', 'mtime_ns', 'etag', 'last_modified', 'cache_control', 'compressible')
+
+    def __init__(self, st, filepath):
+        ext = os.path.splitext(filepath)[1].lower()
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        # Sans lire le contenu: ETag dérivé du mtime et de la taille
+        self.etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+        self.last_modified = email.utils.formatdate(st.st_mtime_ns / 1e9, usegmt=True)
+        self.cache_control = cache_control_for(filepath, ext)
+        self.compressible = False
+
+class FileRegion:
+    """Plage [offset, offset + length) à envoyer, depuis un buffer mémoire ou un fichier ouvert"""
+    __slots__ = ('data', 'offset', 'length')
+
+    def __init__(self, data, offset, length):
+        self.data = data
+        self.offset = offset
+        self.length = length
+
+    def close(self):
+        close_source(self.data)
+
+def close_source(data):
+    """Ferme la source si c'est un fichier (les buffers du cache restent en mémoire)"""
+    if not isinstance(data, bytes):
+        data.close()
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+class StaticAssetCache:
+    """
+    Cache LRU en mémoire des fichiers servis, borné en octets
+    Une entrée est relue dès que le mtime ou la taille du fichier change
+    """
+
+    def __init__(self, max_bytes, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 4
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, filepath):
+        """Retourne le CachedAsset du fichier, ou None s'il n'est pas cachable"""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+
+        with self.lock:
+            asset = self.entries.get(filepath)
+            if asset is not None and asset.mtime_ns == st.st_mtime_ns and len(asset.body) == st.st_size:
+                self.entries.move_to_end(filepath)
+                self.hits += 1
+                return asset
+            self.misses += 1
+
+        if st.st_size > self.max_entry_bytes:
+            return None
+        return self.load(filepath)
+
+    def load(self, filepath):
+        try:
+            with open(filepath, 'rb') as f:
+                # mtime relu sur le descripteur ouvert pour rester cohérent avec le contenu
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                body = f.read()
+        except OSError:
+            return None
+
+        asset = CachedAsset(body, mtime_ns, filepath)
+        with self.lock:
+            previous = self.entries.pop(filepath, None)
+            if previous is not None:
+                self.total_bytes -= previous.nbytes
+            self.entries[filepath] = asset
+            self.total_bytes += len(body)
+            self.evict()
+        return asset
+
+    def variant(self, filepath, asset, encoding):
+        """Retourne (corps, etag) compressés, construits au premier appel puis gardés en cache"""
+        variant = asset.variants.get(encoding)
+        if variant is not None:
+            return variant
+
+        variant = (ENCODERS[encoding](asset.body), '"%s-%s"' % (asset.digest, encoding))
+        with self.lock:
+            if encoding not in asset.variants:
+                asset.variants[encoding] = variant
+                if self.entries.get(filepath) is asset:
+                    self.total_bytes += len(variant[0])
+                    self.evict()
+        return variant
+
+    def evict(self):
+        # Appelé avec self.lock tenu
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+    def preload(self, paths):
+        """Charge à l'avance les fichiers des chemins donnés (fichiers ou dossiers)"""
+        # Le préchargement ne compte ni en hits ni en misses
+        hits, misses = self.hits, self.misses
+        for path in paths:
+            if os.path.isdir(path):
+                for dirpath, _, filenames in os.walk(path):
+                    for filename in sorted(filenames):
+                        self.preload_file(os.path.abspath(os.path.join(dirpath, filename)))
+            elif os.path.isfile(path):
+                self.preload_file(os.path.abspath(path))
+        self.hits, self.misses = hits, misses
+        return len(self.entries)
+
+    def preload_file(self, filepath):
+        asset = self.get(filepath)
+        if asset is not None and asset.compressible:
+            for encoding in ENCODERS:
+                self.variant(filepath, asset, encoding)
+
+# Métriques Prometheus: mêmes noms et labels que le backend Node (services/metrics.js)
+# pour qu'un seul dashboard couvre les deux processus (distingués par le label job)
+METRICS_PREFIX = 'innatural_chatbot_'
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Inclut les seuils du backend (0.1 ... 10 s), affinés vers le bas pour les fichiers statiques
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10)
+# Routes backend dont le dernier segment est un identifiant
+PARAM_ROUTES = (
+    '/api/qualification/recommendations/',
+    '/api/sessions/',
+    '/api/analytics/events/',
+)
+
+class Counter:
+    """Compteur Prometheus avec labels"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = METRICS_PREFIX + name
+        self.help = help_text
+        self.label_names = label_names
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set_total(self, *labels, value):
+        """Recopie un total tenu ailleurs (ex: compteurs du StaticAssetCache)"""
+        with self.lock:
+            self.values[labels] = value
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        for labels, value in items:
+            yield self.name, dict(zip(self.label_names, labels)), value
+
+class Gauge(Counter):
+    """Jauge Prometheus: valeur qui monte et descend"""
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    set = Counter.set_total
+
+class Histogram(Counter):
+    """Histogramme Prometheus à seuils cumulés"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = buckets
+
+    def observe(self, *labels, value):
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                # [compteurs par seuil..., somme, total]
+                state = self.values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self.lock:
+            items = sorted((labels, list(state)) for labels, state in self.values.items())
+        for labels, state in items:
+            base = dict(zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, state):
+                yield self.name + '_bucket', {**base, 'le': format_metric_value(bound)}, count
+            yield self.name + '_bucket', {**base, 'le': '+Inf'}, state[-1]
+            yield self.name + '_sum', base, state[-2]
+            yield self.name + '_count', base, state[-1]
+
+def format_metric_value(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def route_label(path, status):
+    """Route à cardinalité bornée: /api/<route>, dossier statique/* ou fichier racine"""
+    if status == HTTPStatus.NOT_FOUND:
+        return 'not_found'
+    path = path.split('?', 1)[0]
+    if path.startswith(PROXY_PREFIX):
+        for prefix in PARAM_ROUTES:
+            if path.startswith(prefix):
+                return prefix + ':id'
+        return path
+    directory, _, _ = path.rpartition('/')
+    return directory + '/*' if directory else path
+
+class ServerMetrics:
+    """Métriques du serveur web exposées sur /metrics"""
+
+    def __init__(self, asset_cache=None):
+        self.asset_cache = asset_cache
+        labels = ('method', 'route', 'status_code')
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Duration of HTTP requests in seconds', labels)
+        self.requests_total = Counter('http_requests_total', 'Total number of HTTP requests', labels)
+        self.response_bytes = Counter(
+            'http_response_bytes_total', 'Bytes sent to clients, headers included', ('route',))
+        self.in_flight = Gauge('http_requests_in_flight', 'HTTP requests currently being served')
+        self.proxy_first_byte = Histogram(
+            'proxy_backend_first_byte_seconds', 'Time until the backend answered a proxied request',
+            ('method', 'route', 'status_code'))
+        self.cache_hits = Counter('static_cache_hits_total', 'Static asset cache hits')
+        self.cache_misses = Counter('static_cache_misses_total', 'Static asset cache misses')
+        self.cache_bytes = Gauge('static_cache_bytes', 'Bytes held by the static asset cache')
+        self.cache_entries = Gauge('static_cache_entries', 'Files held by the static asset cache')
+        self.in_flight.set(value=0)
+
+    def observe_request(self, method, route, status, duration, bytes_sent):
+        status_code = str(status)
+        self.request_duration.observe(method, route, status_code, value=duration)
+        self.requests_total.inc(method, route, status_code)
+        self.response_bytes.inc(route, amount=bytes_sent)
+
+    def render(self):
+        """Export au format texte Prometheus 0.0.4"""
+        families = [self.request_duration, self.requests_total, self.response_bytes,
+                    self.in_flight, self.proxy_first_byte]
+        if self.asset_cache is not None:
+            cache = self.asset_cache
+            self.cache_hits.set_total(value=cache.hits)
+            self.cache_misses.set_total(value=cache.misses)
+            self.cache_bytes.set(value=cache.total_bytes)
+            self.cache_entries.set(value=len(cache.entries))
+            families += [self.cache_hits, self.cache_misses, self.cache_bytes, self.cache_entries]
+
+        lines = []
+        for family in families:
+            lines.append(f'# HELP {family.name} {family.help}')
+            lines.append(f'# TYPE {family.name} {family.kind}')
+            for name, labels, value in family.samples():
+                lines.append(f'{name}{format_labels(labels)} {format_metric_value(value)}')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+class CountingWriter:
+    """Enveloppe wfile pour compter les octets envoyés au client"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_written = 0
+
+    def write(self, data):
+        written = self.raw.write(data)
+        self.bytes_written += len(data)
+        return written
+
+    def flush(self):
+        self.raw.flush()
+
+    def close(self):
+        self.raw.close()
+
+    @property
+    def closed(self):
+        return self.raw.closed
+
+class BackendConnectionPool:
+    """Connexions HTTP persistantes vers le backend, réutilisées d'une requête à l'autre"""
+
+    def __init__(self, backend_url, size=PROXY_POOL_SIZE, timeout=PROXY_TIMEOUT):
+        parts = urlsplit(backend_url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"URL backend invalide (http://hôte:port attendu): {backend_url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self):
+        """Retourne (connexion, réutilisée)"""
+        try:
+            return self.idle.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, conn):
+        """Remet une connexion dont la réponse a été entièrement lue dans le pool"""
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
 class ChatbotHandler(http.server.SimpleHTTPRequestHandler):
+    # StaticAssetCache partagé, configuré dans main() (None = lecture disque à chaque requête)
+    asset_cache = None
+    # Fichiers hors cache envoyés par sendfile (désactivable avec --no-sendfile)
+    use_sendfile = hasattr(os, 'sendfile')
+    # BackendConnectionPool si --proxy (None = /api/* non relayé)
+    backend_pool = None
+    # ServerMetrics partagé (None = pas de /metrics)
+    metrics = None
+
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+
+    def parse_request(self):
+        ok = super().parse_request()
+        if ok and self.metrics is not None:
+            self.request_start = time.perf_counter()
+            self.request_bytes_start = self.wfile.bytes_written
+            self.metrics.in_flight.inc()
+        return ok
+
+    def handle_one_request(self):
+        """Mesure chaque requête d'une connexion (keep-alive: plusieurs par connexion)"""
+        self.request_start = None
+        self.response_status = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self.request_start is not None:
+                self.metrics.in_flight.dec()
+                self.metrics.observe_request(
+                    self.command, route_label(self.path, self.response_status),
+                    self.response_status or 0, time.perf_counter() - self.request_start,
+                    self.wfile.bytes_written - self.request_bytes_start)
+
+    def send_response_only(self, code, message=None):
+        self.response_status = int(code)
+        super().send_response_only(code, message)
+
     def end_headers(self):
         # Ajouter les headers CORS
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -22,12 +486,494 @@ class ChatbotHandler(http.server.SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
 
+    def rewrite_index(self):
+        path, sep, query = self.path.partition('?')
+        if path == '/' or path == '/index.html':
+            self.path = '/chatbot-web.html' + sep + query
+
+    def is_proxied(self):
+        return self.backend_pool is not None and self.path.startswith(PROXY_PREFIX)
+
     def do_GET(self):
-        if self.path == '/' or self.path == '/index.html':
-            self.path = '/chatbot-web.html'
+        if self.is_proxied():
+            return self.proxy_request()
+        if self.metrics is not None and self.path.split('?', 1)[0] == '/metrics':
+            return self.send_metrics()
+        self.rewrite_index()
         return super().do_GET()
 
+    def send_metrics(self):
+        body = self.metrics.render()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.is_proxied():
+            return self.proxy_request()
+        self.rewrite_index()
+        return super().do_HEAD()
+
+    def proxy_or_reject(self):
+        if self.is_proxied():
+            return self.proxy_request()
+        self.send_error(HTTPStatus.NOT_IMPLEMENTED, "Unsupported method (%r)" % self.command)
+
+    do_POST = do_PUT = do_DELETE = do_PATCH = do_OPTIONS = proxy_or_reject
+
+    def send_head(self):
+        """
+        Sert le fichier depuis le cache mémoire (ou le disque s'il n'y est pas),
+        avec ETag, réponses 304, compression et requêtes Range (206)
+        """
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            return super().send_head()
+
+        asset = self.asset_cache.get(path) if self.asset_cache is not None else None
+        if asset is not None:
+            data, size = asset.body, len(asset.body)
+        else:
+            try:
+                data = open(path, 'rb')
+            except OSError:
+                # 404 standard
+                return super().send_head()
+            try:
+                asset = FileAsset(os.fstat(data.fileno()), path)
+            except OSError:
+                data.close()
+                raise
+            size = asset.size
+
+        try:
+            return self.send_asset_head(path, asset, data, size)
+        except BaseException:
+            close_source(data)
+            raise
+
+    def send_asset_head(self, path, asset, data, size):
+        range_header = self.headers.get('Range')
+        etag, encoding = asset.etag, None
+        # Les plages portent toujours sur la représentation non compressée
+        if asset.compressible and range_header is None:
+            encoding = self.choose_encoding()
+            if encoding is not None:
+                data, etag = self.asset_cache.variant(path, asset, encoding)
+                size = len(data)
+
+        if self.is_not_modified(asset, etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(asset, etag)
+            self.end_headers()
+            close_source(data)
+            return None
+
+        byte_range = None
+        if range_header is not None and self.if_range_matches(asset, etag):
+            try:
+                byte_range = self.parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.send_validators(asset, etag)
+                self.end_headers()
+                close_source(data)
+                return None
+
+        if byte_range is None:
+            start, length = 0, size
+            self.send_response(HTTPStatus.OK)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(length))
+        self.send_header('Accept-Ranges', 'bytes')
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self.send_validators(asset, etag)
+        self.end_headers()
+        return FileRegion(data, start, length)
+
+    def parse_range(self, header, size):
+        """
+        Retourne (début, fin) inclusifs pour une plage unique `bytes=...`
+        None si l'en-tête est ignoré (syntaxe invalide ou plages multiples: réponse 200 complète)
+        """
+        unit, _, spec = header.partition('=')
+        if unit.strip().lower() != 'bytes' or ',' in spec:
+            return None
+
+        first, sep, last = spec.strip().partition('-')
+        # Bornes en chiffres ASCII uniquement: int() accepterait aussi '-5', '+5' ou '1_0'
+        if not sep or not (first or last) or not all(bound.isascii() and bound.isdigit()
+                                                     for bound in (first, last) if bound):
+            return None
+        if first == '':
+            # Suffixe: les N derniers octets
+            suffix = int(last)
+            if suffix == 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+
+        if last and end < start:
+            return None
+        if start >= size:
+            raise RangeNotSatisfiable()
+        return start, min(end, size - 1)
+
+    def if_range_matches(self, asset, etag):
+        """If-Range: la plage ne s'applique que si la ressource n'a pas changé"""
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            # Comparaison forte: un ETag faible ne correspond jamais
+            return if_range == etag
+        return if_range == asset.last_modified
+
+    def copyfile(self, source, outputfile):
+        if not isinstance(source, FileRegion):
+            return super().copyfile(source, outputfile)
+
+        if isinstance(source.data, bytes):
+            # memoryview: pas de copie intermédiaire du contenu en cache
+            outputfile.write(memoryview(source.data)[source.offset:source.offset + source.length])
+        elif self.use_sendfile:
+            # Zéro-copie noyau (os.sendfile) quand la plateforme le permet
+            sent = self.connection.sendfile(source.data, source.offset, source.length)
+            if isinstance(outputfile, CountingWriter):
+                outputfile.bytes_written += sent
+        else:
+            source.data.seek(source.offset)
+            remaining = source.length
+            while remaining > 0:
+                chunk = source.data.read(min(shutil.COPY_BUFSIZE, remaining))
+                if not chunk:
+                    break
+                outputfile.write(chunk)
+                remaining -= len(chunk)
+
+    def proxy_request(self):
+        """Relaie la requête vers le backend via une connexion du pool"""
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            self.send_error(HTTPStatus.LENGTH_REQUIRED)
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.send_error(HTTPStatus.BAD_REQUEST, "Content-Length invalide")
+            return
+        body = self.rfile.read(length) if length > 0 else None
+
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in HOP_BY_HOP_HEADERS}
+        headers['Host'] = self.backend_pool.netloc
+        forwarded_for = self.headers.get('X-Forwarded-For')
+        client_ip = self.client_address[0]
+        headers['X-Forwarded-For'] = f'{forwarded_for}, {client_ip}' if forwarded_for else client_ip
+
+        start = time.perf_counter()
+        try:
+            conn, response = self.send_to_backend(body, headers)
+        except TimeoutError:
+            self.send_error(HTTPStatus.GATEWAY_TIMEOUT, "Backend trop lent")
+            return
+        except (OSError, http.client.HTTPException):
+            self.send_error(HTTPStatus.BAD_GATEWAY, f"Backend indisponible ({self.backend_pool.netloc})")
+            return
+        first_byte_ms = (time.perf_counter() - start) * 1000
+        if self.metrics is not None:
+            self.metrics.proxy_first_byte.observe(
+                self.command, route_label(self.path, response.status), str(response.status),
+                value=first_byte_ms / 1000)
+
+        try:
+            self.relay_response(response)
+        except (OSError, http.client.HTTPException):
+            # Client ou backend coupé en cours de route: la réponse est déjà partie
+            conn.close()
+            self.close_connection = True
+        else:
+            if response.will_close:
+                conn.close()
+            else:
+                self.backend_pool.release(conn)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        self.log_message('proxy "%s %s" -> %d (1er octet %.1f ms, total %.1f ms)',
+                         self.command, self.path, response.status, first_byte_ms, total_ms)
+
+    def send_to_backend(self, body, headers):
+        """Envoie la requête; une connexion du pool fermée entre-temps est retentée une fois"""
+        while True:
+            conn, reused = self.backend_pool.acquire()
+            try:
+                conn.request(self.command, self.path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                conn.close()
+                if not reused:
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+    def relay_response(self, response):
+        """Retransmet statut, en-têtes et corps; sans Content-Length (SSE), le flux est relayé au fil de l'eau"""
+        # Server et Date sont ceux du backend
+        # (la ligne de log est écrite par proxy_request, avec les temps de réponse)
+        self.send_response_only(response.status, response.reason)
+        for name, value in response.getheaders():
+            lowered = name.lower()
+            # Les en-têtes CORS sont ajoutés par end_headers()
+            if lowered in HOP_BY_HOP_HEADERS or lowered.startswith('access-control-'):
+                continue
+            self.send_header(name, value)
+
+        has_body = self.command != 'HEAD' and response.status not in (204, 304) and response.status >= 200
+        streamed = has_body and response.getheader('Content-Length') is None
+        chunked = streamed and self.request_version == 'HTTP/1.1' and self.protocol_version == 'HTTP/1.1'
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        elif streamed:
+            # Client HTTP/1.0: la fin du corps est signalée par la fermeture
+            self.close_connection = True
+            self.send_header('Connection', 'close')
+        self.end_headers()
+
+        if not has_body:
+            response.read()
+            return
+        while True:
+            # read1: rend ce qui est déjà arrivé sans attendre un bloc complet (événements SSE)
+            chunk = response.read1(PROXY_CHUNK_SIZE)
+            if not chunk:
+                break
+            if chunked:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+        # read1 ne marque pas la réponse terminée: indispensable pour réutiliser la connexion
+        response.close()
+
+    def send_validators(self, asset, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', asset.last_modified)
+        self.send_header('Cache-Control', asset.cache_control)
+        if asset.compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def choose_encoding(self):
+        """Négocie Accept-Encoding: q le plus élevé, puis préférence du serveur (br > gzip)"""
+        header = self.headers.get('Accept-Encoding')
+        if not header:
+            return None
+
+        accepted = {}
+        for part in header.split(','):
+            name, _, params = part.partition(';')
+            q = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip().lower()] = q
+
+        best, best_q = None, 0.0
+        for encoding in ENCODERS:
+            q = accepted.get(encoding, accepted.get('*', 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def is_not_modified(self, asset, etag):
+        """Requête conditionnelle: If-None-Match prime sur If-Modified-Since (RFC 9110)"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            if if_none_match.strip() == '*':
+                return True
+            # Comparaison faible: W/"x" correspond à "x"
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return etag in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if since is None:
+                return False
+            return int(asset.mtime_ns // 1_000_000_000) <= since.timestamp()
+        return False
+
+class KeepAliveChatbotHandler(ChatbotHandler):
+    """
+    ChatbotHandler en HTTP/1.1 avec connexions persistantes
+    Traite les requêtes déjà arrivées sur la connexion, puis la rend au serveur (`idle`)
+    au lieu d'attendre la suivante: une connexion inactive n'occupe aucun worker
+    """
+    protocol_version = 'HTTP/1.1'
+    # Client lent au milieu d'une requête: le worker est libéré au bout de ce délai
+    timeout = REQUEST_TIMEOUT
+    # En-têtes et corps partent en deux écritures: sans TCP_NODELAY, Nagle + ACK retardé
+    # ajoutent ~40 ms à chaque réponse sur une connexion réutilisée
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.idle = False
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if not self.request_pending():
+                self.idle = not self.close_connection
+                return
+            self.handle_one_request()
+
+    def request_pending(self):
+        """Des octets de la requête suivante sont déjà arrivés (lecture non bloquante)"""
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            self.close_connection = True
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+class PooledHTTPServer(http.server.HTTPServer):
+    """
+    Serveur HTTP qui traite les requêtes dans un pool de threads borné
+    Les connexions sans requête en cours (nouvelles ou keep-alive) attendent dans un
+    selector surveillé par un seul thread: un worker n'est pris que lorsqu'une requête
+    arrive, et seules `workers` requêtes sont traitées en même temps (les autres attendent
+    leur tour). Une connexion inactive depuis `keepalive_timeout` secondes est fermée.
+    """
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS,
+                 keepalive_timeout=KEEPALIVE_TIMEOUT):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chatbot-worker')
+        self.keepalive_timeout = keepalive_timeout
+        # Connexions rendues par les workers, enregistrées par le thread de surveillance
+        self.idle_queue = queue.SimpleQueue()
+        self.wakeup_recv, self.wakeup_send = socket.socketpair()
+        self.idle_closing = False
+        self.idle_thread = threading.Thread(target=self.watch_idle_connections, name='chatbot-idle', daemon=True)
+        self.idle_thread.start()
+
+    def process_request(self, request, client_address):
+        self.park_connection(request, client_address)
+
+    def process_request_worker(self, request, client_address):
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        if getattr(handler, 'idle', False):
+            self.park_connection(request, client_address)
+        else:
+            self.shutdown_request(request)
+
+    def park_connection(self, request, client_address):
+        """Met une connexion en attente de sa prochaine requête, hors du pool"""
+        self.idle_queue.put((request, client_address))
+        try:
+            self.wakeup_send.send(b'\0')
+        except OSError:  # serveur arrêté
+            pass
+
+    def watch_idle_connections(self):
+        """Thread de surveillance: requête arrivée -> pool, inactivité trop longue -> fermeture"""
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.wakeup_recv, selectors.EVENT_READ)
+            while not self.idle_closing:
+                for key, _ in selector.select(timeout=1.0):
+                    if key.fileobj is self.wakeup_recv:
+                        self.wakeup_recv.recv(4096)
+                        continue
+                    selector.unregister(key.fileobj)
+                    self.executor.submit(self.process_request_worker, key.fileobj, key.data[0])
+
+                now = time.monotonic()
+                while not self.idle_queue.empty():
+                    request, client_address = self.idle_queue.get()
+                    selector.register(request, selectors.EVENT_READ, (client_address, now))
+                for key in list(selector.get_map().values()):
+                    if key.data is not None and now - key.data[1] > self.keepalive_timeout:
+                        selector.unregister(key.fileobj)
+                        self.shutdown_request(key.fileobj)
+
+            for key in list(selector.get_map().values()):
+                if key.data is not None:
+                    self.shutdown_request(key.fileobj)
+
+    def server_close(self):
+        super().server_close()
+        self.idle_closing = True
+        self.wakeup_send.send(b'\0')
+        self.idle_thread.join()
+        while not self.idle_queue.empty():
+            self.shutdown_request(self.idle_queue.get()[0])
+        self.wakeup_send.close()
+        self.wakeup_recv.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def create_server(port, mode='single', workers=DEFAULT_WORKERS):
+    """Crée le serveur selon le mode choisi (single = comportement historique)"""
+    if mode == 'threaded':
+        return PooledHTTPServer(("", port), KeepAliveChatbotHandler, workers=workers)
+    return socketserver.TCPServer(("", port), ChatbotHandler)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur web du chatbot INnatural")
+    parser.add_argument('--port', type=int, default=PORT, help=f"Port d'écoute (défaut: {PORT})")
+    parser.add_argument('--mode', choices=['single', 'threaded'], default='single',
+                        help="single: une connexion à la fois, threaded: pool de workers + keep-alive")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Taille du pool en mode threaded (défaut: {DEFAULT_WORKERS})")
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB,
+                        help="Taille du cache mémoire des fichiers statiques (et de leurs variantes gzip/br) "
+                             f"en Mo, 0 = désactivé (défaut: {DEFAULT_CACHE_MB})")
+    parser.add_argument('--no-sendfile', action='store_true',
+                        help="Copier les fichiers hors cache via des buffers Python au lieu de sendfile")
+    parser.add_argument('--proxy', action='store_true',
+                        help=f"Relayer {PROXY_PREFIX}* vers le backend (évite les requêtes CORS cross-origin)")
+    parser.add_argument('--backend', default=BACKEND_URL, help=f"URL du backend (défaut: {BACKEND_URL})")
+    parser.add_argument('--proxy-pool', type=int, default=PROXY_POOL_SIZE,
+                        help=f"Connexions persistantes gardées vers le backend (défaut: {PROXY_POOL_SIZE})")
+    parser.add_argument('--no-browser', action='store_true', help="Ne pas ouvrir le navigateur")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers doit être >= 1")
+    if args.cache_mb < 0:
+        parser.error("--cache-mb doit être >= 0")
+    if args.proxy_pool < 1:
+        parser.error("--proxy-pool doit être >= 1")
+    return args
+
 def main():
+    args = parse_args()
+    port = args.port
+
     # Changer le répertoire de travail
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
@@ -37,6 +983,19 @@ def main():
         print("❌ Erreur: chatbot-web.html introuvable!")
         sys.exit(1)
 
+    if args.no_sendfile:
+        ChatbotHandler.use_sendfile = False
+    if args.proxy:
+        try:
+            ChatbotHandler.backend_pool = BackendConnectionPool(args.backend, size=args.proxy_pool)
+        except ValueError as e:
+            print(f"❌ Erreur: {e}")
+            sys.exit(1)
+    if args.cache_mb > 0:
+        ChatbotHandler.asset_cache = StaticAssetCache(args.cache_mb * 1024 * 1024)
+        preloaded = ChatbotHandler.asset_cache.preload(PRELOAD_PATHS)
+    ChatbotHandler.metrics = ServerMetrics(ChatbotHandler.asset_cache)
+
     print()
     print("╔═══════════════════════════════════════════════════════════════════╗")
     print("║                                                                   ║")
@@ -44,20 +1003,36 @@ def main():
     print("║                                                                   ║")
     print("╚═══════════════════════════════════════════════════════════════════╝")
     print()
-    print(f"✅ Serveur web démarré sur le port {PORT}")
-    print(f"📍 URL: http://localhost:{PORT}")
-    print()
-    print("🌐 Ouverture du navigateur...")
+    print(f"✅ Serveur web démarré sur le port {port}")
+    # ?api=proxy: la page appelle l'API sur sa propre origine
+    url = f'http://localhost:{port}' + ('/?api=proxy' if args.proxy else '')
+    print(f"📍 URL: {url}")
+    print(f"📈 Métriques Prometheus: http://localhost:{port}/metrics")
+    if args.mode == 'threaded':
+        print(f"⚙️  Mode: threaded ({args.workers} workers, keep-alive {KEEPALIVE_TIMEOUT}s)")
+    else:
+        print("⚙️  Mode: single (une connexion à la fois)")
+    if ChatbotHandler.asset_cache is not None:
+        cache_kb = ChatbotHandler.asset_cache.total_bytes // 1024
+        print(f"🗂️  Cache mémoire: {preloaded} fichiers préchargés ({cache_kb} Ko / {args.cache_mb} Mo)")
+        print(f"🗜️  Compression: {', '.join(ENCODERS)}")
     print()
-    print("🔗 Backend API: http://localhost:5001")
+    if not args.no_browser:
+        print("🌐 Ouverture du navigateur...")
+        print()
+    if args.proxy:
+        print(f"🔗 Backend API: {args.backend} (relayé via {PROXY_PREFIX}*, pool de {args.proxy_pool} connexions)")
+    else:
+        print(f"🔗 Backend API: {args.backend}")
     print()
     print("💡 Pour arrêter le serveur, appuyez sur Ctrl+C")
     print()
 
     # Démarrer le serveur
-    with socketserver.TCPServer(("", PORT), ChatbotHandler) as httpd:
+    with create_server(port, args.mode, args.workers) as httpd:
         # Ouvrir le navigateur
-        webbrowser.open(f'http://localhost:{PORT}')
+        if not args.no_browser:
+            webbrowser.open(url)
 
         try:
             print("🚀 Serveur en cours d'exécution. Appuyez sur Ctrl+C pour arrêter.")